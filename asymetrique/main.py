@@ -1,3 +1,4 @@
+import asyncio
 import random
 import string
 import hashlib
@@ -12,6 +13,7 @@ import datetime
 # Nous avons besoin de garder cet import pour le chiffrement des clés privées
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from symetrique.modules import prim as sym_prim
+from symetrique.modules import asynchrone as sym_async
 
 # --------------------------
 #  Fonctions utilitaires
@@ -490,52 +492,37 @@ def find_coprime(n):
 #  Chiffrement / Déchiffrement
 # --------------------------
 
-def encrypt(message, public_key, salt, iv):
-    """
-    1. Salage caractère à caractère.
-    2. Préfixe IV.
-    3. Encodage Base64.
-    4. Chiffrement RSA.
-    5. Encodage Base64 du flux chiffré.
-    """
-    e, n = public_key
+# Nombre d'octets (chiffrement) ou de blocs (déchiffrement) calculés par chaque
+# tâche des versions asynchrones
+ASYNC_SLICE = 1024
 
+def prepare_plaintext(message, salt, iv):
+    """Étapes 1 à 3 du chiffrement : salage, préfixe IV et Base64."""
     # 1. Salage
     salted = ''.join(message[i] + salt[i % len(salt)] for i in range(len(message)))
     # 2. Préfixe IV
     iv_msg = iv + salted
     # 3. Base64
-    b64_plain = base64.b64encode(iv_msg.encode('utf-8'))
+    return base64.b64encode(iv_msg.encode('utf-8'))
+
+def rsa_encrypt_bytes(data, public_key):
+    """Chiffre chaque octet de `data` en un bloc RSA de taille fixe."""
+    e, n = public_key
 
-    # 4. RSA : bloc de taille fixe en octets
+    # Bloc de taille fixe en octets
     block_size = math.ceil(n.bit_length() / 8)
     cipher_bytes = bytearray()
-    for byte in b64_plain:
+    for byte in data:
         c = pow(byte, e, n)
         # chaque bloc devient block_size octets big‑endian
         cipher_bytes += c.to_bytes(block_size, byteorder='big')
+    return bytes(cipher_bytes)
 
-    # 5. Encode en Base64 pour produire une chaîne ASCII
-    return base64.b64encode(bytes(cipher_bytes)).decode('ascii')
-
-
-def decrypt(cipher_b64, private_key, iv):
-    """
-    1. Décodage Base64 du flux chiffré.
-    2. Découpage en blocs et déchiffrement RSA.
-    3. Décodage Base64 pour retrouver IV+salted.
-    4. Retrait IV et retrait sel.
-    """
+def rsa_decrypt_blocks(cipher_bytes, private_key):
+    """Déchiffre une suite de blocs RSA de taille fixe, chacun donnant un octet."""
     d, n = private_key
     block_size = math.ceil(n.bit_length() / 8)
 
-    # 1. Base64 → bytes chiffrés
-    try:
-        cipher_bytes = base64.b64decode(cipher_b64)
-    except Exception:
-        raise ValueError("Erreur de décodage Base64 : message corrompu")
-
-    # 2. Découpe en blocs et déchiffrement RSA
     plain_bytes = bytearray()
     for i in range(0, len(cipher_bytes), block_size):
         block = cipher_bytes[i:i+block_size]
@@ -543,10 +530,13 @@ def decrypt(cipher_b64, private_key, iv):
         m = pow(c, d, n)
         # m doit être un octet unique (0–255)
         plain_bytes.append(m)
+    return bytes(plain_bytes)
 
+def recover_message(plain_bytes, iv):
+    """Étapes 3 et 4 du déchiffrement : Base64 inverse, retrait de l'IV et du sel."""
     # 3. Base64 inverse pour retrouver la chaîne iv+salted
     try:
-        full = base64.b64decode(bytes(plain_bytes)).decode('utf-8')
+        full = base64.b64decode(plain_bytes).decode('utf-8')
     except Exception:
         raise ValueError("Erreur de décodage Base64 : message corrompu")
 
@@ -560,6 +550,82 @@ def decrypt(cipher_b64, private_key, iv):
     # if simple_hash(original) != simple_hash(original): ...
     return original
 
+def decode_cipher(cipher_b64):
+    """Étape 1 du déchiffrement : Base64 → octets chiffrés."""
+    try:
+        return base64.b64decode(cipher_b64)
+    except Exception:
+        raise ValueError("Erreur de décodage Base64 : message corrompu")
+
+def encode_cipher(cipher_bytes):
+    """Étape 5 du chiffrement : octets chiffrés → Base64."""
+    return base64.b64encode(cipher_bytes).decode('ascii')
+
+def encrypt(message, public_key, salt, iv):
+    """
+    1. Salage caractère à caractère.
+    2. Préfixe IV.
+    3. Encodage Base64.
+    4. Chiffrement RSA.
+    5. Encodage Base64 du flux chiffré.
+    """
+    b64_plain = prepare_plaintext(message, salt, iv)
+    cipher_bytes = rsa_encrypt_bytes(b64_plain, public_key)
+
+    # 5. Encode en Base64 pour produire une chaîne ASCII
+    return encode_cipher(cipher_bytes)
+
+
+def decrypt(cipher_b64, private_key, iv):
+    """
+    1. Décodage Base64 du flux chiffré.
+    2. Découpage en blocs et déchiffrement RSA.
+    3. Décodage Base64 pour retrouver IV+salted.
+    4. Retrait IV et retrait sel.
+    """
+    cipher_bytes = decode_cipher(cipher_b64)
+    plain_bytes = rsa_decrypt_blocks(cipher_bytes, private_key)
+    return recover_message(plain_bytes, iv)
+
+async def encrypt_async(message, public_key, salt, iv, executor=None, slice_size=ASYNC_SLICE,
+                        in_flight=sym_async.EN_VOL):
+    """
+    Version asynchrone de encrypt, pour un service asyncio : le calcul est fait
+    dans `executor` (celui de la boucle si None, sinon un ThreadPoolExecutor ou
+    un ProcessPoolExecutor), par tranches de `slice_size` octets dont au plus
+    `in_flight` sont en cours. Entre deux tranches, la boucle reste libre de
+    faire avancer les autres requêtes. Les étapes qui portent sur le message
+    entier (salage, assemblage, Base64) ne quittent pas le processus (voir
+    sym_async.executor_local).
+    """
+    loop = asyncio.get_running_loop()
+    local = sym_async.executor_local(executor)
+    b64_plain = await loop.run_in_executor(local, prepare_plaintext, message, salt, iv)
+
+    tasks = ((rsa_encrypt_bytes, b64_plain[i:i+slice_size], public_key)
+             for i in range(0, len(b64_plain), slice_size))
+    blocks = [block async for block in sym_async.executer(tasks, executor, in_flight)]
+    cipher_bytes = await loop.run_in_executor(local, b"".join, blocks)
+    return await loop.run_in_executor(local, encode_cipher, cipher_bytes)
+
+async def decrypt_async(cipher_b64, private_key, iv, executor=None, slice_size=ASYNC_SLICE,
+                        in_flight=sym_async.EN_VOL):
+    """
+    Version asynchrone de decrypt : les blocs RSA sont déchiffrés dans `executor`
+    par tranches de `slice_size` blocs (voir encrypt_async).
+    """
+    loop = asyncio.get_running_loop()
+    local = sym_async.executor_local(executor)
+    cipher_bytes = await loop.run_in_executor(local, decode_cipher, cipher_b64)
+
+    _, n = private_key
+    step = slice_size * math.ceil(n.bit_length() / 8)
+    tasks = ((rsa_decrypt_blocks, cipher_bytes[i:i+step], private_key)
+             for i in range(0, len(cipher_bytes), step))
+    blocks = [block async for block in sym_async.executer(tasks, executor, in_flight)]
+    plain_bytes = await loop.run_in_executor(local, b"".join, blocks)
+    return await loop.run_in_executor(local, recover_message, plain_bytes, iv)
+
 # --------------------------
 #  Fonctions d'interface utilisateur
 # --------------------------
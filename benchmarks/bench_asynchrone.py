@@ -0,0 +1,95 @@
+"""
+Mesure la réactivité de la boucle asyncio pendant un chiffrement par le module
+asynchrone : plus longue attente d'une tâche témoin, qui se réveille toutes
+les millisecondes, pendant le chiffrement puis le déchiffrement d'un message
+et d'un fichier.
+
+    python benchmarks/bench_asynchrone.py --taille 40M
+    python benchmarks/bench_asynchrone.py --taille 40M --processus 4
+
+Les résultats sont vérifiés contre ceux de prim. Avec --processus, les tranches
+sont calculées dans un ProcessPoolExecutor (les entrées-sorties des fichiers
+restent dans l'executor à threads de la boucle).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Ajout du chemin pour pouvoir importer les modules de chiffrement symétrique
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from symetrique.modules import asynchrone, prim
+
+from bench_moteur import generer_message, lire_taille
+
+
+async def mesurer_blocage(coroutine):
+    """
+    Exécute `coroutine` à côté d'une tâche témoin.
+
+    Returns:
+        tuple: (durée totale, plus longue attente du témoin, résultat), en secondes
+    """
+    attente_max = 0.0
+
+    async def temoin():
+        nonlocal attente_max
+        while True:
+            avant = time.perf_counter()
+            await asyncio.sleep(0.001)
+            attente_max = max(attente_max, time.perf_counter() - avant - 0.001)
+
+    tache = asyncio.create_task(temoin())
+    await asyncio.sleep(0)
+    debut = time.perf_counter()
+    try:
+        resultat = await coroutine
+    finally:
+        tache.cancel()
+    return time.perf_counter() - debut, attente_max, resultat
+
+def afficher(nom, duree, attente_max):
+    print(f"{nom:<28} | {duree:>8.2f} s | attente max de la boucle {attente_max * 1000:>8.1f} ms")
+
+async def mesurer(message, key, executor):
+    duree, attente, chiffre = await mesurer_blocage(asynchrone.chiffrer(message, key, executor))
+    assert chiffre == prim.chiffrer(message, key), "Le chiffrement diffère de prim.chiffrer"
+    afficher("chiffrer", duree, attente)
+
+    duree, attente, dechiffre = await mesurer_blocage(asynchrone.dechiffrer(chiffre, key, executor))
+    assert dechiffre == message, "Le déchiffrement ne redonne pas le message d'origine"
+    afficher("dechiffrer", duree, attente)
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = os.path.join(dossier, 'message.txt')
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            fichier.write(message)
+
+        duree, attente, _ = await mesurer_blocage(asynchrone.chiffrer_fichier_texte(chemin, key, executor))
+        afficher("chiffrer_fichier_texte", duree, attente)
+
+        duree, attente, _ = await mesurer_blocage(asynchrone.dechiffrer_fichier_texte(chemin, key, executor))
+        afficher("dechiffrer_fichier_texte", duree, attente)
+        with open(chemin, encoding='utf-8') as fichier:
+            assert fichier.read() == message, "Le fichier déchiffré diffère de l'original"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--taille', default='8M', help="Taille du message (défaut : 8M)")
+    parser.add_argument('--cle', default='Exegol-Kyber-42', help="Clé de chiffrement utilisée")
+    parser.add_argument('--processus', type=int, default=None,
+                        help="Calculer les tranches dans un ProcessPoolExecutor de ce nombre de processus")
+    args = parser.parse_args()
+
+    message = generer_message(lire_taille(args.taille))
+    if args.processus:
+        with ProcessPoolExecutor(args.processus) as executor:
+            asyncio.run(mesurer(message, args.cle, executor))
+    else:
+        asyncio.run(mesurer(message, args.cle, None))
+
+if __name__ == "__main__":
+    main()
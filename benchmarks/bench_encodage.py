@@ -0,0 +1,79 @@
+"""
+Compare l'encodage final (second.secure_encode / secure_decode) à l'implémentation
+historique bit à bit, qui construisait une chaîne de '0' et de '1'.
+
+    python benchmarks/bench_encodage.py --max 4M
+
+Les deux implémentations sont vérifiées sur les mêmes données avant la mesure.
+"""
+import argparse
+import os
+import sys
+
+# Ajout du chemin pour pouvoir importer les modules de chiffrement symétrique
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from symetrique.modules import second
+
+from bench_moteur import UNITES, formater_taille, lire_taille, mesurer
+
+
+def encode_historique(text):
+    """Encodage bit à bit tel qu'il existait avant les tables de base64."""
+    binary = ""
+    for byte in text.encode('utf-8'):
+        binary += format(byte, '08b')
+    binary += "0" * ((6 - len(binary) % 6) % 6)
+    result = ""
+    for i in range(0, len(binary), 6):
+        result += second.ALPHABET[int(binary[i:i+6], 2)]
+    return result
+
+def decode_historique(encoded):
+    """Décodage bit à bit tel qu'il existait avant les tables de base64."""
+    binary = ""
+    for char in encoded:
+        if char in second.ALPHABET:
+            binary += format(second.ALPHABET.index(char), '06b')
+    binary = binary[:len(binary) - len(binary) % 8]
+    result_bytes = bytearray()
+    for i in range(0, len(binary), 8):
+        result_bytes.append(int(binary[i:i+8], 2))
+    return result_bytes.decode('utf-8', errors='replace')
+
+def generer_texte(taille):
+    """Génère un texte de `taille` caractères mêlant ASCII et caractères accentués."""
+    motif = ''.join(chr(32 + (i * 37) % 95) if i % 7 else 'é' for i in range(4096))
+    return (motif * (taille // len(motif) + 1))[:taille]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min', default='1K', help="Taille minimale (défaut : 1K)")
+    parser.add_argument('--max', default='1M', help="Taille maximale (défaut : 1M)")
+    args = parser.parse_args()
+
+    taille = lire_taille(args.min)
+    taille_max = lire_taille(args.max)
+
+    print(f"{'Taille':>10} | {'Encodage (historique → tables)':>34} | {'Décodage (historique → tables)':>34}")
+    print('-' * 86)
+    while taille <= taille_max:
+        texte = generer_texte(taille)
+        duree_ancien_encodage, encode_ancien = mesurer(encode_historique, texte)
+        duree_encodage, encode = mesurer(second.secure_encode, texte)
+        assert encode == encode_ancien, "Les deux encodages diffèrent"
+
+        duree_ancien_decodage, decode_ancien = mesurer(decode_historique, encode)
+        duree_decodage, decode = mesurer(second.secure_decode, encode)
+        assert decode == decode_ancien == texte, "Les deux décodages diffèrent"
+
+        def colonne(ancien, nouveau):
+            debit_ancien = taille / UNITES['M'] / max(ancien, 1e-9)
+            debit_nouveau = taille / UNITES['M'] / max(nouveau, 1e-9)
+            return f"{debit_ancien:7.1f} → {debit_nouveau:7.1f} Mo/s (x{ancien / max(nouveau, 1e-9):5.0f})"
+
+        print(f"{formater_taille(taille):>10} | {colonne(duree_ancien_encodage, duree_encodage):>34} | "
+              f"{colonne(duree_ancien_decodage, duree_decodage):>34}")
+        taille *= 4
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Compare le chiffrement de nombreux messages courts un par un (prim.chiffrer /
+prim.dechiffrer) et par lots (prim.chiffrer_batch / prim.dechiffrer_batch).
+
+    python benchmarks/bench_lots.py --nombre 100000 --taille 64
+"""
+import argparse
+import os
+import sys
+
+# Ajout du chemin pour pouvoir importer les modules de chiffrement symétrique
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from symetrique.modules import prim
+
+from bench_moteur import generer_message, mesurer
+
+
+def chiffrer_un_par_un(messages, key):
+    return [prim.chiffrer(message, key) for message in messages]
+
+def dechiffrer_un_par_un(messages_chiffres, key):
+    return [prim.dechiffrer(message_chiffre, key) for message_chiffre in messages_chiffres]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nombre', type=int, default=100000, help="Nombre de messages (défaut : 100000)")
+    parser.add_argument('--taille', type=int, default=64, help="Taille de chaque message (défaut : 64)")
+    parser.add_argument('--cle', default='Exegol-Kyber-42', help="Clé de chiffrement utilisée")
+    parser.add_argument('--workers', type=int, default=None, help="Nombre de processus pour les lots")
+    args = parser.parse_args()
+
+    motif = generer_message(args.taille + args.nombre)
+    messages = [motif[i:i + args.taille] for i in range(args.nombre)]
+
+    duree_un_par_un, chiffres = mesurer(chiffrer_un_par_un, messages, args.cle)
+    duree_lots, resultats = mesurer(prim.chiffrer_batch, messages, args.cle, args.workers)
+    assert [resultat['resultat'] for resultat in resultats] == chiffres, "Les deux chiffrements diffèrent"
+    print(f"Chiffrement   : {args.nombre / duree_un_par_un:10.0f} → {args.nombre / duree_lots:10.0f} messages/s")
+
+    duree_un_par_un, dechiffres = mesurer(dechiffrer_un_par_un, chiffres, args.cle)
+    duree_lots, resultats = mesurer(prim.dechiffrer_batch, chiffres, args.cle, args.workers)
+    assert [resultat['resultat'] for resultat in resultats] == dechiffres == messages, "Les deux déchiffrements diffèrent"
+    print(f"Déchiffrement : {args.nombre / duree_un_par_un:10.0f} → {args.nombre / duree_lots:10.0f} messages/s")
+
+if __name__ == "__main__":
+    main()
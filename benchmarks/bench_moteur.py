@@ -0,0 +1,153 @@
+"""
+Mesure du débit du moteur de chiffrement symétrique selon la taille des données.
+
+Un moteur linéaire garde un débit (Mo/s) à peu près constant quelle que soit la
+taille du message. Exemple :
+
+    python benchmarks/bench_moteur.py --max 64M
+    python benchmarks/bench_moteur.py --max 1G --complet
+    python benchmarks/bench_moteur.py --max 1G --flux
+    python benchmarks/bench_moteur.py --max 1G --octets --sans-numpy
+
+Attention : en mémoire, un message de N caractères occupe environ 16 N octets
+pendant le chiffrement (tableaux de points de code sur 32 bits, leurres compris).
+Le mode --flux (chiffrer_stream / dechiffrer_stream) garde une mémoire constante
+mais écrit le message chiffré dans un fichier temporaire. Le mode --octets mesure
+la variante binaire (chiffrer_octets / dechiffrer_octets). Si NumPy est installé,
+--sans-numpy permet de comparer avec le moteur en Python pur.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# Ajout du chemin pour pouvoir importer les modules de chiffrement symétrique
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from symetrique.modules import moteur, prim, second
+
+UNITES = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def lire_taille(texte):
+    """Convertit une taille du type 1K, 64M ou 1G en nombre d'octets."""
+    texte = texte.strip().upper()
+    if texte and texte[-1] in UNITES:
+        return int(texte[:-1]) * UNITES[texte[-1]]
+    return int(texte)
+
+def formater_taille(taille):
+    """Affiche une taille avec l'unité la plus adaptée."""
+    for unite in ('G', 'M', 'K'):
+        if taille >= UNITES[unite]:
+            return f"{taille // UNITES[unite]} {unite}o"
+    return f"{taille} o"
+
+def generer_message(taille):
+    """Génère un message pseudo-aléatoire de `taille` caractères ASCII imprimables."""
+    motif = ''.join(chr(32 + (i * 37) % 95) for i in range(4096))
+    return (motif * (taille // len(motif) + 1))[:taille]
+
+def mesurer(fonction, *args):
+    """Retourne la durée d'exécution de `fonction` en secondes et son résultat."""
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+def mesurer_moteur(message, key, workers=None):
+    """Chiffre puis déchiffre avec le moteur seul (sans l'encodage final)."""
+    key_values = second.generate_key_values(key)
+    processed = moteur.texte_vers_points(key_values['fingerprint'] + message)
+    duree_chiffrement, chiffre = mesurer(moteur.chiffrer_points, processed, key_values)
+    duree_dechiffrement, dechiffre = mesurer(moteur.dechiffrer_points, chiffre, key_values)
+    assert dechiffre == processed, "Le déchiffrement ne redonne pas le message d'origine"
+    return duree_chiffrement, duree_dechiffrement
+
+def mesurer_octets(message, key, workers=None):
+    """Chiffre puis déchiffre des octets avec prim.chiffrer_octets / prim.dechiffrer_octets."""
+    donnees = message.encode('ascii')
+    duree_chiffrement, chiffre = mesurer(prim.chiffrer_octets, donnees, key, workers)
+    duree_dechiffrement, dechiffre = mesurer(prim.dechiffrer_octets, chiffre, key, workers)
+    assert dechiffre == donnees, "Le déchiffrement ne redonne pas les données d'origine"
+    return duree_chiffrement, duree_dechiffrement
+
+def mesurer_complet(message, key, workers=None):
+    """Chiffre puis déchiffre avec prim.chiffrer / prim.dechiffrer (encodage compris)."""
+    duree_chiffrement, chiffre = mesurer(prim.chiffrer, message, key, workers)
+    duree_dechiffrement, dechiffre = mesurer(prim.dechiffrer, chiffre, key, workers)
+    assert dechiffre == message, "Le déchiffrement ne redonne pas le message d'origine"
+    return duree_chiffrement, duree_dechiffrement
+
+class LecteurMotif:
+    """Flux de lecture qui produit un message de `taille` caractères sans le stocker."""
+
+    def __init__(self, taille):
+        self.restant = taille
+        self.motif = generer_message(1 << 20)
+
+    def read(self, taille):
+        taille = min(taille, self.restant, len(self.motif))
+        self.restant -= taille
+        return self.motif[:taille]
+
+class EcrivainCompteur:
+    """Flux d'écriture qui se contente de compter les caractères reçus."""
+
+    def __init__(self):
+        self.total = 0
+
+    def write(self, texte):
+        self.total += len(texte)
+
+def mesurer_flux(taille, key, workers=None):
+    """Chiffre puis déchiffre en flux via un fichier temporaire, à mémoire constante."""
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as fichier:
+        duree_chiffrement, _ = mesurer(prim.chiffrer_stream, LecteurMotif(taille), fichier, key,
+                                       prim.TAILLE_TRAME, workers)
+        fichier.seek(0)
+        ecrivain = EcrivainCompteur()
+        duree_dechiffrement, _ = mesurer(prim.dechiffrer_stream, fichier, ecrivain, key,
+                                         prim.TAILLE_TRAME, workers)
+    assert ecrivain.total == taille, "Le déchiffrement ne redonne pas la taille d'origine"
+    return duree_chiffrement, duree_dechiffrement
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--min', default='1K', help="Taille minimale (défaut : 1K)")
+    parser.add_argument('--max', default='64M', help="Taille maximale (défaut : 64M, jusqu'à 1G)")
+    parser.add_argument('--cle', default='Exegol-Kyber-42', help="Clé de chiffrement utilisée")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--complet', action='store_true',
+                      help="Mesurer prim.chiffrer/dechiffrer au lieu du moteur seul")
+    mode.add_argument('--flux', action='store_true',
+                      help="Mesurer prim.chiffrer_stream/dechiffrer_stream (mémoire constante)")
+    mode.add_argument('--octets', action='store_true',
+                      help="Mesurer prim.chiffrer_octets/dechiffrer_octets (format binaire)")
+    parser.add_argument('--sans-numpy', action='store_true',
+                        help="Forcer le moteur en Python pur même si NumPy est installé")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (modes --complet, --flux et --octets)")
+    args = parser.parse_args()
+
+    if args.sans_numpy:
+        moteur.NUMPY_ACTIF = False
+    print(f"Moteur : {'NumPy' if moteur.NUMPY_ACTIF else 'Python pur'}")
+
+    taille = lire_taille(args.min)
+    taille_max = lire_taille(args.max)
+
+    print(f"{'Taille':>10} | {'Chiffrement':>14} | {'Déchiffrement':>14}")
+    print('-' * 46)
+    while taille <= taille_max:
+        if args.flux:
+            duree_chiffrement, duree_dechiffrement = mesurer_flux(taille, args.cle, args.workers)
+        else:
+            mesure = mesurer_complet if args.complet else mesurer_octets if args.octets else mesurer_moteur
+            duree_chiffrement, duree_dechiffrement = mesure(generer_message(taille), args.cle, args.workers)
+        debit_chiffrement = taille / UNITES['M'] / max(duree_chiffrement, 1e-9)
+        debit_dechiffrement = taille / UNITES['M'] / max(duree_dechiffrement, 1e-9)
+        print(f"{formater_taille(taille):>10} | {debit_chiffrement:>9.1f} Mo/s | {debit_dechiffrement:>9.1f} Mo/s")
+        taille *= 4
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,516 @@
+# API asynchrone du chiffrement symétrique
+#
+# Les fonctions de prim bloquent pendant tout le calcul : appelées depuis une
+# boucle asyncio, elles arrêtent toutes les autres requêtes. Leurs versions
+# asynchrones découpent le travail en tranches alignées sur les blocs de
+# transposition (chaque tranche ne dépend que de sa position absolue et de la
+# clé, voir moteur) et calculent chaque tranche dans un executor : celui de la
+# boucle par défaut, ou un ThreadPoolExecutor / ProcessPoolExecutor fourni.
+# Les conversions (texte, points de code, encodage) se font elles aussi par
+# tranche dans l'executor. Les étapes qui portent sur le message entier
+# (assemblage final en une seule copie, décodage, compression) restent dans le
+# processus, hors de la boucle (voir executor_local). Entre deux tranches, la
+# boucle reprend la main et les autres requêtes avancent. Le résultat est
+# identique à celui des fonctions de prim.
+#
+# Les flux sont lus et écrits avec l'interface d'asyncio : lecture par
+# `await reader.read(taille)`, écriture par `writer.write(donnees)` suivi de
+# `await writer.drain()` (asyncio.StreamReader / StreamWriter, ou
+# FichierAsynchrone pour un fichier local, dont les entrées-sorties passent par
+# un executor à threads distinct, `io_executor`). L'ouverture, la fermeture et
+# le remplacement des fichiers y passent aussi.
+
+import asyncio
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+
+from . import binaire
+from . import compression
+from . import moteur
+from . import prim
+from . import second
+
+# Nombre d'éléments (caractères ou octets) de chaque tranche calculée dans l'executor
+TAILLE_TRANCHE = 1 << 18
+
+# Nombre de tranches calculées en même temps par une requête
+EN_VOL = 2
+
+
+def executor_local(executor, io_executor=None):
+    """
+    Executor des étapes qui portent sur le message entier : io_executor s'il est
+    fourni, sinon `executor` s'il s'agit de threads. Un ProcessPoolExecutor
+    copierait tout le message vers un autre processus puis en retour : ces
+    étapes vont alors dans l'executor par défaut de la boucle.
+    """
+    if io_executor is not None:
+        return io_executor
+    return None if isinstance(executor, ProcessPoolExecutor) else executor
+
+async def executer(taches, executor=None, en_vol=EN_VOL):
+    """
+    Version asynchrone de moteur.executer : exécute les tâches (fonction,
+    *arguments) dans `executor` et produit leurs résultats dans l'ordre, avec au
+    plus `en_vol` tâches en cours. `taches` peut être un itérable asynchrone.
+    """
+    loop = asyncio.get_running_loop()
+    en_cours = deque()
+
+    async def taches_asynchrones():
+        if hasattr(taches, '__aiter__'):
+            async for tache in taches:
+                yield tache
+        else:
+            for tache in taches:
+                yield tache
+
+    try:
+        async for fonction, *arguments in taches_asynchrones():
+            en_cours.append(loop.run_in_executor(executor, fonction, *arguments))
+            if len(en_cours) >= en_vol:
+                yield await en_cours.popleft()
+        while en_cours:
+            yield await en_cours.popleft()
+    finally:
+        # Requête annulée ou erreur : ne pas laisser de résultats orphelins
+        for future in en_cours:
+            future.cancel()
+
+def tranche_alignee(unite, taille_tranche=TAILLE_TRANCHE):
+    """Plus grande taille de tranche multiple de `unite`, au plus taille_tranche."""
+    return max(taille_tranche - taille_tranche % unite, unite)
+
+async def lire_segments(reader, taille_segment, taille_lecture, entete=b""):
+    """
+    Découpe `entete` puis les octets d'un lecteur asynchrone en segments de
+    `taille_segment` éléments (sauf le dernier), comme prim.segments_alignes.
+
+    Yields:
+        tuple: (segment, position absolue du segment)
+    """
+    reste = bytearray(entete)
+    position = 0
+    fin = False
+    while not fin:
+        donnees = await reader.read(taille_lecture)
+        fin = not donnees
+        reste += donnees
+
+        while len(reste) >= taille_segment or (fin and reste):
+            segment = array(moteur.TYPE_OCTETS, reste[:taille_segment])
+            yield segment, position
+            position += len(segment)
+            del reste[:len(segment)]
+
+# Tâches confiées à l'executor : chacune convertit et calcule une seule tranche,
+# et les résultats sont assemblés dans l'executor, jamais dans la boucle
+
+def chiffrer_tranche_texte(texte, key_values, position):
+    """Chiffre une tranche de texte et retourne son encodage UTF-8 (avant secure_encode)."""
+    points = moteur.chiffrer_points(moteur.texte_vers_points(texte), key_values, position)
+    return moteur.points_vers_texte(points).encode('utf-8')
+
+def dechiffrer_tranche_texte(texte, key_values, position):
+    """Déchiffre une tranche de texte décodé (empreinte comprise pour la première)."""
+    points = moteur.dechiffrer_points(moteur.texte_vers_points(texte), key_values, position)
+    return moteur.points_vers_texte(points)
+
+def chiffrer_tranche_octets(segment, key_values, position):
+    return moteur.chiffrer_points(segment, key_values, position).tobytes()
+
+def dechiffrer_tranche_octets(segment, key_values, position):
+    return moteur.dechiffrer_points(segment, key_values, position).tobytes()
+
+def decoder_octets(message_chiffre, debut):
+    """Décode un message pré-compressé à partir de la position `debut`."""
+    return second.secure_decode_bytes(message_chiffre[debut:])
+
+def decompresser_texte(morceaux, algorithme):
+    """Assemble des tranches déchiffrées, les décompresse puis les décode en UTF-8."""
+    return compression.decompresser(b"".join(morceaux), algorithme).decode('utf-8')
+
+def tranches_texte(texte, taille, entete=""):
+    """
+    Découpe `entete` suivi de `texte` en tranches de `taille` caractères, sans
+    construire leur concaténation.
+
+    Yields:
+        tuple: (tranche, position absolue de la tranche)
+    """
+    debut = taille - len(entete)
+    yield entete + texte[:debut], 0
+    for position in range(debut, len(texte), taille):
+        yield texte[position:position + taille], len(entete) + position
+
+class MessageCorrompu(ValueError):
+    """Le message chiffré ne peut pas être décodé."""
+
+def textes_decodes(message_chiffre, taille):
+    """
+    Décode un message chiffré par morceaux de `taille` caractères encodés (voir
+    second.secure_decode_stream).
+
+    Raises:
+        MessageCorrompu: Si le message ne peut pas être décodé
+    """
+    morceaux = (message_chiffre[i:i + taille] for i in range(0, len(message_chiffre), taille))
+    try:
+        yield from second.secure_decode_stream(morceaux)
+    except Exception as e:
+        raise MessageCorrompu("Le message chiffré est corrompu ou mal formaté.") from e
+
+def regrouper_textes(textes, taille):
+    """
+    Regroupe des morceaux de texte de longueur quelconque en tranches de `taille`
+    caractères (sauf la dernière), comme moteur.decouper pour les tableaux.
+
+    Yields:
+        tuple: (tranche, position absolue de la tranche)
+    """
+    reste = ""
+    position = 0
+    for texte in textes:
+        reste += texte
+        while len(reste) >= taille:
+            yield reste[:taille], position
+            position += taille
+            reste = reste[taille:]
+    if reste:
+        yield reste, position
+
+async def encoder_resultats(resultats, executor=None, prefixe=""):
+    """
+    Encode avec secure_encode des tranches chiffrées au fil de leur arrivée : les
+    octets sont encodés par groupes de 3 dans l'executor, le reste étant reporté
+    sur la tranche suivante (voir second.secure_encode_stream).
+    """
+    loop = asyncio.get_running_loop()
+    encodes = [prefixe]
+    reste = b""
+    async for morceau in resultats:
+        donnees = reste + morceau
+        coupe = len(donnees) - len(donnees) % 3
+        encodes.append(await loop.run_in_executor(executor, second.secure_encode_bytes, donnees[:coupe]))
+        reste = donnees[coupe:]
+    if reste:
+        encodes.append(second.secure_encode_bytes(reste))
+    return await loop.run_in_executor(executor_local(executor), "".join, encodes)
+
+async def sans_empreinte(resultats, longueur):
+    """Produit les tranches déchiffrées sans les `longueur` premiers éléments (l'empreinte)."""
+    async for morceau in resultats:
+        yield morceau[longueur:]
+        longueur = max(longueur - len(morceau), 0)
+
+# Chiffrement
+
+async def chiffrer(message, key, executor=None, precompression=False):
+    """
+    Version asynchrone de prim.chiffrer (même résultat, messages d'erreur compris).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        if precompression:
+            local = executor_local(executor)
+            donnees = await loop.run_in_executor(local, str.encode, message, 'utf-8')
+            algorithme = compression.choisir_precompression(len(donnees), donnees[:compression.TAILLE_ECHANTILLON])
+            if algorithme is not None:
+                compresse = await loop.run_in_executor(local, compression.compresser, donnees, algorithme)
+                return await encoder_resultats(chiffrer_tranches_octets(compresse, key, executor), executor,
+                                               prim.PREFIXES_COMPRESSION[algorithme])
+
+        key_values = second.generate_key_values(key)
+        unite = moteur.unite_chiffrement(key_values['block_size'])
+        tranches = tranches_texte(message, tranche_alignee(unite), key_values['fingerprint'])
+        taches = ((chiffrer_tranche_texte, tranche, key_values, position) for tranche, position in tranches)
+        return await encoder_resultats(executer(taches, executor), executor)
+
+    except Exception as e:
+        return f"Erreur lors du chiffrement: {str(e)}"
+
+async def chiffrer_tranches_octets(donnees, key, executor=None):
+    """Chiffre des octets par tranches et produit les tranches chiffrées dans l'ordre."""
+    key_values = second.generate_key_values(key)
+    donnees = memoryview(donnees).cast('B')
+    unite = moteur.unite_chiffrement(key_values['block_size'])
+    segments = prim.segments_alignes(donnees, tranche_alignee(unite), key_values['fingerprint'].encode('ascii'))
+    taches = ((chiffrer_tranche_octets, segment, key_values, position) for segment, position in segments)
+    async for morceau in executer(taches, executor):
+        yield morceau
+
+async def chiffrer_octets(donnees, key, executor=None):
+    """
+    Version asynchrone de prim.chiffrer_octets : accepte tout objet tampon
+    (bytes, bytearray, memoryview, mmap).
+
+    Returns:
+        bytes: Les octets chiffrés
+    """
+    morceaux = [morceau async for morceau in chiffrer_tranches_octets(donnees, key, executor)]
+    return await asyncio.get_running_loop().run_in_executor(executor_local(executor), b"".join, morceaux)
+
+async def chiffrer_octets_stream(reader, writer, key, executor=None, taille_lecture=TAILLE_TRANCHE):
+    """
+    Version asynchrone de prim.chiffrer_octets_stream : lit des octets dans un
+    lecteur asynchrone et écrit les octets chiffrés dans un écrivain asynchrone,
+    à mémoire bornée.
+
+    Returns:
+        int: Nombre d'octets écrits
+    """
+    key_values = second.generate_key_values(key)
+    unite = moteur.unite_chiffrement(key_values['block_size'])
+    segments = lire_segments(reader, tranche_alignee(unite), taille_lecture, key_values['fingerprint'].encode('ascii'))
+
+    async def taches():
+        async for segment, position in segments:
+            yield chiffrer_tranche_octets, segment, key_values, position
+
+    ecrits = 0
+    async for morceau in executer(taches(), executor):
+        writer.write(morceau)
+        await writer.drain()
+        ecrits += len(morceau)
+    return ecrits
+
+# Déchiffrement
+
+async def dechiffrer(message_chiffre, key, executor=None):
+    """
+    Version asynchrone de prim.dechiffrer (même résultat, messages d'erreur compris).
+    """
+    try:
+        loop = asyncio.get_running_loop()
+        local = executor_local(executor)
+
+        # Message pré-compressé : des octets chiffrés, à décompresser
+        algorithme = prim.algorithme_precompression(message_chiffre)
+        if algorithme is not None:
+            try:
+                chiffre = await loop.run_in_executor(local, decoder_octets, message_chiffre,
+                                                     len(prim.PREFIXES_COMPRESSION[algorithme]))
+                morceaux = await dechiffrer_tranches_octets(chiffre, key, executor)
+                return await loop.run_in_executor(local, decompresser_texte, morceaux, algorithme)
+            except ValueError as e:
+                return f"Erreur: {e}"
+
+        key_values = second.generate_key_values(key)
+
+        # Rejeter une clé incorrecte sur les premiers blocs, avant tout décodage
+        try:
+            debut = await loop.run_in_executor(local, prim.decoder_debut, message_chiffre,
+                                               moteur.longueur_empreinte_chiffree(key_values) + 1)
+        except:
+            return "Erreur: Le message chiffré est corrompu ou mal formaté."
+        try:
+            prim.controler_empreinte(moteur.texte_vers_points(debut), key_values)
+        except ValueError as e:
+            return f"Erreur: {e}"
+
+        # Le message est décodé par morceaux au fil des tranches
+        tranches = regrouper_textes(textes_decodes(message_chiffre, TAILLE_TRANCHE),
+                                    tranche_alignee(key_values['block_size']))
+        taches = ((dechiffrer_tranche_texte, tranche, key_values, position) for tranche, position in tranches)
+        try:
+            resultats = sans_empreinte(executer(taches, executor), len(key_values['fingerprint']))
+            morceaux = [morceau async for morceau in resultats]
+        except MessageCorrompu as e:
+            return f"Erreur: {e}"
+        return await loop.run_in_executor(local, "".join, morceaux)
+
+    except Exception as e:
+        return f"Erreur de déchiffrement: {str(e)}"
+
+async def dechiffrer_tranches_octets(donnees, key, executor=None):
+    """Déchiffre des octets par tranches et retourne la liste des tranches, sans l'empreinte."""
+    key_values = second.generate_key_values(key)
+    donnees = memoryview(donnees).cast('B')
+
+    longueur = moteur.longueur_empreinte_chiffree(key_values)
+    prim.controler_empreinte(array(moteur.TYPE_OCTETS, bytes(donnees[:longueur + 1])), key_values)
+
+    segments = prim.segments_alignes(donnees, tranche_alignee(key_values['block_size']))
+    taches = ((dechiffrer_tranche_octets, segment, key_values, position) for segment, position in segments)
+    resultats = sans_empreinte(executer(taches, executor), len(key_values['fingerprint']))
+    return [morceau async for morceau in resultats]
+
+async def dechiffrer_octets(donnees, key, executor=None):
+    """
+    Version asynchrone de prim.dechiffrer_octets.
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou les données trop courtes
+    """
+    morceaux = await dechiffrer_tranches_octets(donnees, key, executor)
+    return await asyncio.get_running_loop().run_in_executor(executor_local(executor), b"".join, morceaux)
+
+async def dechiffrer_octets_stream(reader, writer, key, executor=None, taille_lecture=TAILLE_TRANCHE):
+    """
+    Version asynchrone de prim.dechiffrer_octets_stream.
+
+    Returns:
+        int: Nombre d'octets écrits
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou les données trop courtes
+    """
+    key_values = second.generate_key_values(key)
+
+    # Vérifier la clé sur les premiers blocs avant d'écrire quoi que ce soit
+    longueur = moteur.longueur_empreinte_chiffree(key_values)
+    debut = bytearray()
+    while len(debut) <= longueur:
+        donnees = await reader.read(taille_lecture)
+        if not donnees:
+            break
+        debut += donnees
+    prim.controler_empreinte(array(moteur.TYPE_OCTETS, debut[:longueur + 1]), key_values)
+
+    segments = lire_segments(reader, tranche_alignee(key_values['block_size']), taille_lecture, debut)
+
+    async def taches():
+        async for segment, position in segments:
+            yield dechiffrer_tranche_octets, segment, key_values, position
+
+    # L'empreinte en tête du résultat n'est pas écrite
+    ecrits = 0
+    async for morceau in sans_empreinte(executer(taches(), executor), len(key_values['fingerprint'])):
+        writer.write(morceau)
+        await writer.drain()
+        ecrits += len(morceau)
+    return ecrits
+
+# Fichiers
+
+def verifier_io_executor(io_executor):
+    """
+    Raises:
+        TypeError: Si io_executor est un ProcessPoolExecutor
+    """
+    if isinstance(io_executor, ProcessPoolExecutor):
+        raise TypeError("Les entrées-sorties d'un fichier demandent un executor à threads.")
+
+class FichierAsynchrone:
+    """
+    Fichier binaire ouvert, lu et écrit avec l'interface des flux d'asyncio.
+
+    Les lectures et les écritures sont faites dans `io_executor`, un executor à
+    threads (celui de la boucle si None) : un fichier ouvert ne peut pas être
+    transmis à un autre processus, et le calcul reste confié à l'executor des
+    tranches, qui peut être un ProcessPoolExecutor.
+
+    Raises:
+        TypeError: Si io_executor est un ProcessPoolExecutor
+    """
+
+    def __init__(self, fichier, io_executor=None):
+        verifier_io_executor(io_executor)
+        self.fichier = fichier
+        self.io_executor = io_executor
+        self.en_attente = []
+
+    async def read(self, taille=-1):
+        return await asyncio.get_running_loop().run_in_executor(self.io_executor, self.fichier.read, taille)
+
+    def write(self, donnees):
+        self.en_attente.append(bytes(donnees))
+
+    async def drain(self):
+        """Écrit les données en attente."""
+        if self.en_attente:
+            donnees = b"".join(self.en_attente)
+            self.en_attente.clear()
+            await asyncio.get_running_loop().run_in_executor(self.io_executor, self.fichier.write, donnees)
+
+    async def close(self):
+        await asyncio.get_running_loop().run_in_executor(self.io_executor, self.fichier.close)
+
+def ouvrir_lecture(file_path, debut=0):
+    """Ouvre un fichier en lecture binaire, à la position `debut`."""
+    source = open(file_path, 'rb')
+    source.seek(debut)
+    return source
+
+def lire_entete_fichier(file_path):
+    """binaire.lire_entete sur un fichier désigné par son chemin."""
+    with open(file_path, 'rb') as source:
+        return binaire.lire_entete(source)
+
+@asynccontextmanager
+async def ouvrir_fichier(file_path, io_executor=None, debut=0):
+    """
+    Ouvre un fichier en lecture binaire à la position `debut`, dans io_executor,
+    et le fournit sous forme de FichierAsynchrone.
+    """
+    verifier_io_executor(io_executor)
+    source = FichierAsynchrone(
+        await asyncio.get_running_loop().run_in_executor(io_executor, ouvrir_lecture, file_path, debut),
+        io_executor)
+    try:
+        yield source
+    finally:
+        await source.close()
+
+async def remplacer_fichier(file_path, ecrire, io_executor=None):
+    """
+    Version asynchrone de prim.remplacer_fichier : attend ecrire(destination)
+    (un FichierAsynchrone sur un fichier temporaire voisin), puis remplace
+    l'original seulement en cas de succès. La création, la fermeture et le
+    remplacement des fichiers sont faits dans io_executor.
+    """
+    verifier_io_executor(io_executor)
+    loop = asyncio.get_running_loop()
+    fichier, chemin_temporaire = await loop.run_in_executor(io_executor, prim.ouvrir_temporaire, file_path, 'wb')
+    try:
+        destination = FichierAsynchrone(fichier, io_executor)
+        try:
+            await ecrire(destination)
+            await destination.drain()
+            await loop.run_in_executor(io_executor, prim.synchroniser, fichier)
+        finally:
+            await destination.close()
+        await loop.run_in_executor(io_executor, prim.installer_temporaire, chemin_temporaire, file_path)
+    finally:
+        await loop.run_in_executor(io_executor, prim.supprimer_temporaire, chemin_temporaire)
+
+async def chiffrer_fichier_texte(file_path, key, executor=None, io_executor=None):
+    """
+    Version asynchrone de prim.chiffrer_fichier_texte, au format binaire et sans
+    pré-compression : le fichier est lu, chiffré et écrit par tranches. Les
+    tranches sont chiffrées dans `executor`, les lectures et écritures faites
+    dans `io_executor` (voir FichierAsynchrone).
+    """
+    async def ecrire(destination):
+        async with ouvrir_fichier(file_path, io_executor) as source:
+            destination.write(binaire.entete(binaire.CONTENU_TEXTE))
+            await chiffrer_octets_stream(source, destination, key, executor)
+
+    await remplacer_fichier(file_path, ecrire, io_executor)
+
+async def dechiffrer_fichier_texte(file_path, key, executor=None, io_executor=None):
+    """
+    Version asynchrone de prim.dechiffrer_fichier_texte. Les fichiers au format
+    binaire sans pré-compression sont déchiffrés par tranches comme dans
+    chiffrer_fichier_texte ; les autres (ancien format texte, fichiers
+    pré-compressés) sont confiés entièrement à prim, dans `io_executor`.
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou si le fichier ne contient pas un texte chiffré
+    """
+    verifier_io_executor(io_executor)
+    loop = asyncio.get_running_loop()
+    entete = await loop.run_in_executor(io_executor, lire_entete_fichier, file_path)
+    if entete is None or entete['drapeaux']:
+        await loop.run_in_executor(io_executor, prim.dechiffrer_fichier_texte, file_path, key)
+        return
+    if entete['contenu'] != binaire.CONTENU_TEXTE:
+        raise ValueError("Le fichier ne contient pas un texte chiffré.")
+
+    async def ecrire(destination):
+        async with ouvrir_fichier(file_path, io_executor, binaire.ENTETE.size) as source:
+            await dechiffrer_octets_stream(source, destination, key, executor)
+
+    await remplacer_fichier(file_path, ecrire, io_executor)
@@ -0,0 +1,90 @@
+# Format binaire des fichiers chiffrés (.exegolencrypt)
+#
+# Un fichier binaire commence par un en-tête versionné, suivi directement des
+# octets chiffrés (sans conversion hexadécimale ni encodage sur 6 bits).
+# Les fichiers texte historiques ne contiennent que des caractères de
+# l'alphabet de secure_encode : l'octet 0x89 du nombre magique suffit à les
+# distinguer. Sans en-tête (octets bruts de chiffrer_octets), le contenu
+# tranche : un message binaire contient presque toujours des octets hors de
+# cet alphabet dès ses premiers octets (voir format_probable).
+
+import string
+import struct
+
+# Formats de sortie disponibles
+FORMAT_TEXTE = 'texte'
+FORMAT_BINAIRE = 'binaire'
+FORMAT_CONTENEUR = 'conteneur'
+
+MAGIC = b"\x89EXG"
+VERSION = 1
+
+# Nature du contenu chiffré
+CONTENU_ZIP = b"Z"
+CONTENU_CONTENEUR = b"C"
+CONTENU_BLOC = b"B"
+CONTENU_INSTANTANE = b"S"
+CONTENU_TEXTE = b"T"
+
+# Drapeaux : pré-compression des données avant chiffrement (voir
+# compression.ZLIB et compression.LZMA)
+DRAPEAUX_COMPRESSION = {'zlib': 0x01, 'lzma': 0x02}
+
+# En-tête : nombre magique, version, nature du contenu, drapeaux
+ENTETE = struct.Struct(">4sBcB")
+
+# Octets possibles d'un fichier texte historique : alphabet de secure_encode
+# (base64 urlsafe sans '='), plus les blancs qu'un éditeur a pu ajouter
+ALPHABET_TEXTE = (string.ascii_letters + string.digits + "-_" + string.whitespace).encode('ascii')
+
+# Nombre d'octets examinés pour reconnaître un message sans en-tête
+TAILLE_SONDE = 4096
+
+
+def entete(contenu, drapeaux=0):
+    """Octets de l'en-tête binaire."""
+    return ENTETE.pack(MAGIC, VERSION, contenu, drapeaux)
+
+def ecrire_entete(fichier, contenu, drapeaux=0):
+    """Écrit l'en-tête binaire au début du fichier."""
+    fichier.write(entete(contenu, drapeaux))
+
+def lire_entete(fichier):
+    """
+    Lit l'en-tête binaire d'un fichier ouvert en mode 'rb'.
+
+    Returns:
+        dict: Version, nature du contenu et drapeaux, ou None si le fichier n'est pas
+        au format binaire (la position de lecture est alors remise au début)
+
+    Raises:
+        ValueError: Si la version du format n'est pas prise en charge
+    """
+    donnees = fichier.read(ENTETE.size)
+    if len(donnees) < ENTETE.size or not donnees.startswith(MAGIC):
+        fichier.seek(0)
+        return None
+
+    _, version, contenu, drapeaux = ENTETE.unpack(donnees)
+    if version > VERSION:
+        raise ValueError(f"Version du format binaire non prise en charge : {version}")
+
+    return {'version': version, 'contenu': contenu, 'drapeaux': drapeaux}
+
+def format_probable(echantillon):
+    """
+    Format d'un message chiffré sans en-tête, d'après ses premiers octets.
+
+    Returns:
+        str: FORMAT_TEXTE si tous les octets sont dans ALPHABET_TEXTE, FORMAT_BINAIRE sinon
+    """
+    if echantillon and not bytes(echantillon).translate(None, ALPHABET_TEXTE):
+        return FORMAT_TEXTE
+    return FORMAT_BINAIRE
+
+def algorithme_compression(drapeaux):
+    """Algorithme de pré-compression indiqué par les drapeaux d'un en-tête, ou None."""
+    for algorithme, drapeau in DRAPEAUX_COMPRESSION.items():
+        if drapeaux & drapeau:
+            return algorithme
+    return None
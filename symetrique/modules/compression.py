@@ -0,0 +1,205 @@
+# Politique de compression des dossiers chiffrés
+#
+# Compresser des fichiers déjà compressés (images, vidéos, archives...) coûte
+# du temps sans rien gagner. Pour chaque fichier, la politique choisit entre
+# le stockage sans compression et deflate (avec un niveau réglable), d'après
+# son extension puis l'entropie d'un échantillon de ses premiers octets.
+
+import lzma
+import math
+import os
+import zlib
+from collections import Counter
+
+# Extensions des formats déjà compressés
+EXTENSIONS_COMPRESSEES = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif',
+    '.mp3', '.aac', '.m4a', '.ogg', '.opus', '.flac',
+    '.mp4', '.m4v', '.mkv', '.mov', '.avi', '.webm',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar', '.lz4',
+    '.docx', '.xlsx', '.pptx', '.odt', '.ods', '.odp', '.epub', '.jar', '.apk',
+    '.woff', '.woff2', '.exegolencrypt',
+})
+
+# Taille de l'échantillon dont on mesure l'entropie, et taille minimale pour
+# que la mesure ait un sens
+TAILLE_ECHANTILLON = 4096
+TAILLE_MIN_ECHANTILLON = 512
+
+# Politique par défaut : niveau deflate (0 pour ne jamais compresser), extensions
+# stockées sans compression et entropie (en bits par octet) au-delà de laquelle
+# un fichier est jugé incompressible
+POLITIQUE_DEFAUT = {
+    'niveau': 6,
+    'extensions_stockees': EXTENSIONS_COMPRESSEES,
+    'seuil_entropie': 7.5,
+}
+
+
+def entropie(donnees):
+    """Entropie de Shannon d'une suite d'octets, en bits par octet (de 0 à 8)."""
+    if not donnees:
+        return 0.0
+    total = len(donnees)
+    return -sum(nombre / total * math.log2(nombre / total) for nombre in Counter(donnees).values())
+
+def choisir_niveau(nom, echantillon, politique=None):
+    """
+    Choisit la compression d'un fichier.
+
+    Args:
+        nom (str): Nom ou chemin du fichier (pour son extension)
+        echantillon (bytes): Les premiers octets du fichier (TAILLE_ECHANTILLON)
+        politique (dict): Politique de compression (POLITIQUE_DEFAUT si None)
+
+    Returns:
+        int: 0 pour stocker le fichier sans compression, sinon le niveau deflate
+    """
+    politique = politique or POLITIQUE_DEFAUT
+    if not politique['niveau']:
+        return 0
+    if os.path.splitext(nom)[1].lower() in politique['extensions_stockees']:
+        return 0
+    if len(echantillon) >= TAILLE_MIN_ECHANTILLON and entropie(echantillon) >= politique['seuil_entropie']:
+        return 0
+    return politique['niveau']
+
+def nouveau_bilan():
+    """
+    Bilan de compression d'un dossier, complété par compter().
+
+    'octets_stockes' compte les octets des fichiers stockés sans compression,
+    'octets_gagnes' la réduction obtenue sur les fichiers compressés et
+    'duree_compression' le temps passé à compresser, en secondes.
+    """
+    return {
+        'fichiers_compresses': 0,
+        'fichiers_stockes': 0,
+        'octets_compresses': 0,
+        'octets_stockes': 0,
+        'octets_gagnes': 0,
+        'duree_compression': 0.0,
+    }
+
+def compter(bilan, taille, taille_compressee, duree, compresse):
+    """Ajoute un fichier au bilan (taille avant et après compression, durée de compression)."""
+    if bilan is None:
+        return
+    if compresse:
+        bilan['fichiers_compresses'] += 1
+        bilan['octets_compresses'] += taille
+        bilan['octets_gagnes'] += taille - taille_compressee
+        bilan['duree_compression'] += duree
+    else:
+        bilan['fichiers_stockes'] += 1
+        bilan['octets_stockes'] += taille
+
+def duree_economisee(bilan):
+    """
+    Estime le temps économisé en ne compressant pas les fichiers stockés, d'après
+    le débit de compression observé sur les autres fichiers.
+
+    Returns:
+        float: Durée en secondes, ou None si aucun fichier n'a été compressé
+    """
+    if not bilan['octets_compresses'] or not bilan['duree_compression']:
+        return None
+    return bilan['octets_stockes'] * bilan['duree_compression'] / bilan['octets_compresses']
+
+def resumer(bilan):
+    """Résumé lisible d'un bilan de compression."""
+    resume = (f"Compression : {bilan['fichiers_compresses']} fichier(s) compressé(s), "
+              f"{bilan['octets_gagnes']} octets gagnés en {bilan['duree_compression']:.2f} s ; "
+              f"{bilan['fichiers_stockes']} fichier(s) stocké(s) sans compression ({bilan['octets_stockes']} octets)")
+    duree = duree_economisee(bilan)
+    if duree is not None and bilan['fichiers_stockes']:
+        resume += f", environ {duree:.2f} s économisées"
+    return resume
+
+# Pré-compression des messages et fichiers texte avant chiffrement
+#
+# Le coût du chiffrement (et de l'encodage) croît avec la taille des données :
+# le texte et le JSON, très compressibles, sont compressés avant d'être chiffrés.
+# Une compression rapide d'un échantillon écarte les données incompressibles.
+# zlib convient aux petites entrées (en-tête minimal) ; au-delà de SEUIL_LZMA,
+# lzma avec un préréglage rapide compresse bien mieux le texte.
+
+ZLIB = 'zlib'
+LZMA = 'lzma'
+
+# En dessous de cette taille, le gain ne couvre pas l'en-tête du format compressé
+TAILLE_MIN_PRECOMPRESSION = 128
+SEUIL_LZMA = 64 * 1024
+PRESET_LZMA = 1
+
+# Taille maximale de l'échantillon compressé (relativement à l'original) pour
+# que les données soient jugées compressibles
+RATIO_MAX_SONDE = 0.9
+
+def choisir_precompression(taille, echantillon):
+    """
+    Choisit la pré-compression d'une entrée d'après sa taille et la compression
+    rapide (zlib, niveau 1) de ses premiers octets.
+
+    Args:
+        taille (int): Taille totale de l'entrée, en octets
+        echantillon (bytes): Les premiers octets de l'entrée
+
+    Returns:
+        str: ZLIB, LZMA, ou None pour ne pas compresser
+    """
+    if taille < TAILLE_MIN_PRECOMPRESSION:
+        return None
+    echantillon = echantillon[:TAILLE_ECHANTILLON]
+    if len(zlib.compress(echantillon, 1)) > RATIO_MAX_SONDE * len(echantillon):
+        return None
+    return LZMA if taille >= SEUIL_LZMA else ZLIB
+
+def compresseur(algorithme):
+    """Compresseur incrémental (compress, flush) pour un algorithme de pré-compression."""
+    if algorithme == LZMA:
+        return lzma.LZMACompressor(preset=PRESET_LZMA)
+    return zlib.compressobj()
+
+def decompresseur(algorithme):
+    """Décompresseur incrémental pour un algorithme de pré-compression."""
+    if algorithme == LZMA:
+        return lzma.LZMADecompressor()
+    return zlib.decompressobj()
+
+def compresser(donnees, algorithme):
+    objet = compresseur(algorithme)
+    return objet.compress(donnees) + objet.flush()
+
+def decompresser_flux(morceaux, algorithme):
+    """
+    Décompresse une suite de morceaux compressés au fil de l'eau : l'appelant peut
+    s'arrêter avant la fin sans que le reste soit décompressé.
+
+    Raises:
+        ValueError: Si les données compressées sont corrompues
+    """
+    objet = decompresseur(algorithme)
+    for morceau in morceaux:
+        try:
+            donnees = objet.decompress(morceau)
+        except (zlib.error, lzma.LZMAError) as e:
+            raise ValueError(f"Données compressées corrompues : {e}") from e
+        if donnees:
+            yield donnees
+
+def decompresser(donnees, algorithme):
+    """
+    Raises:
+        ValueError: Si les données compressées sont corrompues ou incomplètes
+    """
+    objet = decompresseur(algorithme)
+    try:
+        resultat = objet.decompress(donnees)
+        if algorithme != LZMA:
+            resultat += objet.flush()
+    except (zlib.error, lzma.LZMAError) as e:
+        raise ValueError(f"Données compressées corrompues : {e}") from e
+    if not objet.eof:
+        raise ValueError("Données compressées incomplètes.")
+    return resultat
@@ -0,0 +1,784 @@
+# Conteneur chiffré indexé (.exegolencrypt, contenu CONTENU_CONTENEUR)
+#
+# Structure du fichier :
+#   - l'en-tête binaire (voir binaire.py) ;
+#   - une entrée par fichier du dossier, éventuellement compressée (zlib), puis
+#     chiffrée indépendamment avec chiffrer_octets (empreinte de la clé comprise) ;
+#   - l'index chiffré de la même façon : un document JSON qui donne pour chaque
+#     entrée son nom, sa taille, sa date de modification et sa position ;
+#   - une fin de fichier de taille fixe qui indique la position de l'index.
+#
+# Les petits fichiers sont regroupés en paquets : leurs contenus sont mis bout à
+# bout, puis compressés et chiffrés d'un seul tenant, et l'index donne la
+# position de chacun dans son paquet ('decalage'). Cela évite de payer une
+# empreinte, une tâche et une entrée chiffrée par fichier lorsque le dossier
+# contient des millions de fichiers minuscules.
+#
+# Lister le contenu ne déchiffre que l'index, et extraire un fichier ne
+# déchiffre que son entrée (ou son paquet).
+#
+# Une mise à jour ajoute les entrées nouvelles ou modifiées à la fin du fichier,
+# suivies d'un nouvel index. Les fichiers supprimés sont marqués dans l'index et
+# l'espace des anciennes entrées n'est récupéré que par compacter_conteneur.
+#
+# Les fichiers sont compressés et chiffrés en parallèle (un fichier ou un paquet
+# par tâche, voir moteur.executer) ; un seul écrivain assemble les entrées dans l'ordre
+# du parcours du dossier, si bien que le conteneur ne dépend pas de workers.
+
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from collections import deque
+
+from . import binaire
+from . import compression
+from . import journal
+from . import moteur
+from . import prim
+
+# Version 2 : paquets de petits fichiers et index compressé
+VERSION_INDEX = 2
+
+# Fin du fichier : position et taille de l'index chiffré
+FIN = struct.Struct(">QQ")
+
+# Compression des entrées (champ 'compression' de l'index, None si aucune).
+# Le niveau est choisi fichier par fichier (voir compression.choisir_niveau).
+COMPRESSION_DEFLATE = 'deflate'
+
+# Jusqu'à cette taille, un fichier est compressé et chiffré en mémoire par sa
+# tâche ; au-delà, il est chiffré en flux dans un fichier temporaire
+TAILLE_MAX_MEMOIRE = 1 << 20
+
+# Les fichiers jusqu'à cette taille sont regroupés en paquets d'environ
+# TAILLE_PAQUET octets (taille_paquet=0 : un fichier par entrée)
+TAILLE_MAX_PETIT_FICHIER = 16 * 1024
+TAILLE_PAQUET = 1 << 20
+
+# Champs de l'index communs à tous les fichiers d'un paquet, enregistrés une
+# seule fois dans la liste 'paquets' de l'index
+CHAMPS_PAQUET = ('compression', 'position', 'taille_chiffree')
+
+
+class LecteurHache:
+    """Lecteur qui calcule l'empreinte SHA-256 des données lues au passage."""
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.hache = hashlib.sha256()
+        self.taille = 0
+
+    def read(self, taille=-1):
+        donnees = self.fichier.read(taille)
+        self.hache.update(donnees)
+        self.taille += len(donnees)
+        return donnees
+
+class LecteurCompresse:
+    """
+    Lecteur qui restitue les données d'un autre lecteur compressées par zlib (ou
+    par un autre compresseur incrémental, voir compression.compresseur), en
+    comptant la taille produite et le temps passé à compresser.
+    """
+
+    def __init__(self, fichier, niveau=zlib.Z_DEFAULT_COMPRESSION, compresseur=None):
+        self.fichier = fichier
+        self.compresseur = compresseur or zlib.compressobj(niveau)
+        self.termine = False
+        self.taille = 0
+        self.duree = 0.0
+
+    def read(self, taille):
+        # Le compresseur garde des données en réserve : lire jusqu'à produire
+        # quelque chose, une lecture vide signifiant la fin du flux
+        while not self.termine:
+            donnees = self.fichier.read(taille)
+            debut = time.perf_counter()
+            if donnees:
+                compresse = self.compresseur.compress(donnees)
+            else:
+                compresse = self.compresseur.flush()
+                self.termine = True
+            self.duree += time.perf_counter() - debut
+            if compresse:
+                self.taille += len(compresse)
+                return compresse
+        return b""
+
+class EcrivainDecompresse:
+    """
+    Écrivain qui décompresse (zlib, ou un autre décompresseur incrémental) les
+    données reçues avant de les écrire.
+    """
+
+    def __init__(self, fichier, decompresseur=None):
+        self.fichier = fichier
+        self.decompresseur = decompresseur or zlib.decompressobj()
+
+    def write(self, donnees):
+        self.fichier.write(self.decompresseur.decompress(donnees))
+        return len(donnees)
+
+    def terminer(self):
+        """Écrit la fin des données et vérifie que le flux compressé est complet."""
+        # Seul zlib garde des données en réserve (lzma restitue tout au fil de l'eau)
+        if hasattr(self.decompresseur, 'flush'):
+            self.fichier.write(self.decompresseur.flush())
+        if not self.decompresseur.eof:
+            raise ValueError("Entrée compressée incomplète.")
+
+class LecteurPlage:
+    """Lecteur limité à une plage d'un fichier binaire, pour déchiffrer une seule entrée."""
+
+    def __init__(self, fichier, position, taille):
+        self.fichier = fichier
+        self.fichier.seek(position)
+        self.restant = taille
+
+    def read(self, taille=-1):
+        if taille is None or taille < 0 or taille > self.restant:
+            taille = self.restant
+        donnees = self.fichier.read(taille)
+        self.restant -= len(donnees)
+        return donnees
+
+def lister_fichiers(chemin_dossier):
+    """
+    Fichiers d'un dossier, avec leur nom dans le conteneur : le chemin relatif au
+    dossier parent, comme dans les archives ZIP de chiffrer_dossier.
+
+    Le dossier est parcouru avec os.scandir, dont les entrées donnent leur type
+    sans appel système supplémentaire, et les noms sont construits au fil du
+    parcours plutôt qu'avec os.path.relpath.
+
+    Yields:
+        tuple: (chemin complet, nom dans le conteneur, os.stat_result du fichier)
+    """
+    a_parcourir = [(chemin_dossier, os.path.basename(os.path.abspath(chemin_dossier)))]
+    while a_parcourir:
+        dossier, prefixe = a_parcourir.pop()
+        # Un ordre de parcours fixe rend le conteneur reproductible
+        with os.scandir(dossier) as entrees:
+            entrees = sorted(entrees, key=lambda entree: entree.name)
+
+        sous_dossiers = []
+        for entree in entrees:
+            if entree.is_dir():
+                # Comme os.walk, ne pas suivre les liens vers des dossiers
+                if not entree.is_symlink():
+                    sous_dossiers.append((entree.path, prefixe + '/' + entree.name))
+            else:
+                yield entree.path, prefixe + '/' + entree.name, entree.stat()
+
+        # Parcours en profondeur, sous-dossiers dans l'ordre alphabétique
+        a_parcourir.extend(reversed(sous_dossiers))
+
+def creer_conteneur(chemin_dossier, cle, chemin_sortie, workers=None, politique=None, bilan=None,
+                    taille_paquet=TAILLE_PAQUET, reprendre=False):
+    """
+    Chiffre chaque fichier d'un dossier dans une entrée indépendante d'un conteneur indexé.
+
+    Args:
+        chemin_dossier (str): Dossier à chiffrer
+        cle (str): Clé de chiffrement
+        chemin_sortie (str): Chemin du conteneur à créer
+        workers (int): Nombre de processus qui compressent et chiffrent les fichiers
+        politique (dict): Politique de compression (compression.POLITIQUE_DEFAUT si None)
+        bilan (dict): Bilan de compression à compléter (voir compression.nouveau_bilan)
+        taille_paquet (int): Taille des paquets de petits fichiers (0 : pas de paquets)
+        reprendre (bool): Tenir un journal de reprise (voir creer_conteneur_reprenable)
+
+    Returns:
+        list: Les entrées de l'index
+    """
+    if reprendre:
+        return creer_conteneur_reprenable(chemin_dossier, cle, chemin_sortie, workers, politique, bilan,
+                                          taille_paquet)
+
+    with open(chemin_sortie, 'wb') as destination:
+        binaire.ecrire_entete(destination, binaire.CONTENU_CONTENEUR)
+        entrees = list(ecrire_entrees(destination, lister_fichiers(chemin_dossier), cle, workers,
+                                      politique, bilan, taille_paquet))
+        ecrire_index(destination, entrees, cle)
+    return entrees
+
+def creer_conteneur_reprenable(chemin_dossier, cle, chemin_sortie, workers=None, politique=None, bilan=None,
+                               taille_paquet=TAILLE_PAQUET):
+    """
+    creer_conteneur avec un journal de reprise (chemin_sortie + journal.SUFFIXE).
+
+    Chaque point de reprise donne les entrées écrites depuis le précédent, la
+    position atteinte et le SHA-256 des octets écrits entre les deux. Si le journal
+    d'un travail interrompu existe, ces octets sont relus et vérifiés point par
+    point : le conteneur est tronqué après le dernier point valide, puis seuls les
+    fichiers qui n'y figurent pas (ou qui ont changé depuis) sont chiffrés.
+    Le journal est supprimé une fois l'index écrit.
+    """
+    suivi = journal.Journal(chemin_sortie + journal.SUFFIXE, cle)
+    points = suivi.lire() if os.path.exists(chemin_sortie) else []
+    faites = {}
+    garder = 0
+    position = binaire.ENTETE.size
+
+    if points:
+        with open(chemin_sortie, 'rb') as sortie:
+            entete = binaire.lire_entete(sortie)
+            taille = sortie.seek(0, os.SEEK_END)
+            for point in points:
+                if entete is None or entete['contenu'] != binaire.CONTENU_CONTENEUR or point['position'] > taille:
+                    break
+                if empreinte_plage(sortie, position, point['position']) != point['empreinte']:
+                    break
+                faites.update((entree['nom'], entree) for entree in point['entrees'])
+                position = point['position']
+                garder += 1
+
+    suivi.ouvrir(garder)
+    try:
+        with open(chemin_sortie, 'r+b' if garder else 'w+b') as destination:
+            if garder:
+                destination.truncate(position)
+                destination.seek(position)
+            else:
+                binaire.ecrire_entete(destination, binaire.CONTENU_CONTENEUR)
+
+            # Les fichiers déjà chiffrés et inchangés gardent leur entrée
+            entrees = []
+            def a_chiffrer():
+                for chemin_complet, nom, infos in lister_fichiers(chemin_dossier):
+                    entree = faites.get(nom)
+                    if entree is not None and entree['taille'] == infos.st_size and entree['mtime'] == infos.st_mtime:
+                        entrees.append(entree)
+                    else:
+                        yield chemin_complet, nom, infos
+
+            nouvelles = []
+            for entree in ecrire_entrees(destination, a_chiffrer(), cle, workers, politique, bilan, taille_paquet):
+                nouvelles.append(entree)
+                if suivi.echeance():
+                    destination.flush()
+                    os.fsync(destination.fileno())
+                    fin = destination.tell()
+                    suivi.ecrire({'position': fin, 'empreinte': empreinte_plage(destination, position, fin),
+                                  'entrees': nouvelles})
+                    destination.seek(fin)
+                    entrees.extend(nouvelles)
+                    nouvelles, position = [], fin
+            entrees.extend(nouvelles)
+
+            ecrire_index(destination, entrees, cle)
+            destination.truncate()
+    finally:
+        suivi.fermer()
+    suivi.supprimer()
+    return entrees
+
+def empreinte_plage(fichier, debut, fin):
+    """SHA-256 (hexadécimal) des octets d'un fichier entre deux positions."""
+    hache = hashlib.sha256()
+    for trame in prim.lire_trames(LecteurPlage(fichier, debut, fin - debut)):
+        hache.update(trame)
+    return hache.hexdigest()
+
+def chiffrer_fichier(chemin_complet, cle, dossier_temporaire, politique=None):
+    """
+    Compresse puis chiffre un fichier : tâche exécutée par les processus de ecrire_entrees.
+
+    La politique de compression décide d'après l'extension et le début du fichier
+    s'il est compressé, et à quel niveau. Un petit fichier est traité en mémoire et
+    n'est gardé compressé que si cela réduit sa taille. Un gros fichier est
+    compressé et chiffré en flux dans un fichier temporaire de `dossier_temporaire`.
+
+    Returns:
+        dict: 'taille', 'mtime', 'sha256', 'compression' et 'taille_chiffree' de
+        l'entrée, plus les octets chiffrés ('donnees') ou leur 'chemin_temporaire',
+        et pour le bilan 'niveau', 'taille_compressee' et 'duree_compression'
+    """
+    infos = os.stat(chemin_complet)
+    resultat = {'mtime': infos.st_mtime, 'compression': None, 'duree_compression': 0.0}
+
+    if infos.st_size <= TAILLE_MAX_MEMOIRE:
+        with open(chemin_complet, 'rb') as fichier:
+            donnees = fichier.read()
+        resultat.update(taille=len(donnees), sha256=hashlib.sha256(donnees).hexdigest())
+        niveau = compression.choisir_niveau(chemin_complet, donnees[:compression.TAILLE_ECHANTILLON], politique)
+        return chiffrer_en_memoire(donnees, cle, niveau, resultat)
+
+    descripteur, chemin_temporaire = tempfile.mkstemp(dir=dossier_temporaire)
+    with open(chemin_complet, 'rb') as fichier, os.fdopen(descripteur, 'wb') as destination:
+        resultat['niveau'] = compression.choisir_niveau(chemin_complet, fichier.read(compression.TAILLE_ECHANTILLON),
+                                                        politique)
+        fichier.seek(0)
+        source = LecteurHache(fichier)
+        if resultat['niveau']:
+            lecteur = LecteurCompresse(source, resultat['niveau'])
+            taille_chiffree = prim.chiffrer_octets_stream(lecteur, destination, cle)
+            resultat.update(compression=COMPRESSION_DEFLATE, taille_compressee=lecteur.taille,
+                            duree_compression=lecteur.duree)
+        else:
+            taille_chiffree = prim.chiffrer_octets_stream(source, destination, cle)
+            resultat['taille_compressee'] = source.taille
+    resultat.update(taille=source.taille, sha256=source.hache.hexdigest(),
+                    taille_chiffree=taille_chiffree, chemin_temporaire=chemin_temporaire)
+    return resultat
+
+def chiffrer_paquet(fichiers, cle, politique=None):
+    """
+    Met bout à bout de petits fichiers, puis les compresse et les chiffre d'un seul
+    tenant : tâche exécutée par les processus de ecrire_entrees.
+
+    Args:
+        fichiers (list): Couples (chemin complet, date de modification)
+
+    Returns:
+        dict: La description de chaque fichier ('fichiers' : 'taille', 'mtime',
+        'sha256' et 'decalage' dans le paquet), puis les mêmes champs que
+        chiffrer_fichier pour le paquet
+    """
+    contenu = bytearray()
+    resultat = {'fichiers': [], 'compression': None, 'duree_compression': 0.0}
+    for chemin_complet, mtime in fichiers:
+        with open(chemin_complet, 'rb') as fichier:
+            donnees = fichier.read()
+        resultat['fichiers'].append({'taille': len(donnees), 'mtime': mtime,
+                                     'sha256': hashlib.sha256(donnees).hexdigest(), 'decalage': len(contenu)})
+        contenu += donnees
+
+    resultat['taille'] = len(contenu)
+    niveau = compression.choisir_niveau('', contenu[:compression.TAILLE_ECHANTILLON], politique)
+    return chiffrer_en_memoire(bytes(contenu), cle, niveau, resultat)
+
+def chiffrer_en_memoire(donnees, cle, niveau, resultat):
+    """
+    Compresse des données (si niveau n'est pas 0 et que cela réduit leur taille)
+    puis les chiffre, en complétant le résultat d'une tâche de ecrire_entrees.
+    """
+    resultat['niveau'] = niveau
+    if niveau:
+        debut = time.perf_counter()
+        compresse = zlib.compress(donnees, niveau)
+        resultat['duree_compression'] = time.perf_counter() - debut
+        if len(compresse) < len(donnees):
+            donnees = compresse
+            resultat['compression'] = COMPRESSION_DEFLATE
+    resultat['taille_compressee'] = len(donnees)
+    resultat['donnees'] = prim.chiffrer_octets(donnees, cle)
+    resultat['taille_chiffree'] = len(resultat['donnees'])
+    return resultat
+
+def ecrire_entrees(destination, fichiers, cle, workers=None, politique=None, bilan=None,
+                   taille_paquet=TAILLE_PAQUET):
+    """
+    Compresse et chiffre des fichiers sur `workers` processus, puis écrit leurs
+    entrées dans l'ordre à partir de la position courante du conteneur.
+
+    Les fichiers d'au plus TAILLE_MAX_PETIT_FICHIER octets sont regroupés en
+    paquets d'environ `taille_paquet` octets, une tâche par paquet.
+
+    Args:
+        destination: Conteneur ouvert en écriture binaire
+        fichiers (iterable): Triplets (chemin complet, nom dans le conteneur, os.stat_result)
+        cle (str): Clé de chiffrement
+        workers (int): Nombre de processus (None ou 1 : pas de parallélisme)
+        politique (dict): Politique de compression (compression.POLITIQUE_DEFAUT si None)
+        bilan (dict): Bilan de compression à compléter, ou None
+        taille_paquet (int): Taille des paquets de petits fichiers (0 : pas de paquets)
+
+    Yields:
+        dict: L'entrée de l'index de chaque fichier, dans l'ordre des tâches
+    """
+    dossier_temporaire = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(destination.name)))
+    try:
+        # Nom du fichier de chaque tâche, ou liste des noms pour un paquet
+        noms = deque()
+
+        def taches():
+            paquet, noms_paquet, taille = [], [], 0
+            for chemin_complet, nom, infos in fichiers:
+                if not taille_paquet or infos.st_size > TAILLE_MAX_PETIT_FICHIER:
+                    noms.append(nom)
+                    yield chiffrer_fichier, chemin_complet, cle, dossier_temporaire, politique
+                    continue
+
+                paquet.append((chemin_complet, infos.st_mtime))
+                noms_paquet.append(nom)
+                taille += infos.st_size
+                if taille >= taille_paquet:
+                    noms.append(noms_paquet)
+                    yield chiffrer_paquet, paquet, cle, politique
+                    paquet, noms_paquet, taille = [], [], 0
+            if paquet:
+                noms.append(noms_paquet)
+                yield chiffrer_paquet, paquet, cle, politique
+
+        for resultat in moteur.executer(taches(), workers):
+            position = destination.tell()
+            if 'donnees' in resultat:
+                destination.write(resultat['donnees'])
+            else:
+                with open(resultat['chemin_temporaire'], 'rb') as source:
+                    shutil.copyfileobj(source, destination, prim.TAILLE_TRAME)
+                os.remove(resultat['chemin_temporaire'])
+            compression.compter(bilan, resultat['taille'], resultat['taille_compressee'],
+                                resultat['duree_compression'], resultat['niveau'] != 0)
+
+            if 'fichiers' in resultat:
+                fichiers_tache = zip(noms.popleft(), resultat['fichiers'])
+            else:
+                fichiers_tache = [(noms.popleft(), resultat)]
+            for nom, fichier in fichiers_tache:
+                entree = {
+                    'nom': nom,
+                    'taille': fichier['taille'],
+                    'mtime': fichier['mtime'],
+                    'sha256': fichier['sha256'],
+                    'compression': resultat['compression'],
+                    'position': position,
+                    'taille_chiffree': resultat['taille_chiffree']
+                }
+                if 'decalage' in fichier:
+                    entree['decalage'] = fichier['decalage']
+                yield entree
+    finally:
+        shutil.rmtree(dossier_temporaire, ignore_errors=True)
+
+def ecrire_index(destination, entrees, cle):
+    """
+    Écrit l'index compressé et chiffré, puis la fin du fichier, à la position
+    courante. Les champs communs aux fichiers d'un même paquet n'y figurent qu'une
+    fois, dans 'paquets'.
+    """
+    # Numéro de chaque paquet, par position
+    numeros = {}
+    paquets = []
+    entrees_index = []
+    for entree in entrees:
+        if 'decalage' in entree:
+            if entree['position'] not in numeros:
+                numeros[entree['position']] = len(paquets)
+                paquets.append({champ: entree[champ] for champ in CHAMPS_PAQUET})
+            numero = numeros[entree['position']]
+            entree = {champ: valeur for champ, valeur in entree.items() if champ not in CHAMPS_PAQUET}
+            entree['paquet'] = numero
+        entrees_index.append(entree)
+
+    index = json.dumps({'version': VERSION_INDEX, 'entrees': entrees_index, 'paquets': paquets},
+                       ensure_ascii=False)
+    index_chiffre = prim.chiffrer_octets(zlib.compress(index.encode('utf-8')), cle)
+    position = destination.tell()
+    destination.write(index_chiffre)
+    destination.write(FIN.pack(position, len(index_chiffre)))
+
+def localiser_index(fichier):
+    """
+    Vérifie l'en-tête d'un conteneur ouvert en mode 'rb' et lit sa fin de fichier.
+
+    Returns:
+        tuple: Position et taille de l'index chiffré
+
+    Raises:
+        ValueError: Si le fichier n'est pas un conteneur ou s'il est incomplet
+    """
+    fichier.seek(0)
+    entete = binaire.lire_entete(fichier)
+    if entete is None or entete['contenu'] != binaire.CONTENU_CONTENEUR:
+        raise ValueError("Le fichier n'est pas un conteneur chiffré.")
+
+    debut = fichier.tell()
+    fin = fichier.seek(0, os.SEEK_END)
+    if fin - debut < FIN.size:
+        raise ValueError("Conteneur chiffré incomplet.")
+
+    fichier.seek(fin - FIN.size)
+    position, taille = FIN.unpack(fichier.read(FIN.size))
+    if position < debut or position + taille > fin - FIN.size:
+        raise ValueError("Conteneur chiffré incomplet.")
+    return position, taille
+
+def lire_index(fichier, cle):
+    """
+    Lit et déchiffre l'index d'un conteneur ouvert en mode 'rb'.
+
+    Returns:
+        list: Toutes les entrées du conteneur, y compris celles marquées 'supprime'
+
+    Raises:
+        ValueError: Si le fichier n'est pas un conteneur ou si la clé est incorrecte
+    """
+    position, taille = localiser_index(fichier)
+    fichier.seek(position)
+    donnees = prim.dechiffrer_octets(fichier.read(taille), cle)
+    # Les index de la version 1 ne sont pas compressés
+    if not donnees.startswith(b'{'):
+        donnees = zlib.decompress(donnees)
+    index = json.loads(donnees.decode('utf-8'))
+    if index['version'] > VERSION_INDEX:
+        raise ValueError(f"Version de l'index non prise en charge : {index['version']}")
+
+    # Les fichiers d'un paquet reprennent sa position, sa taille et sa compression
+    paquets = index.get('paquets', [])
+    for entree in index['entrees']:
+        if 'paquet' in entree:
+            entree.update(paquets[entree.pop('paquet')])
+    return index['entrees']
+
+def entrees_actives(entrees):
+    """Entrées de l'index qui ne sont pas marquées comme supprimées."""
+    return [entree for entree in entrees if not entree.get('supprime')]
+
+def lister_conteneur(chemin_conteneur, cle):
+    """
+    Liste le contenu d'un conteneur en ne déchiffrant que son index.
+
+    Returns:
+        list: Un dictionnaire par fichier (nom, taille, mtime, sha256, position, taille_chiffree)
+    """
+    with open(chemin_conteneur, 'rb') as fichier:
+        return entrees_actives(lire_index(fichier, cle))
+
+def chemin_extraction(dossier_sortie, nom):
+    """Chemin d'extraction d'une entrée, sans sortir du dossier de destination."""
+    dossier_sortie = os.path.abspath(dossier_sortie)
+    chemin = os.path.abspath(os.path.join(dossier_sortie, *nom.split('/')))
+    if os.path.commonpath([dossier_sortie, chemin]) != dossier_sortie or chemin == dossier_sortie:
+        raise ValueError(f"Nom d'entrée invalide : {nom}")
+    return chemin
+
+def lire_paquet(fichier, entree, cle, cache, workers=None):
+    """
+    Contenu déchiffré et décompressé du paquet d'une entrée. Le dernier paquet lu
+    reste dans `cache` (un dict), les fichiers d'un paquet se suivant dans l'index.
+    """
+    if cache.get('position') != entree['position']:
+        fichier.seek(entree['position'])
+        donnees = prim.dechiffrer_octets(fichier.read(entree['taille_chiffree']), cle, workers)
+        if entree.get('compression') == COMPRESSION_DEFLATE:
+            donnees = zlib.decompress(donnees)
+        cache.update(position=entree['position'], donnees=memoryview(donnees))
+    return cache['donnees']
+
+def extraire(fichier, entree, cle, dossier_sortie, workers=None, cache=None):
+    """
+    Déchiffre une entrée d'un conteneur ouvert dans le dossier de destination.
+    `cache` garde le dernier paquet déchiffré d'un appel à l'autre (voir lire_paquet).
+    """
+    chemin = chemin_extraction(dossier_sortie, entree['nom'])
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+    with open(chemin, 'wb') as destination:
+        # Un fichier vide non compressé ne laisse que l'empreinte, que
+        # dechiffrer_octets_stream refuserait comme message trop court
+        if entree['taille'] and 'decalage' in entree:
+            contenu = lire_paquet(fichier, entree, cle, {} if cache is None else cache, workers)
+            destination.write(contenu[entree['decalage']:entree['decalage'] + entree['taille']])
+        elif entree['taille']:
+            source = LecteurPlage(fichier, entree['position'], entree['taille_chiffree'])
+            if entree.get('compression') == COMPRESSION_DEFLATE:
+                ecrivain = EcrivainDecompresse(destination)
+                prim.dechiffrer_octets_stream(source, ecrivain, cle, workers=workers)
+                ecrivain.terminer()
+            else:
+                prim.dechiffrer_octets_stream(source, destination, cle, workers=workers)
+    os.utime(chemin, (entree['mtime'], entree['mtime']))
+    return chemin
+
+def extraire_entree(chemin_conteneur, cle, nom, dossier_sortie, workers=None):
+    """
+    Extrait un seul fichier d'un conteneur : seuls l'index et son entrée sont déchiffrés.
+
+    Returns:
+        str: Chemin du fichier extrait
+
+    Raises:
+        KeyError: Si le conteneur ne contient pas ce fichier
+    """
+    with open(chemin_conteneur, 'rb') as fichier:
+        for entree in entrees_actives(lire_index(fichier, cle)):
+            if entree['nom'] == nom:
+                return extraire(fichier, entree, cle, dossier_sortie, workers)
+    raise KeyError(nom)
+
+def extraire_conteneur(chemin_conteneur, cle, dossier_sortie, workers=None, reprendre=False):
+    """
+    Extrait tous les fichiers d'un conteneur dans le dossier de destination.
+
+    Avec reprendre=True, les fichiers extraits sont notés dans un journal de reprise
+    (journal.NOM_JOURNAL_EXTRACTION, dans le dossier de destination). Après une
+    interruption, les fichiers notés dont la taille et le SHA-256 sont corrects ne
+    sont pas extraits de nouveau. Le journal est supprimé à la fin de l'extraction.
+
+    Returns:
+        str: Le dossier de destination
+    """
+    os.makedirs(dossier_sortie, exist_ok=True)
+    cache = {}
+    with open(chemin_conteneur, 'rb') as fichier:
+        entrees = entrees_actives(lire_index(fichier, cle))
+        if not reprendre:
+            for entree in entrees:
+                extraire(fichier, entree, cle, dossier_sortie, workers, cache)
+            return dossier_sortie
+
+        suivi = journal.Journal(os.path.join(dossier_sortie, journal.NOM_JOURNAL_EXTRACTION), cle)
+        points = suivi.lire()
+        faites = {nom for point in points for nom in point['noms']}
+        suivi.ouvrir(len(points))
+        try:
+            noms = []
+            for entree in entrees:
+                if entree['nom'] in faites and fichier_extrait(chemin_extraction(dossier_sortie, entree['nom']), entree):
+                    continue
+                extraire(fichier, entree, cle, dossier_sortie, workers, cache)
+                noms.append(entree['nom'])
+                if suivi.echeance():
+                    suivi.ecrire({'noms': noms})
+                    noms = []
+        finally:
+            suivi.fermer()
+        suivi.supprimer()
+    return dossier_sortie
+
+def empreinte_fichier(chemin):
+    """SHA-256 (hexadécimal) du contenu d'un fichier."""
+    hache = hashlib.sha256()
+    with open(chemin, 'rb') as fichier:
+        for trame in prim.lire_trames(fichier):
+            hache.update(trame)
+    return hache.hexdigest()
+
+def fichier_extrait(chemin, entree):
+    """Indique si un fichier déjà extrait est complet : même taille et même SHA-256 que son entrée."""
+    if not os.path.isfile(chemin) or os.path.getsize(chemin) != entree['taille']:
+        return False
+    return empreinte_fichier(chemin) == entree['sha256']
+
+def fichier_modifie(chemin_complet, entree, infos=None):
+    """
+    Indique si un fichier diffère de son entrée : la taille et la date suffisent
+    lorsqu'elles sont identiques, sinon le contenu est comparé par son SHA-256.
+    `infos` évite un nouvel os.stat si le parcours du dossier l'a déjà fait.
+    """
+    infos = infos or os.stat(chemin_complet)
+    if infos.st_size != entree['taille']:
+        return True
+    if infos.st_mtime == entree['mtime']:
+        return False
+    return empreinte_fichier(chemin_complet) != entree.get('sha256')
+
+def mettre_a_jour_conteneur(chemin_dossier, cle, chemin_conteneur, workers=None, politique=None):
+    """
+    Met à jour un conteneur d'après le dossier source, sans tout rechiffrer.
+
+    Seuls les fichiers nouveaux ou modifiés sont chiffrés, dans de nouvelles entrées
+    ajoutées à la fin du conteneur avec un nouvel index ; les fichiers disparus sont
+    marqués 'supprime'. Les anciennes entrées restent dans le fichier jusqu'au
+    prochain compacter_conteneur. En cas d'erreur, le conteneur est ramené à son état
+    précédent.
+
+    Returns:
+        dict: Noms des fichiers 'ajoutes', 'modifies' et 'supprimes', nombre
+        'inchanges', 'espace_perdu' (octets que compacter_conteneur récupérerait)
+        et bilan de 'compression' des fichiers chiffrés
+    """
+    bilan = {'ajoutes': [], 'modifies': [], 'supprimes': [], 'inchanges': 0,
+             'compression': compression.nouveau_bilan()}
+
+    with open(chemin_conteneur, 'r+b') as conteneur:
+        entrees = lire_index(conteneur, cle)
+        taille_initiale = conteneur.seek(0, os.SEEK_END)
+        actives = {entree['nom']: entree for entree in entrees_actives(entrees)}
+        a_jour = []
+        a_chiffrer = []
+        index_modifie = False
+
+        try:
+            for chemin_complet, nom, infos in lister_fichiers(chemin_dossier):
+                entree = actives.pop(nom, None)
+                if entree is not None and not fichier_modifie(chemin_complet, entree, infos):
+                    # Contenu identique : seule la date est mise à jour
+                    mtime = infos.st_mtime
+                    index_modifie = index_modifie or mtime != entree['mtime']
+                    entree['mtime'] = mtime
+                    a_jour.append(entree)
+                    bilan['inchanges'] += 1
+                    continue
+                bilan['ajoutes' if entree is None else 'modifies'].append(nom)
+                a_chiffrer.append((chemin_complet, nom, infos))
+
+            # Les fichiers nouveaux ou modifiés sont chiffrés en parallèle, à la suite du conteneur
+            if a_chiffrer:
+                conteneur.seek(0, os.SEEK_END)
+                a_jour.extend(ecrire_entrees(conteneur, a_chiffrer, cle, workers, politique, bilan['compression']))
+                index_modifie = True
+
+            for nom, entree in actives.items():
+                entree['supprime'] = True
+                a_jour.append(entree)
+                bilan['supprimes'].append(nom)
+                index_modifie = True
+
+            # Garder les suppressions précédentes des fichiers qui n'ont pas réapparu
+            noms = {entree['nom'] for entree in a_jour}
+            a_jour.extend(entree for entree in entrees if entree.get('supprime') and entree['nom'] not in noms)
+
+            # Rien n'a changé : l'index actuel reste valable
+            if index_modifie:
+                ecrire_index(conteneur, a_jour, cle)
+        except BaseException:
+            # Retirer tout ce qui a été ajouté : l'ancien index redevient le dernier
+            conteneur.truncate(taille_initiale)
+            raise
+
+        bilan['espace_perdu'] = espace_perdu(conteneur, a_jour)
+
+    return bilan
+
+def espace_perdu(fichier, entrees):
+    """
+    Octets d'un conteneur qui ne servent plus (entrées remplacées ou supprimées,
+    anciens index) et que compacter_conteneur récupérerait.
+    """
+    _, taille_index = localiser_index(fichier)
+    utiles = binaire.ENTETE.size + taille_index + FIN.size
+    # Un paquet compte une fois, tant qu'un de ses fichiers est actif
+    utiles += sum({entree['position']: entree['taille_chiffree'] for entree in entrees_actives(entrees)}.values())
+    return fichier.seek(0, os.SEEK_END) - utiles
+
+def compacter_conteneur(chemin_conteneur, cle):
+    """
+    Réécrit un conteneur sans les entrées supprimées ni remplacées. Les entrées
+    actives sont recopiées telles quelles, sans être rechiffrées : un paquet dont
+    un seul fichier est encore actif est donc gardé en entier.
+
+    Returns:
+        int: Nombre d'octets récupérés
+    """
+    taille_initiale = os.path.getsize(chemin_conteneur)
+    descripteur, chemin_temporaire = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(chemin_conteneur)),
+                                                      suffix='.tmp')
+    try:
+        with open(chemin_conteneur, 'rb') as source, os.fdopen(descripteur, 'wb') as destination:
+            binaire.ecrire_entete(destination, binaire.CONTENU_CONTENEUR)
+            entrees = []
+            # Nouvelle position de chaque entrée ou paquet déjà recopié
+            positions = {}
+            for entree in entrees_actives(lire_index(source, cle)):
+                if entree['position'] not in positions:
+                    positions[entree['position']] = destination.tell()
+                    lecteur = LecteurPlage(source, entree['position'], entree['taille_chiffree'])
+                    for trame in prim.lire_trames(lecteur):
+                        destination.write(trame)
+                entrees.append(dict(entree, position=positions[entree['position']]))
+            ecrire_index(destination, entrees, cle)
+        shutil.copymode(chemin_conteneur, chemin_temporaire)
+        os.replace(chemin_temporaire, chemin_conteneur)
+    finally:
+        if os.path.exists(chemin_temporaire):
+            os.remove(chemin_temporaire)
+
+    return taille_initiale - os.path.getsize(chemin_conteneur)
@@ -0,0 +1,275 @@
+# Dépôt de sauvegardes dédupliquées
+#
+# Les fichiers sont découpés en blocs dont les frontières dépendent du contenu
+# (et non de la position) : une modification locale ne change que les blocs
+# qui l'entourent. Chaque bloc distinct est chiffré une seule fois avec la clé
+# du dossier ; un instantané n'est que la liste chiffrée des fichiers et de
+# leurs blocs.
+#
+# Structure du dépôt :
+#   blocs/<2 premiers caractères>/<identifiant>   un bloc chiffré
+#   instantanes/<nom>.exegolencrypt               un instantané chiffré
+#
+# L'identifiant d'un bloc est un HMAC-SHA256 de son contenu par la clé : il ne
+# révèle pas l'empreinte du contenu à qui ne connaît pas la clé.
+
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import deque
+
+from . import binaire
+from . import conteneur
+from . import moteur
+from . import prim
+
+VERSION_INSTANTANE = 1
+
+# Tailles des blocs : la taille moyenne vaut environ TAILLE_MIN + 8 Ko
+TAILLE_MIN = 2 * 1024
+TAILLE_MAX = 64 * 1024
+
+# Nombre d'octets lus à chaque étape du découpage
+TAILLE_LECTURE = 16 * 1024
+
+# Hachage glissant « gear » sur 16 bits : une frontière suit chaque octet dont
+# le hachage des FENETRE derniers octets a ses 13 bits de poids fort à zéro
+# (une chance sur 8192)
+FENETRE = 16
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:2], 'little') for i in range(256)]
+_GEAR_OCTETS = [bytes((valeur >> decalage) & 0xFF for valeur in _GEAR) for decalage in (0, 8)]
+_MASQUE_FRONTIERE = 0xFFF8
+
+_masques = {}
+
+
+def masques(nombre):
+    """Masques répétés sur `nombre` voies de 32 bits (voir drapeaux_frontieres)."""
+    if nombre not in _masques:
+        _masques.clear()
+        _masques[nombre] = (int.from_bytes(b"\xff\xff\x00\x00" * nombre, 'little'),
+                            int.from_bytes(_MASQUE_FRONTIERE.to_bytes(4, 'little') * nombre, 'little'))
+    return _masques[nombre]
+
+def drapeaux_frontieres(donnees):
+    """
+    Calcule le hachage glissant de chaque position et retourne un octet par position :
+    0 si une frontière de bloc peut suivre cet octet, 1 sinon.
+
+    Comme pour le XOR du moteur, chaque étape est une seule opération sur un grand
+    entier dont chaque voie de 32 bits contient le hachage d'une position. Le hachage
+    d'une fenêtre de 2w octets s'obtient à partir de celui des fenêtres de w octets,
+    d'où log2(FENETRE) étapes au lieu d'une boucle Python par octet.
+    """
+    nombre = len(donnees)
+    masque, masque_frontiere = masques(nombre)
+
+    voies = bytearray(4 * nombre)
+    voies[0::4] = donnees.translate(_GEAR_OCTETS[0])
+    voies[1::4] = donnees.translate(_GEAR_OCTETS[1])
+    hachage = int.from_bytes(voies, 'little')
+
+    largeur = 1
+    while largeur < FENETRE:
+        # h(i) += h(i - largeur) << largeur, sur chaque voie
+        hachage = (hachage + (hachage << (32 * largeur + largeur))) & masque
+        largeur *= 2
+
+    # Le bit 16 de chaque voie vaut 1 si et seulement si les bits testés ne sont pas tous nuls
+    retenues = ((hachage & masque_frontiere) + masque_frontiere) >> 16
+    return retenues.to_bytes(4 * nombre, 'little')[0::4]
+
+def decouper_blocs(fichier):
+    """
+    Découpe un fichier binaire en blocs de TAILLE_MIN à TAILLE_MAX octets dont les
+    frontières dépendent du contenu.
+
+    Yields:
+        bytes: Les blocs, dans l'ordre
+    """
+    tampon = b""
+    drapeaux = b""
+    contexte = b""
+    while True:
+        donnees = fichier.read(TAILLE_LECTURE)
+        if donnees:
+            # Les FENETRE - 1 octets précédents complètent le hachage des premières positions
+            drapeaux += drapeaux_frontieres(contexte + donnees)[len(contexte):]
+            contexte = (contexte + donnees)[-(FENETRE - 1):]
+            tampon += donnees
+
+        position = 0
+        while position < len(tampon):
+            frontiere = drapeaux.find(b"\x00", position + TAILLE_MIN - 1, position + TAILLE_MAX)
+            if frontiere >= 0:
+                fin = frontiere + 1
+            elif len(tampon) - position >= TAILLE_MAX:
+                fin = position + TAILLE_MAX
+            elif not donnees:
+                fin = len(tampon)
+            else:
+                break
+            yield tampon[position:fin]
+            position = fin
+
+        tampon = tampon[position:]
+        drapeaux = drapeaux[position:]
+        if not donnees:
+            return
+
+def identifiant_bloc(bloc, cle):
+    """Identifiant d'un bloc : HMAC-SHA256 de son contenu par la clé."""
+    return hmac.new(cle.encode('utf-8', 'surrogatepass'), bloc, hashlib.sha256).hexdigest()
+
+def chemin_bloc(chemin_depot, identifiant):
+    """Chemin du fichier d'un bloc dans le dépôt."""
+    return os.path.join(chemin_depot, 'blocs', identifiant[:2], identifiant)
+
+def chemin_instantane(chemin_depot, nom):
+    """Chemin du fichier d'un instantané dans le dépôt."""
+    if not nom or nom != os.path.basename(nom) or nom.startswith('.'):
+        raise ValueError(f"Nom d'instantané invalide : {nom}")
+    return os.path.join(chemin_depot, 'instantanes', nom + '.exegolencrypt')
+
+def chiffrer_bloc(bloc, cle):
+    """Chiffre un bloc au format binaire (en-tête compris)."""
+    return binaire.entete(binaire.CONTENU_BLOC) + prim.chiffrer_octets(bloc, cle)
+
+def ecrire_fichier(chemin, donnees):
+    """Écrit un fichier via un fichier temporaire, pour ne jamais laisser de fichier incomplet."""
+    os.makedirs(os.path.dirname(chemin), exist_ok=True)
+    chemin_temporaire = chemin + '.tmp'
+    with open(chemin_temporaire, 'wb') as fichier:
+        fichier.write(donnees)
+    os.replace(chemin_temporaire, chemin)
+
+def lire_fichier_chiffre(chemin, contenu, cle):
+    """Lit et déchiffre un bloc ou un instantané du dépôt."""
+    with open(chemin, 'rb') as fichier:
+        entete = binaire.lire_entete(fichier)
+        if entete is None or entete['contenu'] != contenu:
+            raise ValueError(f"Fichier du dépôt invalide : {chemin}")
+        return prim.dechiffrer_octets(fichier.read(), cle)
+
+def lister_instantanes(chemin_depot):
+    """
+    Liste les instantanés d'un dépôt, du plus ancien au plus récent.
+
+    Returns:
+        list: Les noms des instantanés
+    """
+    dossier = os.path.join(chemin_depot, 'instantanes')
+    if not os.path.isdir(dossier):
+        return []
+    chemins = [os.path.join(dossier, nom) for nom in os.listdir(dossier) if nom.endswith('.exegolencrypt')]
+    chemins.sort(key=os.path.getmtime)
+    return [os.path.basename(chemin)[:-len('.exegolencrypt')] for chemin in chemins]
+
+def lire_instantane(chemin_depot, cle, nom):
+    """
+    Déchiffre un instantané.
+
+    Returns:
+        dict: 'nom', 'date' et 'fichiers' (nom, taille, mtime et identifiants des blocs)
+    """
+    donnees = lire_fichier_chiffre(chemin_instantane(chemin_depot, nom), binaire.CONTENU_INSTANTANE, cle)
+    instantane = json.loads(donnees.decode('utf-8'))
+    if instantane['version'] > VERSION_INSTANTANE:
+        raise ValueError(f"Version de l'instantané non prise en charge : {instantane['version']}")
+    return instantane
+
+def sauvegarder(chemin_dossier, cle, chemin_depot, nom=None, workers=None):
+    """
+    Ajoute au dépôt un instantané du dossier.
+
+    Les fichiers dont la taille et la date n'ont pas changé depuis le dernier
+    instantané reprennent ses blocs sans être relus. Les autres sont découpés en
+    blocs et seuls les blocs absents du dépôt sont chiffrés (en parallèle avec
+    workers > 1).
+
+    Args:
+        chemin_dossier (str): Dossier à sauvegarder
+        cle (str): Clé du dépôt
+        chemin_depot (str): Dossier du dépôt (créé si besoin)
+        nom (str): Nom de l'instantané (par défaut la date et l'heure)
+        workers (int): Nombre de processus pour chiffrer les nouveaux blocs
+
+    Returns:
+        dict: 'instantane', nombre de 'fichiers', de 'fichiers_inchanges', de
+        'blocs_nouveaux' et 'octets_nouveaux' (taille des blocs chiffrés ajoutés)
+    """
+    if not cle:
+        raise ValueError("La clé ne peut pas être vide.")
+    nom = nom or time.strftime('%Y%m%d-%H%M%S')
+    chemin_sortie = chemin_instantane(chemin_depot, nom)
+    if os.path.exists(chemin_sortie):
+        raise ValueError(f"L'instantané existe déjà : {nom}")
+
+    # Le dernier instantané permet de ne pas relire les fichiers inchangés
+    precedents = lister_instantanes(chemin_depot)
+    connus = {}
+    if precedents:
+        for fichier in lire_instantane(chemin_depot, cle, precedents[-1])['fichiers']:
+            connus[fichier['nom']] = fichier
+
+    bilan = {'instantane': nom, 'fichiers': 0, 'fichiers_inchanges': 0, 'blocs_nouveaux': 0, 'octets_nouveaux': 0}
+    fichiers = []
+    deja_vus = set()
+
+    # Identifiants des blocs dont le chiffrement est en cours, dans l'ordre des tâches
+    a_ecrire = deque()
+
+    def taches():
+        """Découpe les fichiers modifiés et produit une tâche de chiffrement par nouveau bloc."""
+        for chemin_complet, nom_fichier, infos in conteneur.lister_fichiers(chemin_dossier):
+            precedent = connus.get(nom_fichier)
+            bilan['fichiers'] += 1
+            if precedent and precedent['taille'] == infos.st_size and precedent['mtime'] == infos.st_mtime:
+                fichiers.append(precedent)
+                bilan['fichiers_inchanges'] += 1
+                continue
+
+            identifiants = []
+            with open(chemin_complet, 'rb') as source:
+                for bloc in decouper_blocs(source):
+                    identifiant = identifiant_bloc(bloc, cle)
+                    identifiants.append(identifiant)
+                    if identifiant in deja_vus or os.path.exists(chemin_bloc(chemin_depot, identifiant)):
+                        continue
+                    deja_vus.add(identifiant)
+                    a_ecrire.append(identifiant)
+                    yield chiffrer_bloc, bloc, cle
+            fichiers.append({'nom': nom_fichier, 'taille': infos.st_size, 'mtime': infos.st_mtime,
+                             'blocs': identifiants})
+
+    for bloc_chiffre in moteur.executer(taches(), workers):
+        ecrire_fichier(chemin_bloc(chemin_depot, a_ecrire.popleft()), bloc_chiffre)
+        bilan['blocs_nouveaux'] += 1
+        bilan['octets_nouveaux'] += len(bloc_chiffre)
+
+    # L'instantané n'est écrit qu'une fois tous ses blocs présents dans le dépôt
+    instantane = {'version': VERSION_INSTANTANE, 'nom': nom, 'date': time.time(), 'fichiers': fichiers}
+    donnees = prim.chiffrer_octets(json.dumps(instantane, ensure_ascii=False).encode('utf-8'), cle)
+    ecrire_fichier(chemin_sortie, binaire.entete(binaire.CONTENU_INSTANTANE) + donnees)
+    return bilan
+
+def restaurer(chemin_depot, cle, nom, dossier_sortie):
+    """
+    Restaure un instantané dans le dossier de destination.
+
+    Returns:
+        str: Le dossier de destination
+    """
+    instantane = lire_instantane(chemin_depot, cle, nom)
+    os.makedirs(dossier_sortie, exist_ok=True)
+    for fichier in instantane['fichiers']:
+        chemin = conteneur.chemin_extraction(dossier_sortie, fichier['nom'])
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        with open(chemin, 'wb') as destination:
+            for identifiant in fichier['blocs']:
+                destination.write(lire_fichier_chiffre(chemin_bloc(chemin_depot, identifiant),
+                                                       binaire.CONTENU_BLOC, cle))
+        os.utime(chemin, (fichier['mtime'], fichier['mtime']))
+    return dossier_sortie
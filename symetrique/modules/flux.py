@@ -0,0 +1,212 @@
+# Flux d'octets entre threads
+#
+# Certaines bibliothèques (zipfile par exemple) écrivent leurs données au lieu
+# de les fournir à la demande. Un Tube relie un tel producteur, exécuté dans un
+# thread, à un consommateur qui le lit comme un fichier : les données passent
+# directement de l'un à l'autre, sans fichier intermédiaire, et la mémoire reste
+# bornée par la profondeur du tube (le producteur attend que le consommateur
+# ait lu).
+#
+# Le même principe superpose les entrées-sorties d'un fichier et le calcul :
+# un thread lit la source en avance (copier), un autre écrit le résultat en
+# différé (EcrivainDiffere), et le thread principal ne fait que chiffrer. Sur
+# un disque lent ou distant, la durée totale se rapproche du maximum des
+# lectures, du calcul et des écritures plutôt que de leur somme.
+
+import contextlib
+import queue
+import threading
+import time
+
+# Les écritures du producteur sont regroupées en morceaux de cette taille, et
+# au plus PROFONDEUR morceaux attendent d'être lus
+TAILLE_MORCEAU = 64 * 1024
+PROFONDEUR = 8
+
+
+class Tube:
+    """
+    Tube borné entre un producteur (write, fermer) et un consommateur (read).
+
+    'attente' cumule le temps passé par le producteur à attendre le consommateur,
+    pour le retirer de ses propres mesures.
+    """
+
+    def __init__(self, profondeur=PROFONDEUR, taille_morceau=TAILLE_MORCEAU):
+        self.file = queue.Queue(profondeur)
+        self.taille_morceau = taille_morceau
+        self.tampon = bytearray()
+        self.reste = bytearray()
+        self.fin = False
+        self.abandonne = False
+        self.attente = 0.0
+
+    def envoyer(self, morceau):
+        debut = time.perf_counter()
+        self.file.put(morceau)
+        self.attente += time.perf_counter() - debut
+
+    def write(self, donnees):
+        if self.abandonne:
+            raise BrokenPipeError("Le lecteur du tube a abandonné.")
+        self.tampon += donnees
+        if len(self.tampon) >= self.taille_morceau:
+            self.envoyer(bytes(self.tampon))
+            self.tampon.clear()
+        return len(donnees)
+
+    def flush(self):
+        pass
+
+    def fermer(self):
+        """Envoie les dernières données puis la fin du flux."""
+        if self.tampon and not self.abandonne:
+            self.envoyer(bytes(self.tampon))
+            self.tampon.clear()
+        self.envoyer(None)
+
+    def read(self, taille=-1):
+        while not self.fin and (taille is None or taille < 0 or len(self.reste) < taille):
+            morceau = self.file.get()
+            if morceau is None:
+                self.fin = True
+            else:
+                self.reste += morceau
+
+        if taille is None or taille < 0:
+            taille = len(self.reste)
+        donnees = bytes(self.reste[:taille])
+        del self.reste[:taille]
+        return donnees
+
+    def vider(self):
+        """Jette les morceaux en attente (le consommateur abandonne)."""
+        try:
+            while True:
+                self.file.get_nowait()
+        except queue.Empty:
+            pass
+
+@contextlib.contextmanager
+def produire(producteur, *args, profondeur=PROFONDEUR):
+    """
+    Exécute producteur(tube, *args) dans un thread et fournit le tube à lire.
+
+    À la sortie du bloc, le producteur est attendu (et débloqué si le consommateur
+    s'est arrêté avant la fin du flux) ; son éventuelle erreur est alors relevée.
+
+    Exemple :
+        with flux.produire(ecrire_zip, chemin_dossier) as archive:
+            chiffrer_octets_stream(archive, destination, cle)
+    """
+    tube = Tube(profondeur)
+    erreurs = []
+
+    def executer():
+        try:
+            producteur(tube, *args)
+        except BaseException as e:
+            erreurs.append(e)
+        finally:
+            tube.fermer()
+
+    thread = threading.Thread(target=executer, daemon=True)
+    thread.start()
+    try:
+        yield tube
+    finally:
+        tube.abandonne = True
+        while thread.is_alive():
+            tube.vider()
+            thread.join(0.01)
+
+    # Une erreur du producteur tronque le flux : elle prime sur le résultat du consommateur
+    if erreurs and not isinstance(erreurs[0], BrokenPipeError):
+        raise erreurs[0]
+
+def copier(destination, source, taille_morceau=TAILLE_MORCEAU):
+    """Producteur qui recopie un fichier dans un tube (lecture anticipée)."""
+    while True:
+        donnees = source.read(taille_morceau)
+        if not donnees:
+            return
+        destination.write(donnees)
+
+class EcrivainDiffere:
+    """
+    Écrivain qui confie les écritures à un thread : write() rend la main dès que
+    les données sont en file, et n'attend que lorsque `profondeur` écritures sont
+    déjà en attente.
+
+    Une erreur d'écriture est relevée au write() suivant ou à fermer().
+    """
+
+    def __init__(self, fichier, profondeur=PROFONDEUR):
+        self.fichier = fichier
+        self.file = queue.Queue(profondeur)
+        self.erreurs = []
+        self.thread = threading.Thread(target=self.executer, daemon=True)
+        self.thread.start()
+
+    def executer(self):
+        while True:
+            donnees = self.file.get()
+            if donnees is None:
+                return
+            if not self.erreurs:
+                try:
+                    self.fichier.write(donnees)
+                except BaseException as e:
+                    self.erreurs.append(e)
+
+    def write(self, donnees):
+        if self.erreurs:
+            raise self.erreurs[0]
+        self.file.put(bytes(donnees))
+        return len(donnees)
+
+    def flush(self):
+        pass
+
+    def fermer(self):
+        """Attend la fin des écritures en attente et relève leur éventuelle erreur."""
+        if self.thread.is_alive():
+            self.file.put(None)
+            self.thread.join()
+        if self.erreurs:
+            raise self.erreurs[0]
+
+@contextlib.contextmanager
+def differer(fichier, profondeur=PROFONDEUR):
+    """
+    EcrivainDiffere vers `fichier`, fermé (écritures terminées) à la sortie du bloc.
+    Avec profondeur=0, le fichier lui-même est fourni : les écritures restent synchrones.
+    """
+    if not profondeur:
+        yield fichier
+        return
+    ecrivain = EcrivainDiffere(fichier, profondeur)
+    try:
+        yield ecrivain
+    finally:
+        ecrivain.fermer()
+
+@contextlib.contextmanager
+def pipeline(source, destination, profondeur=PROFONDEUR):
+    """
+    Lecteur et écrivain qui superposent les entrées-sorties de deux fichiers au
+    calcul fait entre les deux : `source` est lu en avance dans un thread et les
+    écritures vers `destination` sont faites dans un autre, au plus `profondeur`
+    morceaux attendant de chaque côté. Avec profondeur=0, les fichiers eux-mêmes
+    sont fournis (traitement séquentiel).
+
+    Exemple :
+        with flux.pipeline(source, destination) as (lecteur, ecrivain):
+            chiffrer_octets_stream(lecteur, ecrivain, cle)
+    """
+    if not profondeur:
+        yield source, destination
+        return
+    with differer(destination, profondeur) as ecrivain:
+        with produire(copier, source, profondeur=profondeur) as lecteur:
+            yield lecteur, ecrivain
@@ -0,0 +1,109 @@
+# Journal de reprise des travaux longs (chiffrement et extraction de conteneurs)
+#
+# Pendant le travail, des points de reprise sont ajoutés régulièrement à un
+# fichier voisin : les entrées terminées et, pour un chiffrement, la position
+# atteinte dans le fichier produit. Si le travail est interrompu, il reprend
+# au dernier point de reprise vérifié au lieu de repartir de zéro.
+#
+# Chaque point de reprise est un document JSON chiffré avec la clé du travail
+# (les noms des fichiers n'apparaissent pas en clair), précédé de sa taille. Un
+# point incomplet ou illisible (arrêt brutal pendant son écriture) termine le
+# journal.
+
+import json
+import os
+import struct
+import time
+
+from . import prim
+
+# Taille de chaque point de reprise chiffré
+TAILLE_POINT = struct.Struct(">I")
+
+# Secondes entre deux points de reprise
+INTERVALLE = 2.0
+
+# Suffixe du journal d'un conteneur en cours de chiffrement, et nom du journal
+# d'une extraction dans le dossier de destination
+SUFFIXE = '.journal'
+NOM_JOURNAL_EXTRACTION = '.exegolencrypt.journal'
+
+
+class Journal:
+    """
+    Journal de points de reprise chiffrés.
+
+    Exemple :
+        suivi = Journal(chemin, cle)
+        for point in suivi.lire():
+            ...  # vérifier chaque point, en garder un certain nombre
+        suivi.ouvrir(garder)
+        if suivi.echeance():
+            suivi.ecrire({'entrees': [...]})
+        suivi.supprimer()
+    """
+
+    def __init__(self, chemin, cle, intervalle=INTERVALLE):
+        self.chemin = chemin
+        self.cle = cle
+        self.intervalle = intervalle
+        self.fichier = None
+        # Position de la fin de chaque point lu
+        self.fins = []
+        self.dernier = time.monotonic()
+
+    def lire(self):
+        """
+        Points de reprise lisibles du journal, dans l'ordre (aucun s'il n'existe pas).
+
+        Returns:
+            list: Les points de reprise (dicts)
+        """
+        points = []
+        self.fins = []
+        if not os.path.exists(self.chemin):
+            return points
+
+        with open(self.chemin, 'rb') as fichier:
+            while True:
+                taille = fichier.read(TAILLE_POINT.size)
+                if len(taille) < TAILLE_POINT.size:
+                    break
+                donnees = fichier.read(TAILLE_POINT.unpack(taille)[0])
+                try:
+                    points.append(json.loads(prim.dechiffrer_octets(donnees, self.cle).decode('utf-8')))
+                except ValueError:
+                    break
+                self.fins.append(fichier.tell())
+        return points
+
+    def ouvrir(self, garder=0):
+        """Ouvre le journal en ajout, en ne gardant que ses `garder` premiers points."""
+        fin = self.fins[garder - 1] if garder else 0
+        self.fichier = open(self.chemin, 'r+b' if os.path.exists(self.chemin) else 'wb')
+        self.fichier.truncate(fin)
+        self.fichier.seek(fin)
+        self.dernier = time.monotonic()
+
+    def echeance(self):
+        """Indique s'il est temps d'écrire un nouveau point de reprise."""
+        return time.monotonic() - self.dernier >= self.intervalle
+
+    def ecrire(self, point):
+        """Ajoute un point de reprise et le transmet au système."""
+        donnees = prim.chiffrer_octets(json.dumps(point, ensure_ascii=False).encode('utf-8'), self.cle)
+        self.fichier.write(TAILLE_POINT.pack(len(donnees)) + donnees)
+        self.fichier.flush()
+        os.fsync(self.fichier.fileno())
+        self.dernier = time.monotonic()
+
+    def fermer(self):
+        if self.fichier is not None:
+            self.fichier.close()
+            self.fichier = None
+
+    def supprimer(self):
+        """Ferme et supprime le journal, une fois le travail terminé."""
+        self.fermer()
+        if os.path.exists(self.chemin):
+            os.remove(self.chemin)
@@ -0,0 +1,302 @@
+# Moteur de chiffrement à temps linéaire
+#
+# Chaque étape de chiffrer/dechiffrer travaille sur des tableaux préalloués
+# (array) de points de code au lieu de concaténer des chaînes caractère par
+# caractère. Le format produit est strictement identique à l'historique.
+# Les mêmes étapes s'appliquent à des tableaux d'octets pour le format binaire.
+# Si NumPy est installé, les segments volumineux passent par moteur_numpy.
+# Chaque segment ne dépend que de sa position et de la clé, ce qui permet de
+# répartir le travail sur plusieurs processus (paramètre workers).
+
+import sys
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import gcd
+
+try:
+    from . import moteur_numpy
+except ImportError:
+    # NumPy absent : le moteur reste en Python pur
+    moteur_numpy = None
+
+# Utiliser la variante NumPy lorsqu'elle est disponible (peut être désactivée)
+NUMPY_ACTIF = moteur_numpy is not None
+
+# En dessous de cette taille, le coût de conversion vers NumPy dépasse le gain
+SEUIL_NUMPY = 4096
+
+# Type d'entier non signé sur 32 bits pour stocker les points de code Unicode
+TYPE_POINTS = next(t for t in 'IL' if array(t).itemsize == 4)
+
+# Type des tableaux d'octets, pour chiffrer directement des données binaires
+TYPE_OCTETS = 'B'
+
+# Réduction appliquée après le XOR (le `% 65536` historique pour le texte)
+_MASQUES = {TYPE_POINTS: 0xFFFF, TYPE_OCTETS: 0xFF}
+
+# Codec UTF-32 dans l'ordre natif des octets, pour passer de str à array sans boucle Python
+_CODEC_POINTS = 'utf-32-le' if sys.byteorder == 'little' else 'utf-32-be'
+
+
+def texte_vers_points(texte):
+    """Convertit une chaîne en tableau de points de code."""
+    points = array(TYPE_POINTS)
+    points.frombytes(texte.encode(_CODEC_POINTS, 'surrogatepass'))
+    return points
+
+def octets_vers_points(donnees):
+    """Copie des octets (bytes, memoryview, mmap...) dans un tableau d'octets du moteur."""
+    points = array(TYPE_OCTETS)
+    points.frombytes(donnees)
+    return points
+
+def points_vers_texte(points):
+    """Convertit un tableau de points de code en chaîne."""
+    # Décodage direct depuis le tampon du tableau, sans copie intermédiaire en bytes
+    return str(points, _CODEC_POINTS, 'surrogatepass')
+
+def repeter(motif, typecode, nombre, debut=0):
+    """
+    Répète un motif périodique pour couvrir `nombre` positions à partir de `debut`.
+
+    Args:
+        motif (tuple, list ou array): Une période complète du motif
+        typecode (str): Type du tableau produit
+        nombre (int): Nombre de valeurs à produire
+        debut (int): Position absolue de la première valeur
+
+    Returns:
+        array: Les valeurs motif[(debut + i) % len(motif)] pour i dans [0, nombre)
+    """
+    periode = len(motif)
+    phase = debut % periode
+    if phase + nombre <= periode:
+        # Segment court : seule la partie utile du motif est convertie
+        return array(typecode, motif[phase:phase + nombre])
+    tours = (phase + nombre) // periode + 1
+    if not (isinstance(motif, array) and motif.typecode == typecode):
+        motif = array(typecode, motif)
+    return (motif * tours)[phase:phase + nombre]
+
+def inserer_leurres(points, leurres):
+    """Intercale un leurre après chaque point de code."""
+    expanded = array(points.typecode, bytes(points.itemsize * 2 * len(points)))
+    expanded[0::2] = points
+    expanded[1::2] = leurres
+    return expanded
+
+def transposer(points, block_size):
+    """
+    Inverse chaque bloc de `block_size` éléments (le dernier bloc peut être incomplet).
+    L'opération est sa propre inverse.
+    """
+    resultat = array(points.typecode, points)
+    complet = len(points) - len(points) % block_size
+
+    # Une affectation par tranche pour chaque position dans le bloc
+    for position in range(block_size):
+        resultat[position:complet:block_size] = points[block_size - 1 - position:complet:block_size]
+
+    # Dernier bloc incomplet
+    resultat[complet:] = points[complet:][::-1]
+    return resultat
+
+def appliquer_xor(points, tables_xor, debut=0):
+    """
+    Applique un XOR périodique avec les valeurs de la clé, puis réduit chaque
+    valeur à 16 bits pour du texte (équivalent au `% 65536` historique) ou à
+    8 bits pour des octets.
+
+    Le XOR est réalisé en une seule opération sur de grands entiers, ce qui reste
+    linéaire en la taille des données. `tables_xor` vient de key_values et `debut`
+    est la position absolue du premier élément, qui fixe la phase de la clé.
+    """
+    if not points:
+        return array(points.typecode)
+
+    masque = _MASQUES[points.typecode]
+    flux = repeter(tables_xor[masque], points.typecode, len(points), debut)
+    taille = len(points) * points.itemsize
+    valeur = int.from_bytes(points.tobytes(), 'little') ^ int.from_bytes(flux.tobytes(), 'little')
+
+    # Inutile sur des octets : les deux opérandes tiennent déjà dans le masque
+    if points.typecode != TYPE_OCTETS:
+        valeur &= int.from_bytes(array(points.typecode, [masque]).tobytes() * len(points), 'little')
+
+    resultat = array(points.typecode)
+    resultat.frombytes(valeur.to_bytes(taille, 'little'))
+    return resultat
+
+def preparer_tables(key_values, typecode):
+    """
+    Copie de key_values dont les leurres et les tables du XOR sont déjà convertis
+    en tableaux de type `typecode`, pour ne pas les reconvertir à chaque appel
+    lorsque de nombreux messages courts sont chiffrés avec la même clé.
+    """
+    tables = dict(key_values)
+    tables['leurres'] = array(typecode, key_values['leurres'])
+    tables['tables_xor'] = {masque: array(typecode, valeurs) for masque, valeurs in key_values['tables_xor'].items()
+                            if masque <= _MASQUES[typecode]}
+    return tables
+
+def unite_chiffrement(block_size):
+    """
+    Plus petit nombre de caractères dont l'expansion (leurres compris) couvre
+    un nombre entier de blocs de transposition.
+    """
+    return block_size // gcd(2, block_size)
+
+def longueur_empreinte_chiffree(key_values):
+    """
+    Nombre d'éléments en tête d'un message chiffré décodé qui suffisent à retrouver
+    l'empreinte de la clé : les blocs de transposition complets qui couvrent
+    l'empreinte et ses leurres.
+    """
+    block_size = key_values['block_size']
+    return -(-2 * len(key_values['fingerprint']) // block_size) * block_size
+
+def chiffrer_points(processed, key_values, debut=0):
+    """
+    Étapes 3 à 5 du chiffrement : leurres, transposition par blocs et XOR.
+
+    Args:
+        processed (array): Empreinte de la clé suivie du message (ou un segment de ceux-ci)
+        key_values (dict): Valeurs dérivées de la clé (second.generate_key_values)
+        debut (int): Position absolue du segment, multiple de unite_chiffrement(block_size)
+
+    Returns:
+        array: Points de code chiffrés, prêts pour l'encodage final
+    """
+    if NUMPY_ACTIF and len(processed) >= SEUIL_NUMPY:
+        return moteur_numpy.chiffrer_points(processed, key_values, debut)
+
+    leurres = repeter(key_values['leurres'], processed.typecode, len(processed), debut)
+    expanded = inserer_leurres(processed, leurres)
+    transposed = transposer(expanded, key_values['block_size'])
+    return appliquer_xor(transposed, key_values['tables_xor'], 2 * debut)
+
+def dechiffrer_points(points, key_values, debut=0):
+    """
+    Inverse les étapes XOR, transposition et leurres. L'empreinte de la clé
+    reste en tête du résultat et doit être vérifiée par l'appelant.
+
+    `debut` est la position absolue du segment dans le message chiffré décodé,
+    multiple de block_size.
+    """
+    if NUMPY_ACTIF and len(points) >= SEUIL_NUMPY:
+        return moteur_numpy.dechiffrer_points(points, key_values, debut)
+
+    unxored = appliquer_xor(points, key_values['tables_xor'], debut)
+    untransposed = transposer(unxored, key_values['block_size'])
+    return untransposed[debut % 2::2]
+
+def chiffrer_dans(entete, donnees, sortie, key_values):
+    """
+    Chiffre `entete` suivi des octets de `donnees` directement dans le tampon
+    `sortie`, de 2 * (len(entete) + len(donnees)) octets. Nécessite NumPy
+    (NUMPY_ACTIF) : voir moteur_numpy.chiffrer_dans.
+    """
+    moteur_numpy.chiffrer_dans(entete, donnees, sortie, key_values)
+
+def dechiffrer_dans(donnees, sortie, key_values, a_sauter):
+    """
+    Déchiffre les octets de `donnees` directement dans le tampon `sortie`, sans
+    les `a_sauter` premiers éléments. Nécessite NumPy (NUMPY_ACTIF) : voir
+    moteur_numpy.dechiffrer_dans.
+    """
+    moteur_numpy.dechiffrer_dans(donnees, sortie, key_values, a_sauter)
+
+def decouper(trames, unite):
+    """
+    Regroupe une suite de trames de taille quelconque en segments dont la
+    longueur est un multiple de `unite` (sauf le dernier).
+
+    Yields:
+        tuple: (segment, position absolue du segment)
+    """
+    position = 0
+    reste = None
+
+    for trame in trames:
+        if reste is None:
+            reste = array(trame.typecode)
+        reste.extend(trame)
+
+        # Seuls les blocs complets peuvent être transposés avant la fin du flux
+        nombre = len(reste) - len(reste) % unite
+        if nombre:
+            yield reste[:nombre], position
+            position += nombre
+            del reste[:nombre]
+
+    # Le dernier bloc, éventuellement incomplet
+    if reste:
+        yield reste, position
+
+def executer(taches, workers=None):
+    """
+    Exécute des tâches (fonction, *arguments) et produit leurs résultats dans l'ordre.
+
+    Avec workers > 1, les tâches sont réparties sur un ProcessPoolExecutor, avec au
+    plus 2 * workers tâches en cours pour garder une mémoire bornée.
+    """
+    if not workers or workers <= 1:
+        for fonction, *arguments in taches:
+            yield fonction(*arguments)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        en_cours = deque()
+        for fonction, *arguments in taches:
+            en_cours.append(executor.submit(fonction, *arguments))
+            if len(en_cours) >= 2 * workers:
+                yield en_cours.popleft().result()
+        while en_cours:
+            yield en_cours.popleft().result()
+
+def chiffrer_trames(trames, key_values, workers=None):
+    """
+    Chiffre une suite de trames de taille quelconque en gardant l'état entre
+    elles (position des leurres, alignement des blocs et phase du XOR).
+
+    Chaque segment ne dépend que de sa position absolue et de la clé : avec
+    workers > 1, les segments sont chiffrés en parallèle sur plusieurs processus
+    et le résultat reste identique.
+
+    Args:
+        trames (iterable): Tableaux de points de code, empreinte de la clé en tête
+        key_values (dict): Valeurs dérivées de la clé
+        workers (int): Nombre de processus (None ou 1 : pas de parallélisme)
+
+    Yields:
+        array: Points de code chiffrés, dans l'ordre
+    """
+    segments = decouper(trames, unite_chiffrement(key_values['block_size']))
+    taches = ((chiffrer_points, segment, key_values, position) for segment, position in segments)
+    return executer(taches, workers)
+
+def dechiffrer_trames(trames, key_values, workers=None):
+    """
+    Déchiffre une suite de trames de points de code décodés en gardant l'état
+    entre elles, éventuellement sur plusieurs processus. L'empreinte de la clé
+    reste en tête du résultat.
+
+    Yields:
+        array: Points de code déchiffrés (leurres retirés), dans l'ordre
+    """
+    segments = decouper(trames, key_values['block_size'])
+    taches = ((dechiffrer_points, segment, key_values, position) for segment, position in segments)
+    return executer(taches, workers)
+
+def trancher(points, taille):
+    """Découpe un tableau en trames de `taille` éléments."""
+    for debut in range(0, len(points), taille):
+        yield points[debut:debut + taille]
+
+def concatener(morceaux, typecode):
+    """Concatène des tableaux dans un seul tableau."""
+    resultat = array(typecode)
+    for morceau in morceaux:
+        resultat.extend(morceau)
+    return resultat
@@ -0,0 +1,273 @@
+# Variante vectorisée du moteur de chiffrement (optionnelle, nécessite NumPy)
+#
+# Le segment est traité par tranches d'environ TAILLE_TRANCHE points, assez
+# petites pour que les tableaux intermédiaires restent dans le cache du
+# processeur. Pour chaque tranche, l'insertion des leurres et la transposition
+# par blocs sont une seule lecture indexée (indices précalculés par taille de
+# bloc), suivie du XOR avec un motif commun à toutes les tranches. Le texte est
+# traité sur 16 bits, la largeur du résultat après le `% 65536` historique.
+# Le module moteur l'utilise automatiquement lorsque NumPy est installé et
+# retombe sur le Python pur sinon. Les tampons de travail d'une clé sont gardés
+# d'un appel à l'autre, propres à chaque fil d'exécution (voir _espace_travail).
+
+import threading
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+
+# Types NumPy correspondant aux tableaux du moteur, avec le masque appliqué après
+# le XOR et le type (de la largeur du masque) utilisé pour les calculs
+_TYPES = {
+    'B': (np.uint8, 0xFF, np.uint8),
+}
+for _typecode in 'IL':
+    if array(_typecode).itemsize == 4:
+        _TYPES[_typecode] = (np.uint32, 0xFFFF, np.uint16)
+
+# Nombre approximatif de valeurs du motif de XOR appliqué à chaque ligne (reste
+# d'un segment, hors tranches complètes)
+LARGEUR_MOTIF = 4096
+
+# Nombre approximatif de points de code d'origine traités à la fois
+TAILLE_TRANCHE = 1 << 14
+
+# Nombre de clés dont les tampons de travail sont gardés, par fil d'exécution
+NOMBRE_ESPACES = 8
+
+_locaux = threading.local()
+
+
+def _vers_numpy(points):
+    """Vue NumPy (sans copie) d'un tableau du moteur."""
+    return np.frombuffer(points, dtype=_TYPES[points.typecode][0])
+
+def _nouveau_tableau(typecode, taille):
+    """Tableau du moteur de `taille` éléments, avec une vue NumPy modifiable sur ses données."""
+    resultat = array(typecode, [0]) * taille
+    return resultat, _vers_numpy(resultat)
+
+def taille_tranche(block_size, periode_xor):
+    """
+    Nombre de points d'origine par tranche : chaque tranche chiffrée (deux fois plus
+    longue) compte un nombre entier de blocs de transposition et de périodes du XOR.
+    """
+    unite = block_size * periode_xor // gcd(block_size, periode_xor)
+    return max(1, TAILLE_TRANCHE // unite) * unite
+
+def _espace_travail(key_values, masque, calcul):
+    """
+    Tableaux d'une clé réutilisés d'un appel à l'autre : motif du XOR et leurres
+    répétés sur une tranche (pour toute phase), tampons d'une tranche. Chaque fil
+    d'exécution a les siens.
+    """
+    espaces = getattr(_locaux, 'espaces', None)
+    if espaces is None:
+        espaces = _locaux.espaces = OrderedDict()
+    cle = (id(key_values), masque)
+    entree = espaces.get(cle)
+    # L'entrée garde une référence sur key_values : son id ne peut pas être réutilisé
+    if entree is not None and entree[0] is key_values:
+        espaces.move_to_end(cle)
+        return entree[1]
+
+    table = key_values['tables_xor'][masque]
+    nombre = taille_tranche(key_values['block_size'], len(table))
+    leurres = np.asarray(key_values['leurres'], dtype=calcul)
+    espace = {
+        'nombre': nombre,
+        'periode_xor': len(table),
+        'motif': repeter(table, calcul, 2 * nombre + len(table)),
+        'periode_leurres': len(leurres),
+        'leurres': np.tile(leurres, nombre // len(leurres) + 2),
+        'tampon': np.empty(2 * nombre, dtype=calcul),
+        'melange': np.empty(2 * nombre, dtype=calcul),
+    }
+    espaces[cle] = (key_values, espace)
+    while len(espaces) > NOMBRE_ESPACES:
+        espaces.popitem(last=False)
+    return espace
+
+@lru_cache(maxsize=64)
+def _indices_chiffrement(block_size, nombre):
+    """
+    Position, dans la concaténation de `nombre` points et de leurs `nombre` leurres,
+    de chaque élément d'une tranche chiffrée (avant le XOR) : l'insertion des
+    leurres et la transposition en une seule lecture.
+    """
+    source = np.arange(2 * nombre, dtype=np.intp).reshape(-1, block_size)[:, ::-1].ravel()
+    return np.where(source % 2 == 0, source // 2, nombre + source // 2)
+
+@lru_cache(maxsize=64)
+def _indices_dechiffrement(block_size, nombre, parite):
+    """
+    Position, dans une tranche chiffrée de 2 * `nombre` éléments (après le XOR),
+    de chacun des `nombre` éléments d'origine : transposition et retrait des
+    leurres en une seule lecture.
+    """
+    transposition = np.arange(2 * nombre, dtype=np.intp).reshape(-1, block_size)[:, ::-1].ravel()
+    return np.ascontiguousarray(transposition[parite::2])
+
+def repeter(motif, dtype, nombre, debut=0):
+    """Répète un motif périodique sur `nombre` positions à partir de `debut`."""
+    motif = np.roll(np.asarray(motif, dtype=dtype), -(debut % len(motif)))
+    return np.tile(motif, nombre // len(motif) + 1)[:nombre]
+
+def inserer_leurres(points, leurres):
+    """Intercale un leurre après chaque point de code."""
+    expanded = np.empty(2 * len(points), dtype=points.dtype)
+    expanded[0::2] = points
+    expanded[1::2] = leurres
+    return expanded
+
+def transposer(points, block_size, out=None):
+    """Inverse chaque bloc de `block_size` éléments (le dernier bloc peut être incomplet)."""
+    complet = len(points) - len(points) % block_size
+    resultat = np.empty_like(points) if out is None else out
+    # Une copie par tranche pour chaque position dans le bloc (plus rapide qu'un
+    # reshape avec inversion de l'axe lorsque les blocs sont petits)
+    for position in range(block_size):
+        resultat[position:complet:block_size] = points[block_size - 1 - position:complet:block_size]
+    resultat[complet:] = points[complet:][::-1]
+    return resultat
+
+def appliquer_xor(points, tables_xor, masque, debut=0, out=None):
+    """
+    Applique le XOR périodique avec les valeurs de la clé, réduites par `masque`.
+
+    Le motif est élargi à environ LARGEUR_MOTIF valeurs et appliqué ligne par ligne
+    (diffusion NumPy) : aucun flux de la taille des données n'est construit. Sans
+    `out`, le XOR se fait sur place.
+    """
+    table = tables_xor[masque]
+    periode = len(table) * max(1, LARGEUR_MOTIF // len(table))
+    motif = repeter(table, points.dtype, periode, debut)
+    resultat = points if out is None else out
+
+    complet = len(points) - len(points) % periode
+    np.bitwise_xor(points[:complet].reshape(-1, periode), motif,
+                   out=resultat[:complet].reshape(-1, periode))
+    np.bitwise_xor(points[complet:], motif[:len(points) - complet], out=resultat[complet:])
+    if masque != np.iinfo(points.dtype).max:
+        resultat &= masque
+    return resultat
+
+def chiffrer_points(processed, key_values, debut=0):
+    """
+    Équivalent vectorisé de moteur.chiffrer_points.
+
+    Args:
+        processed (array): Segment à chiffrer (empreinte de la clé suivie du message)
+        key_values (dict): Valeurs dérivées de la clé
+        debut (int): Position absolue du segment
+    """
+    resultat, sortie = _nouveau_tableau(processed.typecode, 2 * len(processed))
+    _chiffrer(_vers_numpy(processed), sortie, key_values, debut, *_TYPES[processed.typecode][1:])
+    return resultat
+
+def dechiffrer_points(points, key_values, debut=0):
+    """Équivalent vectorisé de moteur.dechiffrer_points."""
+    resultat, sortie = _nouveau_tableau(points.typecode, (len(points) - debut % 2 + 1) // 2)
+    _dechiffrer(_vers_numpy(points), sortie, key_values, debut, *_TYPES[points.typecode][1:])
+    return resultat
+
+def chiffrer_dans(entete, donnees, sortie, key_values):
+    """
+    Chiffre `entete` suivi des octets de `donnees` directement dans `sortie`, sans
+    tableau intermédiaire de la taille des données.
+
+    Args:
+        entete (bytes): Empreinte de la clé, plus courte qu'une tranche
+        donnees: Octets d'origine (bytes, memoryview, mmap...)
+        sortie: Tampon modifiable d'exactement 2 * (len(entete) + len(donnees)) octets
+        key_values (dict): Valeurs dérivées de la clé
+    """
+    points = np.frombuffer(donnees, dtype=np.uint8)
+    sortie = np.frombuffer(sortie, dtype=np.uint8)
+    # Seule la première tranche, précédée de l'en-tête, est copiée
+    nombre = _espace_travail(key_values, 0xFF, np.uint8)['nombre']
+    premier = np.concatenate((np.frombuffer(entete, dtype=np.uint8), points[:nombre - len(entete)]))
+    _chiffrer(premier, sortie[:2 * len(premier)], key_values, 0, 0xFF, np.uint8)
+    _chiffrer(points[nombre - len(entete):], sortie[2 * len(premier):], key_values, len(premier), 0xFF, np.uint8)
+
+def dechiffrer_dans(donnees, sortie, key_values, a_sauter):
+    """
+    Déchiffre les octets de `donnees` directement dans `sortie`, sans leurs
+    `a_sauter` premiers éléments (l'empreinte de la clé). Un dernier octet isolé
+    (message tronqué) est ignoré.
+
+    Args:
+        sortie: Tampon modifiable d'exactement len(donnees) // 2 - a_sauter octets
+    """
+    entree = np.frombuffer(donnees, dtype=np.uint8)
+    entree = entree[:len(entree) - len(entree) % 2]
+    sortie = np.frombuffer(sortie, dtype=np.uint8)
+    nombre = _espace_travail(key_values, 0xFF, np.uint8)['nombre']
+    premier = np.empty(min(nombre, len(entree) // 2), dtype=np.uint8)
+    _dechiffrer(entree[:2 * len(premier)], premier, key_values, 0, 0xFF, np.uint8)
+    sortie[:len(premier) - a_sauter] = premier[a_sauter:]
+    _dechiffrer(entree[2 * len(premier):], sortie[len(premier) - a_sauter:], key_values, 2 * len(premier),
+                0xFF, np.uint8)
+
+def _chiffrer(points, sortie, key_values, debut, masque, calcul):
+    """Chiffre le tableau NumPy `points` dans `sortie`, de 2 * len(points) éléments."""
+    block_size = key_values['block_size']
+    espace = _espace_travail(key_values, masque, calcul)
+    nombre = espace['nombre']
+
+    complet = len(points) - len(points) % nombre
+    if complet:
+        indices = _indices_chiffrement(block_size, nombre)
+        # Motif du XOR, identique pour toutes les tranches du segment
+        phase = 2 * debut % espace['periode_xor']
+        motif = espace['motif'][phase:phase + 2 * nombre]
+        leurres, periode = espace['leurres'], espace['periode_leurres']
+
+        # Points (réduits à la largeur du calcul) puis leurres de la tranche
+        tampon, melange = espace['tampon'], espace['melange']
+        for position in range(0, complet, nombre):
+            tampon[:nombre] = points[position:position + nombre]
+            phase = (debut + position) % periode
+            tampon[nombre:] = leurres[phase:phase + nombre]
+            np.take(tampon, indices, out=melange)
+            np.bitwise_xor(melange, motif, out=sortie[2 * position:2 * (position + nombre)])
+
+    if complet < len(points):
+        # Dernière tranche incomplète (et dernier bloc éventuellement incomplet)
+        reste = points[complet:]
+        expanded = inserer_leurres(reste, repeter(key_values['leurres'], sortie.dtype, len(reste), debut + complet))
+        transposed = transposer(expanded, block_size, out=sortie[2 * complet:])
+        appliquer_xor(transposed, key_values['tables_xor'], masque, 2 * (debut + complet))
+
+def _dechiffrer(entree, sortie, key_values, debut, masque, calcul):
+    """Déchiffre le tableau NumPy `entree` dans `sortie`, de (len(entree) - debut % 2 + 1) // 2 éléments."""
+    block_size = key_values['block_size']
+    espace = _espace_travail(key_values, masque, calcul)
+    nombre = espace['nombre']
+    parite = debut % 2
+
+    # Chaque tranche chiffrée de 2 * nombre éléments redonne nombre éléments d'origine
+    complet = len(entree) - len(entree) % (2 * nombre)
+    if complet:
+        indices = _indices_dechiffrement(block_size, nombre, parite)
+        phase = debut % espace['periode_xor']
+        motif = espace['motif'][phase:phase + 2 * nombre]
+        # Le XOR est calculé à la largeur du masque : la conversion le réduit
+        tampon, melange = espace['tampon'], espace['melange'][:nombre]
+        direct = sortie.dtype == calcul
+        for position in range(0, complet, 2 * nombre):
+            np.bitwise_xor(entree[position:position + 2 * nombre], motif, out=tampon, casting='unsafe')
+            tranche = sortie[position // 2:position // 2 + nombre]
+            if direct:
+                np.take(tampon, indices, out=tranche)
+            else:
+                np.take(tampon, indices, out=melange)
+                tranche[:] = melange
+
+    if complet < len(entree):
+        reste = entree[complet:]
+        unxored = appliquer_xor(reste, key_values['tables_xor'], masque, debut + complet, out=np.empty_like(reste))
+        untransposed = transposer(unxored, block_size)
+        sortie[complet // 2:] = untransposed[parite::2]
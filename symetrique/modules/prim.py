@@ -1,55 +1,317 @@
 # Appel des fonctions (étapes de chiffrement et déchiffrement)
 from . import second
+from . import moteur
+from . import binaire
+from . import conteneur
+from . import compression
+from . import flux
 import tkinter as tk
 from tkinter import filedialog
 import zipfile
 import tempfile
 import os
+import io
+import hmac
+import mmap
+import codecs
+import time
+import shutil
+from array import array
+from itertools import chain, islice
+
+# Nombre de caractères lus à chaque étape du chiffrement en flux
+TAILLE_TRAME = 1 << 20
+
+# Préfixes des messages pré-compressés. Ils sont hors de l'alphabet de
+# secure_encode : aucun message chiffré sans pré-compression ne commence ainsi.
+PREFIXES_COMPRESSION = {compression.ZLIB: '~z', compression.LZMA: '~x'}
+
+# Nombre de messages traités par chaque tâche de chiffrer_batch / dechiffrer_batch
+TAILLE_LOT = 256
+
+def lire_trames(reader, taille_trame=TAILLE_TRAME):
+    """Lit un flux par trames de taille fixe jusqu'à la fin."""
+    while True:
+        trame = reader.read(taille_trame)
+        if not trame:
+            return
+        yield trame
+
+def lire_lots(elements, taille_lot=TAILLE_LOT):
+    """Regroupe une suite d'éléments en listes de `taille_lot` éléments."""
+    elements = iter(elements)
+    while True:
+        lot = list(islice(elements, taille_lot))
+        if not lot:
+            return
+        yield lot
+
+class LecteurProjete:
+    """
+    Lecteur de texte UTF-8 sur un fichier projeté en mémoire (mmap). Chaque lecture
+    décode directement une tranche de la projection (memoryview), sans tampon de
+    lecture ni copie des octets, puis rend au système les pages déjà lues : la
+    mémoire utilisée ne grandit pas avec la taille du fichier. Les fins de ligne
+    sont gardées telles quelles.
+
+    Avec encodage=None, read() retourne les tranches d'octets elles-mêmes (memoryview,
+    valables jusqu'à close()), à partir de la position `debut` (après un en-tête).
+    """
+
+    def __init__(self, chemin, debut=0, encodage='utf-8'):
+        self.fichier = open(chemin, 'rb')
+        self.projection = None
+        self.vue = memoryview(b"")
+        # Un fichier vide ne peut pas être projeté
+        if os.fstat(self.fichier.fileno()).st_size:
+            self.projection = mmap.mmap(self.fichier.fileno(), 0, access=mmap.ACCESS_READ)
+            self.vue = memoryview(self.projection)
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                self.projection.madvise(mmap.MADV_SEQUENTIAL)
+        self.position = debut
+        self.liberes = 0
+        self.decodeur = codecs.getincrementaldecoder(encodage)() if encodage else None
+
+    def read(self, taille=-1):
+        if taille is None or taille < 0:
+            taille = len(self.vue)
+        if self.decodeur is None:
+            # La tranche retournée est encore à lire : seules les pages qui la
+            # précèdent sont rendues
+            self.liberer()
+            fin = min(self.position + taille, len(self.vue))
+            donnees = self.vue[self.position:fin]
+            self.position = fin
+            return donnees
+
+        texte = ""
+        # Une tranche peut s'arrêter au milieu d'un caractère : lire jusqu'à en
+        # obtenir au moins un, une lecture vide signifiant la fin du fichier
+        while not texte and self.position < len(self.vue):
+            fin = min(self.position + max(taille, 1), len(self.vue))
+            texte = self.decodeur.decode(self.vue[self.position:fin], fin == len(self.vue))
+            self.position = fin
+        self.liberer()
+        return texte
+
+    def liberer(self):
+        """Rend au système les pages entièrement lues."""
+        if not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        fin = self.position - self.position % mmap.PAGESIZE
+        if fin > self.liberes:
+            self.projection.madvise(mmap.MADV_DONTNEED, self.liberes, fin - self.liberes)
+            self.liberes = fin
+
+    def close(self):
+        self.vue.release()
+        if self.projection is not None:
+            try:
+                self.projection.close()
+            except BufferError:
+                # Des tranches retournées par read() sont encore utilisées : la
+                # projection sera libérée avec la dernière d'entre elles
+                pass
+        self.fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def ouvrir_temporaire(file_path, mode='w', encoding=None):
+    """
+    Ouvre avec `mode` un fichier temporaire dans le dossier de file_path.
+
+    Returns:
+        tuple: (fichier ouvert, chemin du fichier temporaire)
+    """
+    descripteur, chemin_temporaire = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)), suffix='.tmp')
+    return os.fdopen(descripteur, mode, encoding=encoding), chemin_temporaire
+
+def synchroniser(fichier):
+    """Écrit sur le disque le contenu d'un fichier ouvert (flush puis fsync)."""
+    fichier.flush()
+    os.fsync(fichier.fileno())
+
+def synchroniser_dossier(chemin_dossier):
+    """
+    Écrit sur le disque les entrées d'un dossier (fichier créé ou renommé). Sans
+    effet sous Windows, où un dossier ne peut pas être ouvert.
+    """
+    if os.name == 'nt':
+        return
+    descripteur = os.open(chemin_dossier, os.O_RDONLY)
+    try:
+        os.fsync(descripteur)
+    finally:
+        os.close(descripteur)
+
+def installer_temporaire(chemin_temporaire, file_path):
+    """
+    Remplace file_path par le fichier temporaire (déjà synchronisé), avec les
+    permissions de l'original s'il existe (sinon celles de mkstemp, réservées au
+    propriétaire). Le renommage est lui aussi écrit sur le disque : après une
+    coupure, le fichier est soit l'original, soit le nouveau contenu.
+    """
+    if os.path.exists(file_path):
+        shutil.copymode(file_path, chemin_temporaire)
+    os.replace(chemin_temporaire, file_path)
+    synchroniser_dossier(os.path.dirname(os.path.abspath(file_path)))
+
+def supprimer_temporaire(chemin_temporaire):
+    """Supprime le fichier temporaire s'il n'a pas remplacé l'original."""
+    if os.path.exists(chemin_temporaire):
+        os.remove(chemin_temporaire)
+
+def remplacer_fichier(file_path, ecrire, mode='w'):
+    """
+    Appelle ecrire(destination) sur un fichier temporaire voisin ouvert avec `mode`,
+    puis remplace l'original seulement en cas de succès.
+    """
+    destination, chemin_temporaire = ouvrir_temporaire(file_path, mode)
+    try:
+        with destination:
+            ecrire(destination)
+            synchroniser(destination)
+        installer_temporaire(chemin_temporaire, file_path)
+    finally:
+        supprimer_temporaire(chemin_temporaire)
+
+def remplacer_en_flux(file_path, traitement, key, projection=False):
+    """
+    Applique `traitement` (chiffrer_stream ou dechiffrer_stream) au fichier dans un
+    fichier temporaire voisin, puis remplace l'original seulement en cas de succès.
+
+    Avec projection=True, le fichier est lu en UTF-8 par projection en mémoire
+    (voir LecteurProjete) plutôt qu'en mode texte.
+    """
+    def ecrire(destination):
+        source = LecteurProjete(file_path) if projection else open(file_path, 'r')
+        with source:
+            traitement(source, destination, key)
+
+    remplacer_fichier(file_path, ecrire)
+
+def chiffrer_fichier_texte(file_path, key, format_sortie=binaire.FORMAT_BINAIRE, workers=None, precompression=False,
+                           profondeur=flux.PROFONDEUR):
+    """
+    Chiffre un fichier texte sur place.
+
+    Par défaut (format_sortie=binaire.FORMAT_BINAIRE), les octets du fichier sont
+    chiffrés directement derrière l'en-tête binaire : le résultat fait deux fois la
+    taille du fichier (empreinte comprise), sans passer par l'encodage sur 6 bits.
+    binaire.FORMAT_TEXTE produit l'ancien format, lisible et copiable, où le texte
+    lu en UTF-8 est chiffré puis encodé avec secure_encode.
+
+    Avec precompression=True (format binaire seulement), un fichier compressible
+    est compressé avant d'être chiffré (voir compression.choisir_precompression) ;
+    l'algorithme est noté dans les drapeaux de l'en-tête.
+
+    Dans les deux formats, le fichier est lu par projection en mémoire (voir
+    LecteurProjete). Au format binaire, la lecture (et la compression) et l'écriture
+    sont faites dans des threads pendant le chiffrement, avec au plus `profondeur`
+    morceaux en attente de chaque côté (voir flux.pipeline ; 0 pour tout faire à la suite).
+
+    Raises:
+        ValueError: Si le format de sortie n'est pas pris en charge
+    """
+    if precompression and format_sortie != binaire.FORMAT_BINAIRE:
+        raise ValueError("La pré-compression n'est possible qu'au format binaire.")
+    if format_sortie == binaire.FORMAT_TEXTE:
+        remplacer_en_flux(file_path, chiffrer_stream, key, projection=True)
+        return
+    if format_sortie != binaire.FORMAT_BINAIRE:
+        raise ValueError(f"Format de sortie non pris en charge : {format_sortie}")
+
+    def ecrire(destination):
+        # Les octets sont lus par projection en mémoire (voir LecteurProjete)
+        with LecteurProjete(file_path, encodage=None) as source:
+            algorithme = None
+            if precompression:
+                algorithme = compression.choisir_precompression(
+                    len(source.vue), bytes(source.vue[:compression.TAILLE_ECHANTILLON]))
+
+            binaire.ecrire_entete(destination, binaire.CONTENU_TEXTE, binaire.DRAPEAUX_COMPRESSION.get(algorithme, 0))
+            if algorithme is not None:
+                source = conteneur.LecteurCompresse(source, compresseur=compression.compresseur(algorithme))
+            with flux.pipeline(source, destination, profondeur) as (lecteur, ecrivain):
+                chiffrer_octets_stream(lecteur, ecrivain, key, workers=workers)
+
+    remplacer_fichier(file_path, ecrire, 'wb')
+
+def dechiffrer_fichier_texte(file_path, key, workers=None, profondeur=flux.PROFONDEUR):
+    """
+    Déchiffre sur place un fichier produit par chiffrer_fichier_texte, quel que
+    soit son format (reconnu à son en-tête, ainsi que la pré-compression éventuelle).
+    Au format binaire, les entrées-sorties (et la décompression) se superposent au
+    déchiffrement comme dans chiffrer_fichier_texte.
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou si le fichier ne contient pas un texte chiffré
+    """
+    with open(file_path, 'rb') as source:
+        entete = binaire.lire_entete(source)
+    if entete is None:
+        remplacer_en_flux(file_path, dechiffrer_stream, key, projection=True)
+        return
+    if entete['contenu'] != binaire.CONTENU_TEXTE:
+        raise ValueError("Le fichier ne contient pas un texte chiffré.")
+
+    algorithme = binaire.algorithme_compression(entete['drapeaux'])
+
+    def ecrire(destination):
+        with LecteurProjete(file_path, debut=binaire.ENTETE.size, encodage=None) as source:
+            decompresse = None
+            if algorithme is not None:
+                destination = decompresse = conteneur.EcrivainDecompresse(
+                    destination, compression.decompresseur(algorithme))
+            with flux.pipeline(source, destination, profondeur) as (lecteur, ecrivain):
+                dechiffrer_octets_stream(lecteur, ecrivain, key, workers=workers)
+            if decompresse is not None:
+                decompresse.terminer()
+
+    remplacer_fichier(file_path, ecrire, 'wb')
 
 # Chiffrement
 
-def chiffrer(message, key):
+def chiffrer(message, key, workers=None, precompression=False):
     """
     Fonction de chiffrement MultiCrypt améliorée sans dépendances externes.
     Compatible avec les clés complexes contenant des caractères spéciaux.
+    Avec workers > 1, le message est chiffré par segments sur plusieurs processus.
+
+    Avec precompression=True, un message compressible est compressé (voir
+    compression.choisir_precompression) puis chiffré comme des octets ; le
+    résultat commence alors par un préfixe de PREFIXES_COMPRESSION, que
+    dechiffrer reconnaît.
     """
     
     try:
+        if precompression:
+            donnees = message.encode('utf-8')
+            algorithme = compression.choisir_precompression(len(donnees), donnees)
+            if algorithme is not None:
+                chiffre = chiffrer_octets(compression.compresser(donnees, algorithme), key, workers)
+                return PREFIXES_COMPRESSION[algorithme] + second.secure_encode_bytes(chiffre)
+
         # Générer les valeurs dérivées de la clé
         key_values = second.generate_key_values(key)
-        block_size = key_values['block_size']
-        char_values = key_values['char_values']
-        fingerprint = key_values['fingerprint']
         
         # Étape 1: Ajout de l'empreinte de la clé au début
-        processed = fingerprint
+        processed = key_values['fingerprint']
         
         # Étape 2: Ajout du message original en préservant tous les caractères
         # Cette fois, on ne fait pas de substitution César pour préserver les caractères accentués
         processed += message
         
-        # Étape 3: Expansion (ajouter des caractères leurres)
-        expanded = ""
-        for i, char in enumerate(processed):
-            expanded += char
-            # Ajouter un caractère leurre basé sur la position et la clé
-            key_char_index = i % len(key)
-            leurre_value = (ord(key[key_char_index]) + i) % 95 + 32  # Caractères imprimables ASCII
-            expanded += chr(leurre_value)
-        
-        # Étape 4: Transposition par blocs
-        blocks = [expanded[i:i+block_size] for i in range(0, len(expanded), block_size)]
-        transposed = ""
-        for block in blocks:
-            # Inverser chaque bloc
-            transposed += block[::-1]
-        
-        # Étape 5: XOR avec les valeurs des caractères de la clé
-        xored = ""
-        for i, char in enumerate(transposed):
-            key_value = char_values[i % len(char_values)]
-            xored_value = ord(char) ^ key_value
-            xored += chr(xored_value % 65536)  # S'assurer que nous restons dans la plage Unicode valide
+        # Étapes 3 à 5: Leurres, transposition par blocs et XOR
+        # (réalisées sur des tableaux préalloués, voir le module moteur)
+        processed_points = moteur.texte_vers_points(processed)
+        trames = moteur.trancher(processed_points, TAILLE_TRAME)
+        chiffres = moteur.chiffrer_trames(trames, key_values, workers)
+        xored = moteur.points_vers_texte(moteur.concatener(chiffres, moteur.TYPE_POINTS))
 
         # Étape 6: Encodage final
         result = second.secure_encode(xored)
@@ -58,6 +320,106 @@ def chiffrer(message, key):
     except Exception as e:
         return f"Erreur lors du chiffrement: {str(e)}"
 
+def chiffrer_stream(reader, writer, key, taille_trame=TAILLE_TRAME, workers=None):
+    """
+    Chiffre en flux le texte lu dans `reader` et écrit le résultat dans `writer`.
+
+    Le résultat est identique à chiffrer(reader.read(), key) mais la mémoire utilisée
+    reste proportionnelle à `taille_trame` quelle que soit la taille du message.
+
+    Args:
+        reader: Objet dont read(n) retourne du texte (fichier ouvert en mode texte...)
+        writer: Objet dont write(texte) reçoit le message chiffré
+        key (str): Clé de chiffrement
+        taille_trame (int): Nombre de caractères traités à chaque étape
+        workers (int): Nombre de processus pour chiffrer les trames en parallèle
+
+    Returns:
+        int: Nombre de caractères écrits
+    """
+    key_values = second.generate_key_values(key)
+
+    # Étapes 1 et 2: L'empreinte de la clé précède le message
+    trames = chain([key_values['fingerprint']], lire_trames(reader, taille_trame))
+
+    # Étapes 3 à 5: Leurres, transposition et XOR, trame par trame
+    chiffres = moteur.chiffrer_trames(map(moteur.texte_vers_points, trames), key_values, workers)
+
+    # Étape 6: Encodage final
+    octets = (moteur.points_vers_texte(points).encode('utf-8') for points in chiffres)
+    ecrits = 0
+    for morceau in second.secure_encode_stream(octets):
+        writer.write(morceau)
+        ecrits += len(morceau)
+    return ecrits
+
+def chiffrer_octets(donnees, key, workers=None):
+    """
+    Version binaire de chiffrer : les octets sont chiffrés directement, sans
+    passer par l'hexadécimal ni par l'encodage final.
+
+    Returns:
+        bytes: Les octets chiffrés (deux fois la taille des données, empreinte comprise)
+    """
+    key_values = second.generate_key_values(key)
+    processed = array(moteur.TYPE_OCTETS, key_values['fingerprint'].encode('ascii'))
+    processed.frombytes(donnees)
+    chiffres = moteur.chiffrer_trames(moteur.trancher(processed, TAILLE_TRAME), key_values, workers)
+    return moteur.concatener(chiffres, moteur.TYPE_OCTETS).tobytes()
+
+def chiffrer_octets_stream(reader, writer, key, taille_trame=TAILLE_TRAME, workers=None):
+    """
+    Version binaire de chiffrer_stream : lit des octets dans `reader` et écrit les
+    octets chiffrés dans `writer`, à mémoire constante.
+
+    Returns:
+        int: Nombre d'octets écrits
+    """
+    key_values = second.generate_key_values(key)
+    trames = chain([key_values['fingerprint'].encode('ascii')], lire_trames(reader, taille_trame))
+    chiffres = moteur.chiffrer_trames(map(moteur.octets_vers_points, trames), key_values, workers)
+
+    ecrits = 0
+    for points in chiffres:
+        writer.write(points.tobytes())
+        ecrits += len(points)
+    return ecrits
+
+def chiffrer_batch(messages, key, workers=None):
+    """
+    Chiffre une suite de messages avec la même clé.
+
+    Les valeurs dérivées de la clé ne sont calculées qu'une fois pour tous les
+    messages. Avec workers > 1, les messages sont répartis par lots de TAILLE_LOT
+    sur plusieurs processus ; l'ordre des résultats est conservé.
+
+    Returns:
+        list: Un dictionnaire par message : {'resultat': message chiffré, 'erreur': None},
+        ou {'resultat': None, 'erreur': description} si ce message n'a pas pu être chiffré
+
+    Raises:
+        ValueError: Si la clé est vide
+    """
+    if not key:
+        raise ValueError("La clé ne peut pas être vide.")
+    key_values = second.generate_key_values(key)
+    taches = ((chiffrer_lot, lot, key_values) for lot in lire_lots(messages))
+    return [resultat for resultats in moteur.executer(taches, workers) for resultat in resultats]
+
+def chiffrer_lot(messages, key_values):
+    """Chiffre un lot de messages pour chiffrer_batch."""
+    key_values = moteur.preparer_tables(key_values, moteur.TYPE_POINTS)
+    fingerprint = key_values['fingerprint']
+    resultats = []
+    for message in messages:
+        try:
+            processed = moteur.texte_vers_points(fingerprint + message)
+            xored = moteur.points_vers_texte(moteur.chiffrer_points(processed, key_values))
+            resultats.append({'resultat': second.secure_encode(xored), 'erreur': None})
+        except Exception as e:
+            resultats.append({'resultat': None, 'erreur': str(e)})
+    return resultats
+
 def chiffrer_text():
     try:
         root = tk.Tk()
@@ -68,159 +430,816 @@ def chiffrer_text():
         if not file_path:
             return "Aucun fichier sélectionné."
 
-        try:
-            with open(file_path, 'r') as file:
-                contenu = file.read()
-        except Exception as e:
-            return f"Erreur lors de la lecture du fichier : {e}"
+        if not os.access(file_path, os.R_OK):
+            return f"Erreur lors de la lecture du fichier : {file_path}"
 
         try:
             key = second.demand_key()
-            contenu_chiffre = chiffrer(contenu, key)
+            # Traitement en flux : le fichier n'est jamais chargé entièrement
+            chiffrer_fichier_texte(file_path, key, precompression=True)
         except Exception as e:
             return f"Erreur lors du chiffrement : {e}"
 
-        try:
-            with open(file_path, 'w') as file2:
-                file2.write(contenu_chiffre)
-        except Exception as e:
-            return f"Erreur lors de l'écriture du fichier : {e}"
-
         return f"✅  Fichier chiffré avec succès : {file_path}"
 
     except Exception as e:
         return f"Une erreur inattendue s'est produite : {e}"
 
-def chiffrer_dossier(chemin_dossier, cle, dossier_destination):
-    """Chiffre un dossier entier en le compressant d'abord en ZIP, avec gestion du chemin de sortie"""
+def chiffrer_dossier(chemin_dossier, cle, dossier_destination, format_sortie=binaire.FORMAT_BINAIRE, workers=None,
+                     politique_compression=None, bilan_compression=None, reprendre=False,
+                     profondeur=flux.PROFONDEUR):
+    """
+    Chiffre un dossier entier en le compressant en ZIP, avec gestion du chemin de sortie.
+    L'archive est produite dans un thread et chiffrée au fil de l'eau (voir
+    flux.produire), sans fichier ZIP temporaire. Au format binaire, l'écriture du
+    résultat est faite dans un autre thread (voir flux.differer), avec au plus
+    `profondeur` morceaux en attente.
+
+    Chaque fichier est compressé ou stocké tel quel selon politique_compression
+    (compression.POLITIQUE_DEFAUT si None) : les formats déjà compressés ne sont
+    pas recompressés. Si bilan_compression est un dict (compression.nouveau_bilan),
+    il est complété avec les octets gagnés et le temps passé à compresser.
+
+    Par défaut, les octets du ZIP sont chiffrés directement dans un fichier binaire
+    avec en-tête (format_sortie=binaire.FORMAT_BINAIRE, environ 2 fois la taille du ZIP).
+    binaire.FORMAT_TEXTE produit l'ancien format hexadécimal encodé (plus de 5 fois).
+    binaire.FORMAT_CONTENEUR chiffre chaque fichier séparément dans un conteneur indexé
+    (voir le module conteneur), dont on peut lister ou extraire un seul fichier ; les
+    petits fichiers y sont regroupés en paquets, ce qui convient aux dossiers qui en
+    contiennent un très grand nombre. Avec workers > 1, le chiffrement est réparti sur plusieurs processus.
+
+    Avec reprendre=True (format conteneur seulement), un journal de reprise permet
+    à un chiffrement interrompu de continuer là où il s'était arrêté lorsqu'il est
+    relancé avec les mêmes arguments.
+
+    Aux formats binaire et texte, le résultat est écrit dans un fichier temporaire
+    voisin qui ne remplace le chemin de sortie qu'une fois l'archive complète :
+    une erreur (du chiffrement ou de la production du ZIP) ne laisse pas de
+    fichier tronqué.
+    """
     try:
         # Générer un nom de fichier si le chemin donné est un dossier
         if os.path.isdir(dossier_destination):
             nom_dossier = os.path.basename(os.path.normpath(chemin_dossier))
-            chemin_sortie = os.path.join(dossier_destination, nom_dossier + ".encrypted")
+            chemin_sortie = os.path.join(dossier_destination, nom_dossier + ".exegolencrypt")
         else:
             chemin_sortie = dossier_destination
 
-        # Créer un fichier ZIP temporaire contenant tous les fichiers du dossier
-        temp_zip = tempfile.mktemp(suffix='.zip')
-        with zipfile.ZipFile(temp_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(chemin_dossier):
-                for file in files:
-                    chemin_complet = os.path.join(root, file)
-                    chemin_relatif = os.path.relpath(chemin_complet, os.path.dirname(chemin_dossier))
-                    zipf.write(chemin_complet, chemin_relatif)
-
-        # Lire le fichier ZIP en tant que données binaires
-        with open(temp_zip, 'rb') as f:
-            donnees_zip = f.read()
+        if format_sortie == binaire.FORMAT_CONTENEUR:
+            conteneur.creer_conteneur(chemin_dossier, cle, chemin_sortie, workers,
+                                      politique_compression, bilan_compression, reprendre=reprendre)
+            return chemin_sortie
+        if reprendre:
+            raise ValueError("La reprise n'est possible qu'au format conteneur.")
 
-        # Convertir les données binaires en chaîne hexadécimale
-        donnees_hex = second.binary_to_hex_string(donnees_zip)
-
-        # Chiffrer la chaîne hexadécimale
-        donnees_chiffrees = chiffrer(donnees_hex, cle)
-
-        # Écrire le résultat dans le fichier de sortie
-        with open(chemin_sortie, 'w', encoding='utf-8') as f:
-            f.write(donnees_chiffrees)
-
-        # Supprimer le ZIP temporaire
-        os.remove(temp_zip)
+        if format_sortie == binaire.FORMAT_BINAIRE:
+            destination, chemin_temporaire = ouvrir_temporaire(chemin_sortie, 'wb')
+        else:
+            destination, chemin_temporaire = ouvrir_temporaire(chemin_sortie, 'w', encoding='utf-8')
+        try:
+            # L'erreur éventuelle du producteur est relevée à la sortie de
+            # flux.produire, avant le remplacement
+            with destination, flux.produire(ecrire_zip, chemin_dossier, politique_compression,
+                                            bilan_compression) as archive:
+                if format_sortie == binaire.FORMAT_BINAIRE:
+                    # Chiffrer directement les octets du ZIP, derrière l'en-tête binaire
+                    binaire.ecrire_entete(destination, binaire.CONTENU_ZIP)
+                    with flux.differer(destination, profondeur) as ecrivain:
+                        chiffrer_octets_stream(archive, ecrivain, cle, workers=workers)
+                else:
+                    # Chiffrer le ZIP en flux, converti en hexadécimal au fil de la lecture
+                    chiffrer_stream(second.HexReader(archive), destination, cle, workers=workers)
+                synchroniser(destination)
+            installer_temporaire(chemin_temporaire, chemin_sortie)
+        finally:
+            supprimer_temporaire(chemin_temporaire)
 
         return chemin_sortie
 
     except Exception as e:
         return f"Erreur lors du chiffrement du dossier: {str(e)}"
 
-def dechiffrer_dossier(chemin_fichier_chiffre, cle, chemin_dossier_sortie):
-    """Déchiffre un dossier chiffré et extrait son contenu"""
+def ecrire_zip(destination, chemin_dossier, politique_compression=None, bilan_compression=None):
+    """
+    Écrit l'archive ZIP d'un dossier dans un flux (un flux.Tube), fichier par fichier.
+    Voir chiffrer_dossier pour la politique et le bilan de compression.
+    """
+    with zipfile.ZipFile(destination, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for chemin_complet, chemin_relatif, _ in conteneur.lister_fichiers(chemin_dossier):
+            with open(chemin_complet, 'rb') as fichier:
+                echantillon = fichier.read(compression.TAILLE_ECHANTILLON)
+            niveau = compression.choisir_niveau(chemin_complet, echantillon, politique_compression)
+            # Le temps passé à attendre le chiffrement n'est pas du temps de compression
+            debut = time.perf_counter() - destination.attente
+            if niveau:
+                zipf.write(chemin_complet, chemin_relatif, zipfile.ZIP_DEFLATED, niveau)
+            else:
+                zipf.write(chemin_complet, chemin_relatif, zipfile.ZIP_STORED)
+            infos = zipf.infolist()[-1]
+            compression.compter(bilan_compression, infos.file_size, infos.compress_size,
+                                time.perf_counter() - destination.attente - debut, niveau != 0)
+
+def dechiffrer_dossier(chemin_fichier_chiffre, cle, chemin_dossier_sortie, workers=None, reprendre=False):
+    """
+    Déchiffre un dossier chiffré (format binaire ou texte) et extrait son contenu.
+    Avec reprendre=True (conteneurs seulement), une extraction interrompue reprend
+    là où elle s'était arrêtée (voir conteneur.extraire_conteneur).
+
+    Au format binaire, zipfile lit l'archive directement dans le fichier chiffré
+    (voir LecteurDechiffre), sans ZIP temporaire. L'ancien format texte est encore
+    déchiffré dans un ZIP temporaire. Avec workers > 1, le déchiffrement de
+    l'ancien format est réparti sur plusieurs processus.
+    """
     try:
-        # Lire le fichier chiffré
-        with open(chemin_fichier_chiffre, 'r', encoding='utf-8') as f:
-            donnees_chiffrees = f.read()
-        
-        # Déchiffrer les données
-        donnees_hex = dechiffrer(donnees_chiffrees, cle)
-        
-        # Convertir la chaîne hexadécimale en données binaires
-        donnees_zip = second.hex_string_to_binary(donnees_hex)
-        
-        # Créer un fichier ZIP temporaire
-        temp_zip = tempfile.mktemp(suffix='.zip')
-        with open(temp_zip, 'wb') as f:
-            f.write(donnees_zip)
-        
-        # Extraire le ZIP dans le dossier cible
-        os.makedirs(chemin_dossier_sortie, exist_ok=True)
-        with zipfile.ZipFile(temp_zip, 'r') as zipf:
-            zipf.extractall(chemin_dossier_sortie)
-        
-        # Supprimer le ZIP temporaire
-        os.remove(temp_zip)
-        
+        with open(chemin_fichier_chiffre, 'rb') as source:
+            entete = binaire.lire_entete(source)
+            if reprendre and (entete is None or entete['contenu'] != binaire.CONTENU_CONTENEUR):
+                raise ValueError("La reprise n'est possible qu'au format conteneur.")
+            if entete is not None and entete['contenu'] == binaire.CONTENU_ZIP:
+                os.makedirs(chemin_dossier_sortie, exist_ok=True)
+                with zipfile.ZipFile(LecteurDechiffre(source, cle)) as zipf:
+                    zipf.extractall(chemin_dossier_sortie)
+                return chemin_dossier_sortie
+
+        # Conteneur indexé : chaque fichier est extrait depuis sa propre entrée
+        if entete is not None and entete['contenu'] == binaire.CONTENU_CONTENEUR:
+            return conteneur.extraire_conteneur(chemin_fichier_chiffre, cle, chemin_dossier_sortie, workers,
+                                                reprendre)
+        if entete is not None:
+            raise ValueError("Le fichier ne contient pas un dossier chiffré.")
+
+        # Ancien format : hexadécimal chiffré puis encodé en texte, déchiffré en
+        # flux vers un fichier ZIP temporaire anonyme (supprimé à sa fermeture,
+        # même en cas d'erreur)
+        with tempfile.TemporaryFile(suffix='.zip') as temp_zip:
+            with open(chemin_fichier_chiffre, 'rb') as source:
+                texte = io.TextIOWrapper(source, encoding='utf-8')
+                dechiffrer_stream(texte, second.HexWriter(temp_zip), cle, workers=workers)
+
+            # Extraire le ZIP dans le dossier cible
+            os.makedirs(chemin_dossier_sortie, exist_ok=True)
+            temp_zip.seek(0)
+            with zipfile.ZipFile(temp_zip, 'r') as zipf:
+                zipf.extractall(chemin_dossier_sortie)
+
         return chemin_dossier_sortie
     except Exception as e:
         return f"Erreur lors du déchiffrement: {str(e)}"
 
 # Déchiffrement
 
-def dechiffrer(message_chiffre, key):
+def dechiffrer(message_chiffre, key, workers=None):
     """
     Fonction de déchiffrement MultiCrypt améliorée sans dépendances externes.
+    Avec workers > 1, le message est déchiffré par segments sur plusieurs processus.
     """
     
     try:
+        # Message pré-compressé : des octets chiffrés, à décompresser
+        algorithme = algorithme_precompression(message_chiffre)
+        if algorithme is not None:
+            try:
+                chiffre = second.secure_decode_bytes(message_chiffre[len(PREFIXES_COMPRESSION[algorithme]):])
+                donnees = compression.decompresser(dechiffrer_octets(chiffre, key, workers), algorithme)
+                return donnees.decode('utf-8')
+            except ValueError as e:
+                return f"Erreur: {e}"
+
         # Générer les mêmes valeurs dérivées de la clé
         key_values = second.generate_key_values(key)
-        block_size = key_values['block_size']
-        char_values = key_values['char_values']
-        fingerprint = key_values['fingerprint']
-        fingerprint_length = len(fingerprint)
+        fingerprint_length = len(key_values['fingerprint'])
         
-        # Étape 1: Décodage
+        # Étape 1: Vérifier l'empreinte de la clé sur les premiers blocs seulement,
+        # pour rejeter une clé incorrecte sans décoder tout le message
         try:
-            decoded = second.secure_decode(message_chiffre)
+            debut = decoder_debut(message_chiffre, moteur.longueur_empreinte_chiffree(key_values) + 1)
         except:
             return "Erreur: Le message chiffré est corrompu ou mal formaté."
         
-        # Étape 2: Inverser le XOR
-        unxored = ""
-        for i, char in enumerate(decoded):
-            key_value = char_values[i % len(char_values)]
-            original_value = ord(char) ^ key_value
-            unxored += chr(original_value % 65536)  # Rester dans la plage Unicode valide
+        try:
+            controler_empreinte(moteur.texte_vers_points(debut), key_values)
+        except ValueError as e:
+            return f"Erreur: {e}"
         
-        # Étape 3: Inverser la transposition par blocs
-        # D'abord, découper en blocs
-        transposed_blocks = [unxored[i:i+block_size] for i in range(0, len(unxored), block_size)]
-        untransposed = ""
-        for block in transposed_blocks:
-            # Inverser chaque bloc à nouveau
-            untransposed += block[::-1]
+        # Étape 2: Décodage
+        try:
+            decoded = second.secure_decode(message_chiffre)
+        except:
+            return "Erreur: Le message chiffré est corrompu ou mal formaté."
         
-        # Étape 4: Supprimer les caractères leurres (un sur deux, en commençant par le deuxième)
-        contracted = ""
-        for i in range(0, len(untransposed), 2):
-            if i < len(untransposed):
-                contracted += untransposed[i]
-
-        # Étape 5: Vérifier l'empreinte de la clé
-        if len(contracted) <= fingerprint_length:
-            return "Erreur: Message trop court ou clé incorrecte."
-
-        received_fingerprint = contracted[:fingerprint_length]
-        message_sans_fingerprint = contracted[fingerprint_length:]
-
-        if received_fingerprint != fingerprint:
-            return "Erreur: Clé de déchiffrement incorrecte."
+        # Étapes 3 à 5: Inverser le XOR et la transposition, puis supprimer les leurres
+        trames = moteur.trancher(moteur.texte_vers_points(decoded), TAILLE_TRAME)
+        contracted = moteur.points_vers_texte(
+            moteur.concatener(moteur.dechiffrer_trames(trames, key_values, workers), moteur.TYPE_POINTS)
+        )
         
-        # Étape 6: Retourner le message original sans transformation
+        # Étape 6: Retourner le message original sans l'empreinte, déjà vérifiée
         # Nous avons supprimé la phase de substitution César pour préserver les caractères spéciaux
-        return message_sans_fingerprint
+        return contracted[fingerprint_length:]
 
     except Exception as e:
         return f"Erreur de déchiffrement: {str(e)}"
 
+def dechiffrer_stream(reader, writer, key, taille_trame=TAILLE_TRAME, workers=None):
+    """
+    Déchiffre en flux le message lu dans `reader` et écrit le texte obtenu dans `writer`.
+
+    L'empreinte de la clé est vérifiée dès les premiers caractères : rien n'est
+    écrit si la clé est incorrecte.
+
+    Args:
+        reader: Objet dont read(n) retourne le message chiffré (texte)
+        writer: Objet dont write(texte) reçoit le message déchiffré
+        key (str): Clé de déchiffrement
+        taille_trame (int): Nombre de caractères lus à chaque étape
+        workers (int): Nombre de processus pour déchiffrer les trames en parallèle
+
+    Returns:
+        int: Nombre de caractères écrits
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou le message trop court
+    """
+    key_values = second.generate_key_values(key)
+
+    # Étape 1: Décodage
+    decoded = second.secure_decode_stream(lire_trames(reader, taille_trame))
+
+    # Étapes 2 à 4: XOR, transposition et leurres, trame par trame
+    contracted = moteur.dechiffrer_trames(map(moteur.texte_vers_points, decoded), key_values, workers)
+
+    # Étape 5: Vérifier l'empreinte de la clé avant d'écrire quoi que ce soit
+    textes = (moteur.points_vers_texte(points) for points in contracted)
+    ecrits = 0
+    for texte in retirer_empreinte(textes, key_values['fingerprint']):
+        writer.write(texte)
+        ecrits += len(texte)
+    return ecrits
+
+def dechiffrer_octets(donnees, key, workers=None):
+    """
+    Déchiffre des octets produits par chiffrer_octets.
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou les données trop courtes
+    """
+    key_values = second.generate_key_values(key)
+
+    # Rejeter une clé incorrecte avant de copier et déchiffrer toutes les données
+    longueur = moteur.longueur_empreinte_chiffree(key_values)
+    controler_empreinte(array(moteur.TYPE_OCTETS, donnees[:longueur + 1]), key_values)
+
+    trames = moteur.trancher(array(moteur.TYPE_OCTETS, donnees), TAILLE_TRAME)
+    contracted = (points.tobytes() for points in moteur.dechiffrer_trames(trames, key_values, workers))
+    return b"".join(retirer_empreinte(contracted, key_values['fingerprint'].encode('ascii')))
+
+def dechiffrer_octets_stream(reader, writer, key, taille_trame=TAILLE_TRAME, workers=None):
+    """
+    Version binaire de dechiffrer_stream : lit les octets chiffrés dans `reader`
+    et écrit les octets d'origine dans `writer`.
+
+    Returns:
+        int: Nombre d'octets écrits
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou les données trop courtes
+    """
+    key_values = second.generate_key_values(key)
+    trames = map(moteur.octets_vers_points, lire_trames(reader, taille_trame))
+    contracted = (points.tobytes() for points in moteur.dechiffrer_trames(trames, key_values, workers))
+
+    ecrits = 0
+    for morceau in retirer_empreinte(contracted, key_values['fingerprint'].encode('ascii')):
+        writer.write(morceau)
+        ecrits += len(morceau)
+    return ecrits
+
+def taille_chiffree(taille, key):
+    """
+    Taille exacte, en octets, du chiffrement binaire de `taille` octets : l'empreinte
+    de la clé puis chaque octet, chacun suivi d'un leurre. L'empreinte a toujours
+    la même longueur : la clé n'est pas dérivée.
+    """
+    return 2 * (second.LONGUEUR_EMPREINTE + taille)
+
+def taille_dechiffree(taille, key):
+    """Taille des données d'origine d'un message binaire chiffré de `taille` octets."""
+    return max(taille // 2 - second.LONGUEUR_EMPREINTE, 0)
+
+def ecriture_directe(taille, workers):
+    """Vrai si le moteur NumPy peut écrire directement dans le tampon de destination."""
+    return moteur.NUMPY_ACTIF and taille >= moteur.SEUIL_NUMPY and not (workers and workers > 1)
+
+def vue_destination(destination, taille):
+    """
+    Vue octet par octet d'un tampon de destination, après contrôle de sa taille.
+
+    Raises:
+        TypeError: Si le tampon n'est pas modifiable
+        ValueError: Si le tampon est trop petit
+    """
+    vue = memoryview(destination).cast('B')
+    if vue.readonly:
+        raise TypeError("Le tampon de destination n'est pas modifiable.")
+    if len(vue) < taille:
+        raise ValueError(f"Tampon de destination trop petit : {taille} octets nécessaires, {len(vue)} disponibles.")
+    return vue
+
+def segments_alignes(donnees, taille_segment, entete=b""):
+    """
+    Découpe `entete` suivi d'un tampon en segments de `taille_segment` éléments,
+    lus directement dans le tampon (sans copie intermédiaire de l'ensemble).
+
+    Yields:
+        tuple: (segment, position absolue du segment)
+    """
+    segment = array(moteur.TYPE_OCTETS, entete)
+    debut = taille_segment - len(segment)
+    segment.frombytes(donnees[:debut])
+    yield segment, 0
+
+    for position in range(debut, len(donnees), taille_segment):
+        segment = array(moteur.TYPE_OCTETS)
+        segment.frombytes(donnees[position:position + taille_segment])
+        yield segment, len(entete) + position
+
+def chiffrer_into(source, destination, key, workers=None):
+    """
+    Version de chiffrer_octets qui écrit dans un tampon fourni par l'appelant : un
+    appelant qui chiffre de nombreux messages réutilise le même tampon au lieu
+    d'allouer un résultat à chaque appel.
+
+    Args:
+        source: Données (bytes, bytearray, memoryview, mmap...)
+        destination: Tampon modifiable (bytearray, memoryview...) d'au moins
+            taille_chiffree(len(source), key) octets
+        key (str): Clé de chiffrement
+        workers (int): Nombre de processus (None ou 1 : pas de parallélisme)
+
+    Returns:
+        int: Nombre d'octets écrits au début de destination
+
+    Raises:
+        TypeError: Si la destination n'est pas modifiable
+        ValueError: Si la destination est trop petite
+    """
+    key_values = second.generate_key_values(key)
+    donnees = memoryview(source).cast('B')
+    taille = taille_chiffree(len(donnees), key)
+    sortie = vue_destination(destination, taille)
+    entete = key_values['fingerprint'].encode('ascii')
+
+    if ecriture_directe(len(donnees), workers):
+        moteur.chiffrer_dans(entete, donnees, sortie[:taille], key_values)
+        return taille
+
+    # Segments alignés sur les blocs de transposition : chacun est chiffré seul
+    unite = moteur.unite_chiffrement(key_values['block_size'])
+    segments = segments_alignes(donnees, TAILLE_TRAME - TAILLE_TRAME % unite, entete)
+    taches = ((moteur.chiffrer_points, segment, key_values, position) for segment, position in segments)
+
+    ecrits = 0
+    for points in moteur.executer(taches, workers):
+        sortie[ecrits:ecrits + len(points)] = points
+        ecrits += len(points)
+    return ecrits
+
+def dechiffrer_into(source, destination, key, workers=None):
+    """
+    Version de dechiffrer_octets qui écrit dans un tampon fourni par l'appelant,
+    d'au moins taille_dechiffree(len(source), key) octets.
+
+    Returns:
+        int: Nombre d'octets écrits au début de destination
+
+    Raises:
+        TypeError: Si la destination n'est pas modifiable
+        ValueError: Si la clé est incorrecte, les données trop courtes ou la
+            destination trop petite
+    """
+    key_values = second.generate_key_values(key)
+    donnees = memoryview(source).cast('B')
+
+    longueur = moteur.longueur_empreinte_chiffree(key_values)
+    controler_empreinte(array(moteur.TYPE_OCTETS, bytes(donnees[:longueur + 1])), key_values)
+    taille = taille_dechiffree(len(donnees), key)
+    sortie = vue_destination(destination, taille)
+    # L'empreinte en tête du résultat n'est pas recopiée
+    a_sauter = len(key_values['fingerprint'])
+
+    if ecriture_directe(len(donnees), workers):
+        moteur.dechiffrer_dans(donnees, sortie[:taille], key_values, a_sauter)
+        return taille
+
+    block_size = key_values['block_size']
+    segments = segments_alignes(donnees, TAILLE_TRAME - TAILLE_TRAME % block_size)
+    taches = ((moteur.dechiffrer_points, segment, key_values, position) for segment, position in segments)
+
+    ecrits = 0
+    for points in moteur.executer(taches, workers):
+        morceau = memoryview(points)[a_sauter:]
+        a_sauter = max(a_sauter - len(points), 0)
+        sortie[ecrits:ecrits + len(morceau)] = morceau
+        ecrits += len(morceau)
+    return ecrits
+
+def dechiffrer_range(source, key, start, length, format_source=None):
+    """
+    Déchiffre seulement `length` éléments du message d'origine à partir de la position `start`.
+
+    Au format binaire (octets de chiffrer_octets, fichier .exegolencrypt binaire), la
+    position de chaque octet dans le message chiffré est connue : seuls les blocs de
+    transposition qui couvrent la plage sont lus et déchiffrés. Au format texte, la
+    largeur variable de l'UTF-8 empêche ce calcul : le message est déchiffré en flux,
+    du début jusqu'à la fin de la plage seulement. Il en va de même d'un message
+    pré-compressé (préfixe de PREFIXES_COMPRESSION, ou drapeau de l'en-tête binaire),
+    déchiffré puis décompressé en flux jusqu'à la fin de la plage : les positions
+    sont alors celles du message d'origine, avant compression.
+
+    Args:
+        source: Message chiffré (str pour le format texte, octets pour le format
+            binaire), ou fichier chiffré ouvert en mode 'rb' (ou mmap)
+        key (str): Clé de déchiffrement
+        start (int): Position du premier octet (ou caractère) voulu
+        length (int): Nombre d'octets (ou de caractères) voulus
+        format_source (str): binaire.FORMAT_TEXTE ou binaire.FORMAT_BINAIRE pour des
+            octets ou un fichier sans en-tête. Par défaut, le format est reconnu à
+            leur contenu (voir binaire.format_probable) ; un fichier avec en-tête
+            est toujours au format binaire.
+
+    Returns:
+        bytes ou str: La plage demandée, tronquée à la fin du message
+
+    Raises:
+        ValueError: Si la plage ou le format est invalide, la clé incorrecte ou le
+            message trop court
+    """
+    if start < 0 or length < 0:
+        raise ValueError("Plage de déchiffrement invalide.")
+    if format_source not in (None, binaire.FORMAT_TEXTE, binaire.FORMAT_BINAIRE):
+        raise ValueError(f"Format de message chiffré non pris en charge : {format_source}")
+    key_values = second.generate_key_values(key)
+
+    if isinstance(source, str):
+        algorithme = algorithme_precompression(source)
+        if algorithme is not None:
+            chiffre = io.StringIO(source)
+            chiffre.seek(len(PREFIXES_COMPRESSION[algorithme]))
+            morceaux = second.secure_decode_bytes_stream(lire_trames(chiffre))
+            return dechiffrer_plage_compressee(morceaux, key_values, algorithme, start, length, texte=True)
+        return dechiffrer_plage_texte(lire_trames(io.StringIO(source)), key_values, start, length)
+
+    if not hasattr(source, 'read'):
+        donnees = memoryview(source)
+        if format_source is None:
+            format_source = binaire.format_probable(donnees[:binaire.TAILLE_SONDE])
+        if format_source == binaire.FORMAT_TEXTE:
+            morceaux = (str(donnees[position:position + TAILLE_TRAME], 'ascii', errors='ignore')
+                        for position in range(0, len(donnees), TAILLE_TRAME))
+            return dechiffrer_plage_texte(morceaux, key_values, start, length)
+        return dechiffrer_plage_octets(lambda position, taille: donnees[position:position + taille],
+                                       len(donnees), key_values, start, length)
+
+    entete = binaire.lire_entete(source)
+    if entete is not None:
+        algorithme = binaire.algorithme_compression(entete['drapeaux'])
+        if algorithme is not None:
+            return dechiffrer_plage_compressee(lire_trames(source), key_values, algorithme, start, length)
+    else:
+        origine = source.tell()
+        if format_source is None:
+            format_source = binaire.format_probable(source.read(binaire.TAILLE_SONDE))
+            source.seek(origine)
+        if format_source == binaire.FORMAT_TEXTE:
+            # Ancien format texte : seuls les caractères ASCII de l'alphabet comptent
+            morceaux = (trame.decode('ascii', errors='ignore') for trame in lire_trames(source))
+            return dechiffrer_plage_texte(morceaux, key_values, start, length)
+
+    origine = source.tell()
+    source.seek(0, os.SEEK_END)
+    taille_chiffree = source.tell() - origine
+
+    def lire(position, taille):
+        source.seek(origine + position)
+        return source.read(taille)
+
+    return dechiffrer_plage_octets(lire, taille_chiffree, key_values, start, length)
+
+def dechiffrer_plage_octets(lire, taille_chiffree, key_values, start, length):
+    """
+    Déchiffre une plage d'un message au format binaire en ne lisant que les blocs
+    qui la couvrent (voir dechiffrer_range).
+
+    Args:
+        lire: Fonction (position, taille) qui retourne les octets chiffrés correspondants
+        taille_chiffree (int): Taille totale du message chiffré
+    """
+    longueur = moteur.longueur_empreinte_chiffree(key_values)
+    controler_empreinte(array(moteur.TYPE_OCTETS, lire(0, longueur + 1)), key_values)
+    return extraire_plage_octets(lire, taille_chiffree, key_values, start, length)
+
+def extraire_plage_octets(lire, taille_chiffree, key_values, start, length):
+    """dechiffrer_plage_octets, une fois la clé contrôlée."""
+    # L'élément n du message d'origine (empreinte comprise) est à la position 2n
+    # une fois les leurres insérés, et y reste à la transposition près
+    decalage = len(key_values['fingerprint']) + start
+    debut = 2 * decalage
+    fin = min(2 * (decalage + length), taille_chiffree)
+    if debut >= fin:
+        return b""
+
+    # Étendre la plage aux blocs de transposition complets (le dernier bloc du
+    # message peut être incomplet, il est alors lu en entier)
+    block_size = key_values['block_size']
+    debut_blocs = debut - debut % block_size
+    fin_blocs = min(fin - fin % -block_size, taille_chiffree)
+
+    segment = array(moteur.TYPE_OCTETS, lire(debut_blocs, fin_blocs - debut_blocs))
+    contracted = moteur.dechiffrer_points(segment, key_values, debut_blocs)
+
+    # Le premier élément déchiffré correspond à la position paire qui suit debut_blocs
+    premier = decalage - (debut_blocs + 1) // 2
+    return contracted[premier:premier + length].tobytes()
+
+def dechiffrer_plage_compressee(morceaux, key_values, algorithme, start, length, texte=False):
+    """
+    Déchiffre une plage d'un message pré-compressé : les octets chiffrés sont
+    déchiffrés puis décompressés en flux, en s'arrêtant à la fin de la plage
+    (voir dechiffrer_range).
+
+    Args:
+        morceaux: Suite de morceaux d'octets chiffrés (sans en-tête ni préfixe)
+        algorithme (str): compression.ZLIB ou compression.LZMA
+        texte (bool): Le message d'origine est un texte : la plage est comptée en
+            caractères et retournée en str
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou les données compressées corrompues
+    """
+    trames = (array(moteur.TYPE_OCTETS, morceau) for morceau in morceaux)
+    contracted = (points.tobytes() for points in moteur.dechiffrer_trames(trames, key_values))
+    compresses = retirer_empreinte(contracted, key_values['fingerprint'].encode('ascii'))
+
+    decodeur = codecs.getincrementaldecoder('utf-8')() if texte else None
+    plage = []
+    position = 0
+    fin = start + length
+    for donnees in compression.decompresser_flux(compresses, algorithme):
+        if decodeur is not None:
+            donnees = decodeur.decode(donnees)
+        if position + len(donnees) > start:
+            plage.append(donnees[max(start - position, 0):fin - position])
+        position += len(donnees)
+        if position >= fin:
+            break
+    return ("" if texte else b"").join(plage)
+
+class LecteurDechiffre:
+    """
+    Fichier en lecture seule (read, seek, tell) qui donne les octets d'origine d'un
+    fichier chiffré au format binaire, en ne déchiffrant que les blocs lus (voir
+    dechiffrer_range). zipfile peut ainsi lire une archive chiffrée sur place.
+
+    Chaque lecture déchiffre au moins `taille_lecture` octets, gardés pour les
+    lectures suivantes. Un message pré-compressé ne se lit pas par accès direct :
+    il est refusé dès la création du lecteur.
+
+    Raises:
+        ValueError: Si la clé est incorrecte ou le message pré-compressé
+    """
+
+    def __init__(self, source, key, taille_lecture=TAILLE_TRAME):
+        self.source = source
+        self.key_values = second.generate_key_values(key)
+        self.taille_lecture = taille_lecture
+
+        # Le message chiffré commence à la position courante, après l'en-tête :
+        # celui-ci est lu s'il n'a pas encore été passé, relu sinon
+        origine = source.tell()
+        if origine in (0, binaire.ENTETE.size):
+            source.seek(0)
+            entete = binaire.lire_entete(source)
+            if entete is None:
+                source.seek(origine)
+            elif binaire.algorithme_compression(entete['drapeaux']) is not None:
+                raise ValueError("Message pré-compressé : la lecture par accès direct n'est pas possible.")
+        self.origine = source.tell()
+        source.seek(0, os.SEEK_END)
+        self.taille_chiffree = source.tell() - self.origine
+
+        longueur = moteur.longueur_empreinte_chiffree(self.key_values)
+        controler_empreinte(array(moteur.TYPE_OCTETS, self.lire_chiffre(0, longueur + 1)), self.key_values)
+
+        # Chaque octet d'origine, empreinte comprise, occupe deux octets chiffrés
+        self.taille = self.taille_chiffree // 2 - len(self.key_values['fingerprint'])
+        self.position = 0
+        self.tampon = b""
+        self.debut_tampon = 0
+
+    def lire_chiffre(self, position, taille):
+        self.source.seek(self.origine + position)
+        return self.source.read(taille)
+
+    def read(self, taille=-1):
+        if taille is None or taille < 0:
+            taille = self.taille - self.position
+        fin = min(self.position + taille, self.taille)
+        if fin <= self.position:
+            return b""
+
+        if not self.debut_tampon <= self.position <= fin <= self.debut_tampon + len(self.tampon):
+            self.tampon = extraire_plage_octets(self.lire_chiffre, self.taille_chiffree, self.key_values,
+                                                self.position, max(fin - self.position, self.taille_lecture))
+            self.debut_tampon = self.position
+
+        donnees = self.tampon[self.position - self.debut_tampon:fin - self.debut_tampon]
+        self.position = fin
+        return donnees
+
+    def seek(self, position, origine=os.SEEK_SET):
+        if origine == os.SEEK_CUR:
+            position += self.position
+        elif origine == os.SEEK_END:
+            position += self.taille
+        if position < 0:
+            raise ValueError("Position négative.")
+        self.position = position
+        return position
+
+    def tell(self):
+        return self.position
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+def dechiffrer_plage_texte(morceaux, key_values, start, length):
+    """
+    Déchiffre une plage d'un message au format texte, en flux, en s'arrêtant à la
+    fin de la plage (voir dechiffrer_range).
+    """
+    decoded = second.secure_decode_stream(morceaux)
+    contracted = moteur.dechiffrer_trames(map(moteur.texte_vers_points, decoded), key_values)
+    textes = retirer_empreinte((moteur.points_vers_texte(points) for points in contracted),
+                               key_values['fingerprint'])
+
+    plage = []
+    position = 0
+    for texte in textes:
+        if position + len(texte) > start:
+            plage.append(texte[max(start - position, 0):start + length - position])
+        position += len(texte)
+        if position >= start + length:
+            break
+    return "".join(plage)
+
+def dechiffrer_batch(messages_chiffres, key, workers=None):
+    """
+    Déchiffre une suite de messages chiffrés avec la même clé (voir chiffrer_batch).
+
+    Returns:
+        list: Un dictionnaire par message : {'resultat': message déchiffré, 'erreur': None},
+        ou {'resultat': None, 'erreur': description} (clé incorrecte, message trop court...)
+
+    Raises:
+        ValueError: Si la clé est vide
+    """
+    if not key:
+        raise ValueError("La clé ne peut pas être vide.")
+    key_values = second.generate_key_values(key)
+    taches = ((dechiffrer_lot, lot, key_values) for lot in lire_lots(messages_chiffres))
+    return [resultat for resultats in moteur.executer(taches, workers) for resultat in resultats]
+
+def dechiffrer_lot(messages_chiffres, key_values):
+    """Déchiffre un lot de messages pour dechiffrer_batch."""
+    key_values = moteur.preparer_tables(key_values, moteur.TYPE_POINTS)
+    fingerprint = key_values['fingerprint']
+    resultats = []
+    for message_chiffre in messages_chiffres:
+        try:
+            decoded = moteur.texte_vers_points(second.secure_decode(message_chiffre))
+            contracted = moteur.points_vers_texte(moteur.dechiffrer_points(decoded, key_values))
+            message = "".join(retirer_empreinte([contracted], fingerprint))
+            resultats.append({'resultat': message, 'erreur': None})
+        except Exception as e:
+            resultats.append({'resultat': None, 'erreur': str(e)})
+    return resultats
+
+def verifier_cle(message_chiffre, key):
+    """
+    Indique si `key` est la clé d'un message chiffré, texte (chiffrer) ou octets
+    (chiffrer_octets), sans le déchiffrer entièrement.
+
+    Seuls les premiers blocs du message sont décodés et déchiffrés : la durée de
+    la vérification ne dépend pas de la taille du message.
+
+    Returns:
+        bool: True si l'empreinte de la clé correspond
+    """
+    if not key:
+        return False
+
+    key_values = second.generate_key_values(key)
+    longueur = moteur.longueur_empreinte_chiffree(key_values) + 1
+    try:
+        if algorithme_precompression(message_chiffre) is not None:
+            debut = array(moteur.TYPE_OCTETS, decoder_debut_octets(message_chiffre, longueur))
+        elif isinstance(message_chiffre, str):
+            debut = moteur.texte_vers_points(decoder_debut(message_chiffre, longueur))
+        else:
+            debut = array(moteur.TYPE_OCTETS, message_chiffre[:longueur])
+        controler_empreinte(debut, key_values)
+    except ValueError:
+        return False
+    return True
+
+def decoder_debut(message_chiffre, nombre):
+    """
+    Décode le début d'un message chiffré, jusqu'à obtenir au moins `nombre`
+    caractères (ou tout le message s'il est plus court).
+    """
+    # Un caractère occupe au plus 4 octets en UTF-8, soit moins de 6 caractères encodés
+    taille = 6 * nombre
+    morceaux = (message_chiffre[i:i + taille] for i in range(0, len(message_chiffre), taille))
+    debut = ""
+    for texte in second.secure_decode_stream(morceaux):
+        debut += texte
+        if len(debut) >= nombre:
+            break
+    return debut
+
+def algorithme_precompression(message_chiffre):
+    """Algorithme de pré-compression d'un message chiffré (d'après son préfixe), ou None."""
+    if isinstance(message_chiffre, str):
+        for algorithme, prefixe in PREFIXES_COMPRESSION.items():
+            if message_chiffre.startswith(prefixe):
+                return algorithme
+    return None
+
+def decoder_debut_octets(message_chiffre, nombre):
+    """
+    Décode les `nombre` premiers octets chiffrés d'un message pré-compressé
+    (ou tout le message s'il est plus court).
+    """
+    prefixe = PREFIXES_COMPRESSION[algorithme_precompression(message_chiffre)]
+    debut = second.HORS_ALPHABET.sub("", message_chiffre[len(prefixe):len(prefixe) + 2 * nombre])
+    # 4 caractères encodés donnent 3 octets
+    return second.secure_decode_bytes(debut[:4 * (nombre // 3 + 1)])[:nombre]
+
+def controler_empreinte(debut, key_values):
+    """
+    Vérifie l'empreinte de la clé à partir du début d'un message chiffré décodé
+    (points de code ou octets). Seuls les blocs qui contiennent l'empreinte sont
+    déchiffrés, et la comparaison se fait en temps constant.
+
+    Args:
+        debut (array): Les longueur_empreinte_chiffree(key_values) + 1 premiers
+            éléments du message, ou le message entier s'il est plus court
+        key_values (dict): Valeurs dérivées de la clé
+
+    Raises:
+        ValueError: Si l'empreinte ne correspond pas ou si le message est trop court
+    """
+    fingerprint = key_values['fingerprint']
+    longueur = moteur.longueur_empreinte_chiffree(key_values)
+
+    # Au-delà de `longueur` éléments, le message continue après l'empreinte
+    complet = len(debut) <= longueur
+    contracted = moteur.dechiffrer_points(debut[:longueur], key_values)
+
+    if complet and len(contracted) <= len(fingerprint):
+        raise ValueError("Message trop court ou clé incorrecte.")
+
+    attendue = array(debut.typecode, [ord(c) for c in fingerprint])
+    if not hmac.compare_digest(contracted[:len(fingerprint)].tobytes(), attendue.tobytes()):
+        raise ValueError("Clé de déchiffrement incorrecte.")
+
+def retirer_empreinte(morceaux, fingerprint):
+    """
+    Vérifie l'empreinte de la clé en tête d'une suite de morceaux déchiffrés
+    (texte ou octets), puis produit ces morceaux sans l'empreinte.
+
+    Raises:
+        ValueError: Si l'empreinte ne correspond pas ou si le message est trop court
+    """
+    fingerprint_length = len(fingerprint)
+    entete = fingerprint[:0]
+    for morceau in morceaux:
+        if entete is not None:
+            entete += morceau
+            if len(entete) <= fingerprint_length:
+                continue
+            if entete[:fingerprint_length] != fingerprint:
+                raise ValueError("Clé de déchiffrement incorrecte.")
+            morceau = entete[fingerprint_length:]
+            entete = None
+        yield morceau
+
+    if entete is not None:
+        raise ValueError("Message trop court ou clé incorrecte.")
+
 def dechiffrer_text():
     try:
         root = tk.Tk()
@@ -231,24 +1250,16 @@ def dechiffrer_text():
         if not file_path:
             return "Aucun fichier sélectionné."
 
-        try:
-            with open(file_path, 'r') as file:
-                contenu = file.read()
-        except Exception as e:
-            return f"Erreur lors de la lecture du fichier : {e}"
+        if not os.access(file_path, os.R_OK):
+            return f"Erreur lors de la lecture du fichier : {file_path}"
 
         try:
             key = second.demand_key()
-            contenu_dechiffre = dechiffrer(contenu, key)
+            # Traitement en flux : le fichier n'est jamais chargé entièrement
+            dechiffrer_fichier_texte(file_path, key)
         except Exception as e:
             return f"Erreur lors du déchiffrement : {e}"
 
-        try:
-            with open(file_path, 'w') as file2:
-                file2.write(contenu_dechiffre)
-        except Exception as e:
-            return f"Erreur lors de l'écriture du fichier : {e}"
-
         return f"✅  Fichier déchiffré avec succès : {file_path}"
 
     except Exception as e:
@@ -281,8 +1292,9 @@ def chiffrer_dossier_avec_dialogue():
     cle = second.demand_key()
     
     try:
-        chemin_resultat = chiffrer_dossier(dossier_source, cle, dossier_destination)
-        return f"✅  Dossier chiffré enregistré sous: {chemin_resultat}"
+        bilan = compression.nouveau_bilan()
+        chemin_resultat = chiffrer_dossier(dossier_source, cle, dossier_destination, bilan_compression=bilan)
+        return f"✅  Dossier chiffré enregistré sous: {chemin_resultat}\n{compression.resumer(bilan)}"
     except Exception as e:
         return f"Erreur lors du chiffrement: {str(e)}"
 
@@ -294,7 +1306,7 @@ def dechiffrer_dossier_avec_dialogue():
     
     # Laisser l'utilisateur sélectionner n'importe quel fichier
     fichier_source = filedialog.askopenfilename(
-        title="Sélectionner le fichier de dossier chiffré (.encrypted)",
+        title="Sélectionner le fichier de dossier chiffré (.exegolencrypt)",
         # Ne pas spécifier de filtres pour éviter les problèmes
     )
     
@@ -303,7 +1315,7 @@ def dechiffrer_dossier_avec_dialogue():
     
     # Vérifier manuellement l'extension après la sélection
     if not fichier_source.endswith(".exegolencrypt"):
-        return f"❌ Erreur: Le fichier sélectionné n'est pas un fichier .encrypted. Veuillez sélectionner un fichier chiffré valide."
+        return f"❌ Erreur: Le fichier sélectionné n'est pas un fichier .exegolencrypt. Veuillez sélectionner un fichier chiffré valide."
     
     dossier_destination = selectionner_dossier("Sélectionner où extraire le dossier déchiffré")
     
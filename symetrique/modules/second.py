@@ -1,4 +1,17 @@
 # Fonctions de chiffrement et déchiffrement
+import base64
+import codecs
+import math
+import re
+import threading
+from collections import OrderedDict
+
+# Alphabet de l'encodage final (similaire à base64 mais sûr pour les URLs)
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+HORS_ALPHABET = re.compile("[^A-Za-z0-9_-]")
+
+# Nombre de caractères de l'empreinte de la clé placée en tête du message
+LONGUEUR_EMPREINTE = 10
 
 # Couleurs ANSI pour terminal
 class Colors:
@@ -53,11 +66,48 @@ def demand_key():
         return key
 
 
+# Cache des valeurs dérivées des clés (LRU borné)
+TAILLE_CACHE_CLES = 64
+_cache_cles = OrderedDict()
+_verrou_cache_cles = threading.Lock()
+
 def generate_key_values(key):
     """
     Génère différentes valeurs dérivées de la clé pour être utilisées dans les différentes étapes
     du chiffrement, sans utiliser de bibliothèques cryptographiques.
+
+    Les valeurs des TAILLE_CACHE_CLES dernières clés utilisées sont gardées en cache
+    et retournées sans copie : leurs tableaux sont des tuples, que personne ne peut
+    modifier. Le cache garde à part ses propres tableaux de calcul, seuls remis à
+    zéro lorsque la clé en sort (voir vider_cache_cles).
     """
+    with _verrou_cache_cles:
+        entree = _cache_cles.get(key)
+        if entree is not None:
+            _cache_cles.move_to_end(key)
+            return entree[0]
+
+    tableaux = calculer_key_values(key)
+    key_values = figer_key_values(tableaux)
+
+    with _verrou_cache_cles:
+        _cache_cles[key] = (key_values, tableaux)
+        _cache_cles.move_to_end(key)
+        while len(_cache_cles) > TAILLE_CACHE_CLES:
+            _, (_, evinces) = _cache_cles.popitem(last=False)
+            effacer_key_values(evinces)
+        return key_values
+
+def figer_key_values(key_values):
+    """Valeurs dérivées d'une clé dont les tableaux sont remplacés par des tuples."""
+    figees = dict(key_values)
+    figees['char_values'] = tuple(key_values['char_values'])
+    figees['leurres'] = tuple(key_values['leurres'])
+    figees['tables_xor'] = {masque: tuple(table) for masque, table in key_values['tables_xor'].items()}
+    return figees
+
+def calculer_key_values(key):
+    """Calcule les valeurs dérivées de la clé, sans passer par le cache."""
     # Somme des valeurs Unicode de chaque caractère de la clé
     key_sum = sum(ord(c) for c in key)
     
@@ -70,19 +120,46 @@ def generate_key_values(key):
     
     # Génération d'une empreinte simple basée sur la clé
     fingerprint = ""
-    for i in range(10):  # Créer une empreinte de 10 caractères
+    for i in range(LONGUEUR_EMPREINTE):  # Créer une empreinte de 10 caractères
         index = (key_sum + i) % len(key)
         char_value = ord(key[index])
         fingerprint += chr(33 + (char_value % 94))  # Caractères imprimables ASCII
     
+    # Une période complète des caractères leurres : le leurre inséré après le
+    # caractère i vaut (ord(key[i % len(key)]) + i) % 95 + 32, la suite se répète
+    # donc toutes les ppcm(len(key), 95) positions
+    periode = len(key) * 95 // math.gcd(len(key), 95)
+    leurres = [(char_values[i % len(key)] + i) % 95 + 32 for i in range(periode)]
+    
+    # Tables du XOR, réduites à 16 bits pour le texte et à 8 bits pour les octets
+    tables_xor = {masque: [value & masque for value in char_values] for masque in (0xFFFF, 0xFF)}
+    
     return {
         'caesar_shift': caesar_shift,
         'block_size': block_size,
         'char_values': char_values,
         'fingerprint': fingerprint,
-        'key_sum': key_sum
+        'key_sum': key_sum,
+        'leurres': leurres,
+        'tables_xor': tables_xor
     }
 
+def effacer_key_values(key_values):
+    """Remet à zéro puis vide les tableaux dérivés d'une clé."""
+    tableaux = [key_values['char_values'], key_values['leurres']]
+    tableaux.extend(key_values['tables_xor'].values())
+    for tableau in tableaux:
+        tableau[:] = [0] * len(tableau)
+        tableau.clear()
+    key_values['key_sum'] = key_values['caesar_shift'] = 0
+
+def vider_cache_cles():
+    """Vide le cache des valeurs dérivées des clés en remettant à zéro chaque entrée."""
+    with _verrou_cache_cles:
+        while _cache_cles:
+            _, (_, tableaux) = _cache_cles.popitem()
+            effacer_key_values(tableaux)
+
 # Chiffrement
 
 def secure_encode(text):
@@ -90,29 +167,19 @@ def secure_encode(text):
     Encodage sécurisé sans dépendances externes.
     Encodage similaire à base64 mais avec une meilleure prise en charge des caractères Unicode.
     """
-    # Alphabet standard pour l'encodage (similaire à base64 mais sûr pour les URLs)
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
-    
     # Convertir la chaîne en octets UTF-8
-    bytes_data = text.encode('utf-8')
-    
-    # Convertir les octets en une chaîne binaire
-    binary = ""
-    for byte in bytes_data:
-        binary += format(byte, '08b')  # Convertir en binaire sur 8 bits
-    
-    # Compléter avec des zéros pour avoir un multiple de 6 bits
-    padding_needed = (6 - len(binary) % 6) % 6
-    binary += "0" * padding_needed
-    
-    # Encoder par groupes de 6 bits
-    result = ""
-    for i in range(0, len(binary), 6):
-        chunk = binary[i:i+6]
-        index = int(chunk, 2)
-        result += alphabet[index]
-    
-    return result
+    return secure_encode_bytes(text.encode('utf-8'))
+
+def secure_encode_bytes(bytes_data):
+    """
+    Encode des octets avec l'alphabet de secure_encode.
+
+    L'alphabet est exactement celui de base64 « URL-safe » : chaque groupe de
+    3 octets donne 4 caractères via les tables précalculées du module base64, sans
+    étape de traduction. Seul le remplissage '=' est retiré, les derniers bits étant
+    complétés par des zéros comme dans l'encodage bit à bit historique.
+    """
+    return base64.urlsafe_b64encode(bytes_data).rstrip(b"=").decode('ascii')
 
 # Déchiffrement
 
@@ -120,28 +187,7 @@ def secure_decode(encoded):
     """
     Décodage sécurisé sans dépendances externes.
     """
-    # Alphabet identique à celui utilisé pour l'encodage
-    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
-    
-    # Convertir l'encodage en bits
-    binary = ""
-    for char in encoded:
-        if char in alphabet:
-            index = alphabet.index(char)
-            binary += format(index, '06b')  # 6 bits par caractère
-    
-    # Supprimer les bits de padding (si nécessaire)
-    # Note: nous supprimons les bits qui ne complètent pas un octet entier
-    remainder = len(binary) % 8
-    if remainder != 0:
-        binary = binary[:-remainder]
-    
-    # Convertir les bits en octets puis en chaîne UTF-8
-    result_bytes = bytearray()
-    for i in range(0, len(binary), 8):
-        if i + 8 <= len(binary):  # S'assurer qu'on a un octet complet
-            byte = int(binary[i:i+8], 2)
-            result_bytes.append(byte)
+    result_bytes = secure_decode_bytes(encoded)
     
     # Décoder les octets en chaîne UTF-8
     try:
@@ -150,6 +196,67 @@ def secure_decode(encoded):
         # En cas d'erreur, essayer de récupérer ce qu'on peut
         return result_bytes.decode('utf-8', errors='replace')
 
+def secure_decode_bytes(encoded):
+    """
+    Décode une chaîne produite par secure_encode_bytes par groupes de 4 caractères
+    (tables précalculées du module base64). Les caractères hors alphabet sont ignorés
+    et les bits qui ne complètent pas un octet entier sont supprimés.
+    """
+    encoded = HORS_ALPHABET.sub("", encoded)
+
+    # Un caractère isolé en fin de chaîne (6 bits) ne complète aucun octet
+    if len(encoded) % 4 == 1:
+        encoded = encoded[:-1]
+
+    return base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+
+# Encodage et décodage en flux
+
+def secure_encode_stream(morceaux):
+    """
+    Encode une suite de morceaux d'octets comme secure_encode_bytes le ferait
+    sur leur concaténation. Les octets sont traités par groupes de 3 (24 bits,
+    soit 4 caractères) et le reste est reporté sur le morceau suivant.
+    """
+    reste = b""
+    for morceau in morceaux:
+        donnees = reste + morceau
+        coupe = len(donnees) - len(donnees) % 3
+        if coupe:
+            yield secure_encode_bytes(donnees[:coupe])
+        reste = donnees[coupe:]
+
+    # Les derniers bits sont complétés par des zéros
+    if reste:
+        yield secure_encode_bytes(reste)
+
+def secure_decode_bytes_stream(morceaux):
+    """
+    Décode une suite de morceaux de texte encodé et produit les octets
+    correspondants, comme secure_decode_bytes le ferait sur leur concaténation.
+    Les caractères sont traités par groupes de 4 et le reste est reporté sur le
+    morceau suivant.
+    """
+    reste = ""
+    for morceau in morceaux:
+        donnees = reste + HORS_ALPHABET.sub("", morceau)
+        coupe = len(donnees) - len(donnees) % 4
+        if coupe:
+            yield secure_decode_bytes(donnees[:coupe])
+        reste = donnees[coupe:]
+
+    yield secure_decode_bytes(reste)
+
+def secure_decode_stream(morceaux):
+    """
+    Décode une suite de morceaux de texte encodé et produit le texte UTF-8
+    correspondant, comme secure_decode le ferait sur leur concaténation.
+    """
+    decodeur = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    for octets in secure_decode_bytes_stream(morceaux):
+        yield decodeur.decode(octets)
+    yield decodeur.decode(b"", final=True)
+
 # Nouvelles fonctions pour gérer les données binaires
 def binary_to_hex_string(binary_data):
     """Convertit des données binaires en chaîne hexadécimale"""
@@ -162,4 +269,30 @@ def hex_string_to_binary(hex_string):
         if i + 1 < len(hex_string):
             byte = int(hex_string[i:i+2], 16)
             result.append(byte)
-    return result
\ No newline at end of file
+    return result
+
+class HexReader:
+    """Lecteur de fichier binaire qui restitue son contenu en hexadécimal, par morceaux."""
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+
+    def read(self, taille=-1):
+        if taille is None or taille < 0:
+            return self.fichier.read().hex()
+        return self.fichier.read(max(taille // 2, 1)).hex()
+
+class HexWriter:
+    """Écrivain qui reçoit du texte hexadécimal par morceaux et écrit les octets correspondants."""
+
+    def __init__(self, fichier):
+        self.fichier = fichier
+        self.reste = ""
+
+    def write(self, hex_string):
+        donnees = self.reste + hex_string
+        coupe = len(donnees) - len(donnees) % 2
+        self.fichier.write(bytes.fromhex(donnees[:coupe]))
+        # Un caractère isolé en fin de flux est ignoré, comme dans hex_string_to_binary
+        self.reste = donnees[coupe:]
+        return len(hex_string)
\ No newline at end of file
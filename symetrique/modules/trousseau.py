@@ -0,0 +1,173 @@
+# Trousseau de clés symétriques
+#
+# Les premiers blocs d'un message chiffré ne contiennent que l'empreinte de la
+# clé et ses leurres, transposés puis passés au XOR : ils ne dépendent que de la
+# clé. Chaque clé du trousseau est donc indexée par ce début de message (sous
+# forme encodée pour le texte, brute pour les octets), ce qui permet de retrouver
+# la clé d'un message en ne lisant que ses premiers caractères.
+
+from array import array
+
+from . import binaire
+from . import moteur
+from . import prim
+from . import second
+
+# Longueur des préfixes indexés. Les blocs qui ne dépendent que de la clé
+# couvrent au moins 14 éléments (blocs de 7), soit au moins 14 octets en
+# UTF-8 et donc au moins 16 caractères encodés.
+LONGUEUR_INDEX_TEXTE = 16
+LONGUEUR_INDEX_OCTETS = 14
+
+# Quantité lue au début d'un fichier chiffré pour y chercher sa clé
+TAILLE_LECTURE = 1024
+
+
+def signature(key_values, typecode):
+    """
+    Début chiffré commun à tous les messages chiffrés avec une clé : les blocs de
+    transposition complets qui ne contiennent que l'empreinte et ses leurres.
+
+    Args:
+        key_values (dict): Valeurs dérivées de la clé
+        typecode (str): moteur.TYPE_POINTS (texte) ou moteur.TYPE_OCTETS
+
+    Returns:
+        array: Les premiers éléments chiffrés
+    """
+    fingerprint = key_values['fingerprint']
+    block_size = key_values['block_size']
+    longueur = 2 * len(fingerprint) // block_size * block_size
+    processed = array(typecode, [ord(c) for c in fingerprint])
+    return moteur.chiffrer_points(processed, key_values)[:longueur]
+
+def signature_texte(key_values):
+    """
+    Début encodé commun à tous les messages chiffrés par prim.chiffrer avec une clé,
+    ou None si cette clé ne peut pas chiffrer de texte (empreinte chiffrée invalide en UTF-8).
+    """
+    try:
+        octets = moteur.points_vers_texte(signature(key_values, moteur.TYPE_POINTS)).encode('utf-8')
+    except UnicodeEncodeError:
+        return None
+    # Seuls les groupes de 3 octets complets donnent des caractères encodés fixes
+    return second.secure_encode_bytes(octets[:len(octets) - len(octets) % 3])
+
+def signature_octets(key_values):
+    """Début commun à tous les messages chiffrés par prim.chiffrer_octets avec une clé."""
+    return signature(key_values, moteur.TYPE_OCTETS).tobytes()
+
+def prefixe_encode(message_chiffre, longueur):
+    """Les `longueur` premiers caractères de l'alphabet de secure_encode d'un message."""
+    prefixe = ""
+    position = 0
+    while len(prefixe) < longueur and position < len(message_chiffre):
+        prefixe += second.HORS_ALPHABET.sub("", message_chiffre[position:position + longueur])
+        position += longueur
+    return prefixe[:longueur]
+
+class Trousseau:
+    """
+    Ensemble de clés symétriques indexées par le début des messages qu'elles chiffrent.
+
+    Exemple :
+        trousseau = Trousseau(["clé 1", "clé 2"])
+        cle = trousseau.trouver(message_chiffre)
+    """
+
+    def __init__(self, cles=()):
+        self.cles = {}
+        self.index_texte = {}
+        self.index_octets = {}
+        for cle in cles:
+            self.ajouter(cle)
+
+    def __len__(self):
+        return len(self.cles)
+
+    def __contains__(self, cle):
+        return cle in self.cles
+
+    def ajouter(self, cle):
+        """Ajoute une clé au trousseau (sans effet si elle y est déjà)."""
+        if not cle:
+            raise ValueError("La clé ne peut pas être vide.")
+        if cle in self.cles:
+            return
+
+        key_values = second.generate_key_values(cle)
+        signatures = {'texte': signature_texte(key_values), 'octets': signature_octets(key_values)}
+        self.cles[cle] = signatures
+
+        if signatures['texte'] is not None:
+            self.index_texte.setdefault(signatures['texte'][:LONGUEUR_INDEX_TEXTE], []).append(cle)
+        self.index_octets.setdefault(signatures['octets'][:LONGUEUR_INDEX_OCTETS], []).append(cle)
+
+    def retirer(self, cle):
+        """Retire une clé du trousseau."""
+        signatures = self.cles.pop(cle)
+        if signatures['texte'] is not None:
+            self._desindexer(self.index_texte, signatures['texte'][:LONGUEUR_INDEX_TEXTE], cle)
+        self._desindexer(self.index_octets, signatures['octets'][:LONGUEUR_INDEX_OCTETS], cle)
+
+    @staticmethod
+    def _desindexer(index, prefixe, cle):
+        cles = index[prefixe]
+        cles.remove(cle)
+        if not cles:
+            del index[prefixe]
+
+    def candidates(self, message_chiffre):
+        """
+        Clés dont la signature correspond au début d'un message chiffré, texte
+        (prim.chiffrer) ou octets (prim.chiffrer_octets), sans rien déchiffrer.
+
+        Returns:
+            list: Les clés candidates, dans l'ordre d'ajout
+        """
+        # Un message pré-compressé contient des octets chiffrés, encodés
+        if prim.algorithme_precompression(message_chiffre) is not None:
+            message_chiffre = prim.decoder_debut_octets(message_chiffre, 2 * LONGUEUR_INDEX_OCTETS)
+        elif isinstance(message_chiffre, str):
+            prefixe = prefixe_encode(message_chiffre, LONGUEUR_INDEX_TEXTE)
+            cles = self.index_texte.get(prefixe, [])
+            if not cles:
+                return []
+            # Les signatures peuvent dépasser la longueur indexée
+            longueur = max(len(self.cles[cle]['texte']) for cle in cles)
+            debut = prefixe_encode(message_chiffre, longueur)
+            return [cle for cle in cles if debut.startswith(self.cles[cle]['texte'])]
+
+        debut = bytes(message_chiffre[:2 * LONGUEUR_INDEX_OCTETS])
+        cles = self.index_octets.get(debut[:LONGUEUR_INDEX_OCTETS], [])
+        return [cle for cle in cles if debut.startswith(self.cles[cle]['octets'])]
+
+    def trouver(self, message_chiffre):
+        """
+        Retrouve la clé d'un message chiffré parmi celles du trousseau. Chaque
+        candidate est confirmée par prim.verifier_cle.
+
+        Returns:
+            str: La clé, ou None si aucune clé du trousseau ne convient
+        """
+        for cle in self.candidates(message_chiffre):
+            if prim.verifier_cle(message_chiffre, cle):
+                return cle
+        return None
+
+    def trouver_fichier(self, chemin):
+        """
+        Retrouve la clé d'un fichier chiffré (format binaire ou texte) en ne lisant
+        que son début.
+
+        Returns:
+            str: La clé, ou None si aucune clé du trousseau ne convient
+        """
+        with open(chemin, 'rb') as fichier:
+            entete = binaire.lire_entete(fichier)
+            debut = fichier.read(TAILLE_LECTURE)
+
+        if entete is None:
+            # Ancien format texte : seuls les caractères de l'alphabet comptent
+            debut = debut.decode('ascii', errors='ignore')
+        return self.trouver(debut)
@@ -0,0 +1,84 @@
+# API asynchrone : même résultat que les fonctions de prim, quel que soit l'executor
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import asymetrique.main as asym
+from symetrique.modules import asynchrone, prim
+
+MESSAGE = "Chiffrement asynchrone, accents é à ç et symboles € ✓\n" * 3000
+
+
+@pytest.fixture(scope="module", params=["boucle", "threads", "processus"])
+def executor(request):
+    if request.param == "boucle":
+        yield None
+    elif request.param == "threads":
+        with ThreadPoolExecutor(2) as executor:
+            yield executor
+    else:
+        with ProcessPoolExecutor(2) as executor:
+            yield executor
+
+
+def test_texte(executor):
+    chiffre = asyncio.run(asynchrone.chiffrer(MESSAGE, "cle-async", executor))
+    assert chiffre == prim.chiffrer(MESSAGE, "cle-async")
+    assert asyncio.run(asynchrone.dechiffrer(chiffre, "cle-async", executor)) == MESSAGE
+    assert asyncio.run(asynchrone.dechiffrer(chiffre, "faux", executor)).startswith("Erreur")
+
+
+def test_texte_precompresse(executor):
+    chiffre = asyncio.run(asynchrone.chiffrer(MESSAGE, "cle-async", executor, precompression=True))
+    assert chiffre == prim.chiffrer(MESSAGE, "cle-async", precompression=True)
+    assert asyncio.run(asynchrone.dechiffrer(chiffre, "cle-async", executor)) == MESSAGE
+
+
+def test_octets(executor):
+    donnees = os.urandom(600000)
+    chiffre = asyncio.run(asynchrone.chiffrer_octets(donnees, "cle-async", executor))
+    assert chiffre == prim.chiffrer_octets(donnees, "cle-async")
+    assert asyncio.run(asynchrone.dechiffrer_octets(chiffre, "cle-async", executor)) == donnees
+    with pytest.raises(ValueError):
+        asyncio.run(asynchrone.dechiffrer_octets(chiffre, "faux", executor))
+
+
+def test_fichier_texte(tmp_path, executor):
+    chemin = tmp_path / "message.txt"
+    chemin.write_text(MESSAGE, encoding="utf-8")
+    original = chemin.read_bytes()
+
+    asyncio.run(asynchrone.chiffrer_fichier_texte(str(chemin), "cle-async", executor))
+    chiffre = chemin.read_bytes()
+    asyncio.run(asynchrone.dechiffrer_fichier_texte(str(chemin), "cle-async", executor))
+    assert chemin.read_bytes() == original
+
+    prim.chiffrer_fichier_texte(str(chemin), "cle-async")
+    assert chemin.read_bytes() == chiffre
+    assert list(tmp_path.iterdir()) == [chemin]
+
+
+def test_fichier_io_executor_processus(tmp_path):
+    chemin = tmp_path / "message.txt"
+    chemin.write_text(MESSAGE, encoding="utf-8")
+    with ProcessPoolExecutor(1) as executor:
+        with pytest.raises(TypeError):
+            asyncio.run(asynchrone.chiffrer_fichier_texte(str(chemin), "cle", io_executor=executor))
+    assert chemin.read_text(encoding="utf-8") == MESSAGE
+    assert list(tmp_path.iterdir()) == [chemin]
+
+
+@pytest.fixture(scope="module")
+def cles_rsa():
+    return asym.generate_keys(512)
+
+
+def test_asymetrique(executor, cles_rsa):
+    public_key, private_key = cles_rsa
+    salt, iv = asym.generate_salt(), asym.generate_salt()
+    message = "Message asymétrique " * 4
+    chiffre = asyncio.run(asym.encrypt_async(message, public_key, salt, iv, executor, slice_size=16))
+    assert asym.decrypt(chiffre, private_key, iv) == message
+    assert asyncio.run(asym.decrypt_async(chiffre, private_key, iv, executor, slice_size=3)) == message
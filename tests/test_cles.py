@@ -0,0 +1,43 @@
+# Cache des valeurs dérivées des clés (second.generate_key_values)
+import io
+
+import pytest
+
+from symetrique.modules import prim, second
+
+
+@pytest.fixture(autouse=True)
+def cache_vide():
+    second.vider_cache_cles()
+    yield
+    second.vider_cache_cles()
+
+
+def test_valeurs_identiques_sans_cache():
+    key_values = second.generate_key_values("Exegol-Kyber-42")
+    assert key_values == second.figer_key_values(second.calculer_key_values("Exegol-Kyber-42"))
+
+
+def test_valeurs_partagees_sans_copie():
+    premier = second.generate_key_values("cle")
+    assert second.generate_key_values("cle") is premier
+    assert isinstance(premier['leurres'], tuple)
+    assert all(isinstance(table, tuple) for table in premier['tables_xor'].values())
+
+
+def test_eviction_ne_touche_pas_les_valeurs_utilisees():
+    key_values = second.generate_key_values("cle")
+    attendu = second.figer_key_values(second.calculer_key_values("cle"))
+    for i in range(second.TAILLE_CACHE_CLES + 5):
+        second.generate_key_values(f"autre-{i}")
+    second.vider_cache_cles()
+    assert key_values == attendu
+
+
+def test_lecteur_survit_a_l_eviction():
+    donnees = bytes(range(256)) * 100
+    chiffre = prim.chiffrer_octets(donnees, "cle")
+    lecteur = prim.LecteurDechiffre(io.BytesIO(chiffre), "cle", taille_lecture=64)
+    second.vider_cache_cles()
+    lecteur.seek(1000)
+    assert lecteur.read(100) == donnees[1000:1100]
@@ -0,0 +1,109 @@
+# Compatibilité avec le format historique : vecteurs produits par la version
+# d'origine de prim.chiffrer, qui doivent rester identiques octet pour octet
+import io
+
+import pytest
+
+from symetrique.modules import binaire, prim, second
+
+VECTEURS = [
+    ("Bonjour le monde", "Exegol",
+     "f0MAAURGbVBXSFteBUMOAV5Ga1BdCFUuAxIUCVgZcRdbRy8eCR0SC1IBf1ghCSkDFx0YAw"),
+    ("Accents é à ç, euro € et emoji ✓", "clé-secrète-42",
+     "TCHDjwMgQTZYw55fKxV6YiJSw5x_VV9LLcKNFAZ1VwJDN8KaEQdXDUoITUVrw51sQyDDhU3ClC1DH8KaGhBLUQxDBeKBhWdTJQw0w4gzEX"
+     "lRXgk2woZDHjMGCeKfuwhFWV1-"),
+    ("x", "k", "RkVHRURFRUVaRVtFWEVZRV5FX0VdEw"),
+    ("Ligne 1\nLigne 2\tTab", "abcdefg",
+     "R0ZGRkFMT0lFRUBLTEtIT0VPQE8AUAtMKFUDUg9RaVBUVEdbC1soUwNQD14EWVddR1gDIjBab1kDIQ"),
+]
+
+
+@pytest.mark.parametrize("message,key,attendu", VECTEURS)
+def test_chiffrer_identique(message, key, attendu):
+    assert prim.chiffrer(message, key) == attendu
+    assert prim.dechiffrer(attendu, key) == message
+
+
+@pytest.mark.parametrize("message,key,attendu", VECTEURS)
+def test_flux_identique(message, key, attendu):
+    sortie = io.StringIO()
+    prim.chiffrer_stream(io.StringIO(message), sortie, key, taille_trame=3)
+    assert sortie.getvalue() == attendu
+
+    sortie = io.StringIO()
+    prim.dechiffrer_stream(io.StringIO(attendu), sortie, key, taille_trame=5)
+    assert sortie.getvalue() == message
+
+
+def test_secure_encode_identique():
+    assert second.secure_encode("Données ✓") == "RG9ubsOpZXMg4pyT"
+    assert second.secure_decode("RG9ubsOpZXMg4pyT") == "Données ✓"
+
+
+def test_batch():
+    messages = [VECTEURS[0][0], "autre message", "é" * 5000]
+    chiffres = prim.chiffrer_batch(messages, "Exegol")
+    assert chiffres[0]['resultat'] == VECTEURS[0][2]
+    assert [r['resultat'] for r in chiffres] == [prim.chiffrer(m, "Exegol") for m in messages]
+    dechiffres = prim.dechiffrer_batch([r['resultat'] for r in chiffres] + ["corrompu!"], "Exegol")
+    assert [r['resultat'] for r in dechiffres[:3]] == messages
+    assert dechiffres[3]['resultat'] is None and dechiffres[3]['erreur']
+    with pytest.raises(ValueError):
+        prim.chiffrer_batch(messages, "")
+
+
+@pytest.mark.parametrize("message,key,attendu", VECTEURS)
+def test_mauvaise_cle(message, key, attendu):
+    assert prim.dechiffrer(attendu, key + "!") == "Erreur: Clé de déchiffrement incorrecte."
+    assert prim.verifier_cle(attendu, key)
+    assert not prim.verifier_cle(attendu, key + "!")
+    assert not prim.verifier_cle(attendu, "")
+
+
+@pytest.mark.parametrize("taille", [1, 1000, 300000])
+def test_precompression(taille):
+    message = ("Texte très compressible. " * (taille // 25 + 1))[:taille]
+    chiffre = prim.chiffrer(message, "cle", precompression=True)
+    assert prim.dechiffrer(chiffre, "cle") == message
+    assert prim.verifier_cle(chiffre, "cle") and not prim.verifier_cle(chiffre, "autre")
+    if taille >= 1000:
+        assert chiffre[:2] in prim.PREFIXES_COMPRESSION.values()
+        assert len(chiffre) < len(prim.chiffrer(message, "cle"))
+
+
+def test_octets():
+    donnees = bytes(range(256)) * 40
+    chiffre = prim.chiffrer_octets(donnees, "cle")
+    assert len(chiffre) == prim.taille_chiffree(len(donnees), "cle")
+    assert prim.dechiffrer_octets(chiffre, "cle") == donnees
+    assert prim.verifier_cle(chiffre, "cle") and not prim.verifier_cle(chiffre, "autre")
+    with pytest.raises(ValueError):
+        prim.dechiffrer_octets(chiffre, "autre")
+
+
+def test_ancien_fichier_texte(tmp_path):
+    # Fichier chiffré par la version d'origine : le message chiffré, en texte
+    chemin = tmp_path / "ancien.txt"
+    chemin.write_text(VECTEURS[1][2], encoding="utf-8")
+    prim.dechiffrer_fichier_texte(str(chemin), VECTEURS[1][1])
+    assert chemin.read_text(encoding="utf-8") == VECTEURS[1][0]
+
+    prim.chiffrer_fichier_texte(str(chemin), VECTEURS[1][1], format_sortie=binaire.FORMAT_TEXTE)
+    assert chemin.read_text(encoding="utf-8") == VECTEURS[1][2]
+
+
+@pytest.mark.parametrize("precompression", [False, True])
+def test_fichier_binaire(tmp_path, precompression):
+    chemin = tmp_path / "message.txt"
+    texte = "Contenu du fichier ✓\n" * 5000
+    chemin.write_text(texte, encoding="utf-8")
+    prim.chiffrer_fichier_texte(str(chemin), "cle", precompression=precompression)
+    with open(chemin, 'rb') as fichier:
+        entete = binaire.lire_entete(fichier)
+    assert entete['contenu'] == binaire.CONTENU_TEXTE
+    assert (binaire.algorithme_compression(entete['drapeaux']) is not None) == precompression
+
+    with pytest.raises(ValueError):
+        prim.dechiffrer_fichier_texte(str(chemin), "autre")
+    prim.dechiffrer_fichier_texte(str(chemin), "cle")
+    assert chemin.read_text(encoding="utf-8") == texte
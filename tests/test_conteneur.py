@@ -0,0 +1,140 @@
+# Conteneur indexé : index, extraction sélective, mise à jour, compactage, reprise
+import os
+
+import pytest
+
+from symetrique.modules import binaire, compression, conteneur, journal, prim
+
+CLE = "cle-conteneur"
+
+
+@pytest.fixture
+def dossier(tmp_path):
+    source = tmp_path / "source"
+    (source / "sous").mkdir(parents=True)
+    (source / "texte.txt").write_text("ligne compressible\n" * 3000, encoding="utf-8")
+    (source / "aleatoire.bin").write_bytes(os.urandom(50000))
+    (source / "image.png").write_bytes(os.urandom(30000))
+    for i in range(20):
+        (source / "sous" / f"petit-{i:02d}.txt").write_text(f"petit fichier {i}\n" * i, encoding="utf-8")
+    return source
+
+
+def contenu(chemin):
+    return {f.relative_to(chemin).as_posix(): f.read_bytes() for f in sorted(chemin.rglob("*")) if f.is_file()}
+
+
+def creer(dossier, chemin, **options):
+    return conteneur.creer_conteneur(str(dossier), CLE, str(chemin), **options)
+
+
+def test_index_et_extraction(tmp_path, dossier):
+    chemin = tmp_path / "c.exegolencrypt"
+    bilan = compression.nouveau_bilan()
+    entrees = creer(dossier, chemin, bilan=bilan)
+    attendu = {"source/" + nom: donnees for nom, donnees in contenu(dossier).items()}
+
+    assert sorted(entree['nom'] for entree in conteneur.lister_conteneur(str(chemin), CLE)) == sorted(attendu)
+    assert len(entrees) == len(attendu)
+    # Les petits fichiers partagent des paquets, l'image n'est pas recompressée
+    assert len({entree['position'] for entree in entrees}) < len(entrees)
+    assert bilan['fichiers_stockes'] >= 1 and bilan['octets_gagnes'] > 0
+
+    extrait = conteneur.extraire_entree(str(chemin), CLE, "source/sous/petit-07.txt", str(tmp_path / "un"))
+    with open(extrait, 'rb') as fichier:
+        assert fichier.read() == attendu["source/sous/petit-07.txt"]
+    assert contenu(tmp_path / "un") == {"source/sous/petit-07.txt": attendu["source/sous/petit-07.txt"]}
+    with pytest.raises(KeyError):
+        conteneur.extraire_entree(str(chemin), CLE, "source/absent", str(tmp_path / "un"))
+
+    conteneur.extraire_conteneur(str(chemin), CLE, str(tmp_path / "tout"))
+    assert contenu(tmp_path / "tout") == attendu
+
+
+def test_mauvaise_cle(tmp_path, dossier):
+    chemin = tmp_path / "c.exegolencrypt"
+    creer(dossier, chemin)
+    with pytest.raises(ValueError):
+        conteneur.lister_conteneur(str(chemin), "autre")
+
+
+def test_via_chiffrer_dossier(tmp_path, dossier):
+    chemin = prim.chiffrer_dossier(str(dossier), CLE, str(tmp_path), binaire.FORMAT_CONTENEUR)
+    with open(chemin, 'rb') as fichier:
+        assert binaire.lire_entete(fichier)['contenu'] == binaire.CONTENU_CONTENEUR
+    prim.dechiffrer_dossier(chemin, CLE, str(tmp_path / "sortie"))
+    assert contenu(tmp_path / "sortie" / "source") == contenu(dossier)
+
+
+def test_mise_a_jour_et_compactage(tmp_path, dossier):
+    chemin = tmp_path / "c.exegolencrypt"
+    creer(dossier, chemin)
+    taille_initiale = os.path.getsize(chemin)
+
+    # Sans changement, le conteneur n'est pas modifié
+    bilan = conteneur.mettre_a_jour_conteneur(str(dossier), CLE, str(chemin))
+    assert (bilan['ajoutes'], bilan['modifies'], bilan['supprimes']) == ([], [], [])
+    assert os.path.getsize(chemin) == taille_initiale
+
+    (dossier / "texte.txt").write_text("nouveau contenu\n" * 100, encoding="utf-8")
+    (dossier / "aleatoire.bin").unlink()
+    (dossier / "sous" / "nouveau.txt").write_text("ajouté", encoding="utf-8")
+    bilan = conteneur.mettre_a_jour_conteneur(str(dossier), CLE, str(chemin))
+    assert bilan['ajoutes'] == ["source/sous/nouveau.txt"]
+    assert bilan['modifies'] == ["source/texte.txt"]
+    assert bilan['supprimes'] == ["source/aleatoire.bin"]
+    assert bilan['inchanges'] == 21
+    assert bilan['espace_perdu'] > 50000
+
+    conteneur.extraire_conteneur(str(chemin), CLE, str(tmp_path / "apres"))
+    assert contenu(tmp_path / "apres" / "source") == contenu(dossier)
+
+    taille = os.path.getsize(chemin)
+    assert conteneur.compacter_conteneur(str(chemin), CLE) == taille - os.path.getsize(chemin)
+    assert os.path.getsize(chemin) < taille
+    conteneur.extraire_conteneur(str(chemin), CLE, str(tmp_path / "compacte"))
+    assert contenu(tmp_path / "compacte" / "source") == contenu(dossier)
+
+
+def test_mise_a_jour_annulee(tmp_path, dossier, monkeypatch):
+    chemin = tmp_path / "c.exegolencrypt"
+    creer(dossier, chemin)
+    original = chemin.read_bytes()
+    (dossier / "texte.txt").write_text("modifié", encoding="utf-8")
+
+    def echec(*args, **kwargs):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(conteneur, "ecrire_index", echec)
+    with pytest.raises(OSError):
+        conteneur.mettre_a_jour_conteneur(str(dossier), CLE, str(chemin))
+    assert chemin.read_bytes() == original
+
+
+def test_reprise(tmp_path, dossier, monkeypatch):
+    chemin = tmp_path / "c.exegolencrypt"
+    chiffrer_fichier = conteneur.chiffrer_fichier
+    appels = []
+
+    def chiffrer_puis_echouer(*args):
+        appels.append(args[0])
+        if len(appels) == 3:
+            raise KeyboardInterrupt
+        return chiffrer_fichier(*args)
+
+    monkeypatch.setattr(conteneur, "chiffrer_fichier", chiffrer_puis_echouer)
+    # Un point de reprise après chaque entrée
+    monkeypatch.setattr(journal.Journal, "echeance", lambda self: True)
+    with pytest.raises(KeyboardInterrupt):
+        creer(dossier, chemin, taille_paquet=0, reprendre=True)
+    assert os.path.exists(str(chemin) + journal.SUFFIXE)
+
+    # La reprise ne rechiffre pas les fichiers déjà écrits
+    appels.clear()
+    monkeypatch.setattr(conteneur, "chiffrer_fichier", lambda *args: appels.append(args[0]) or chiffrer_fichier(*args))
+    creer(dossier, chemin, taille_paquet=0, reprendre=True)
+    assert len(appels) == len(contenu(dossier)) - 2
+    assert not os.path.exists(str(chemin) + journal.SUFFIXE)
+
+    conteneur.extraire_conteneur(str(chemin), CLE, str(tmp_path / "sortie"))
+    assert contenu(tmp_path / "sortie" / "source") == contenu(dossier)
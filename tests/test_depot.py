@@ -0,0 +1,69 @@
+# Dépôt de sauvegardes dédupliquées (module depot)
+import io
+import os
+import random
+
+import pytest
+
+from symetrique.modules import depot
+
+CLE = "cle-depot"
+
+
+def contenu(chemin):
+    return {f.relative_to(chemin).as_posix(): f.read_bytes() for f in sorted(chemin.rglob("*")) if f.is_file()}
+
+
+@pytest.fixture
+def dossier(tmp_path):
+    source = tmp_path / "source"
+    source.mkdir()
+    aleatoire = random.Random(7)
+    (source / "gros.bin").write_bytes(bytes(aleatoire.getrandbits(8) for _ in range(300000)))
+    (source / "texte.txt").write_text("sauvegarde\n" * 2000, encoding="utf-8")
+    return source
+
+
+def test_decoupage_deterministe():
+    donnees = os.urandom(500000)
+    blocs = list(depot.decouper_blocs(io.BytesIO(donnees)))
+    assert b"".join(blocs) == donnees
+    assert all(len(bloc) <= depot.TAILLE_MAX for bloc in blocs)
+    assert all(len(bloc) >= depot.TAILLE_MIN for bloc in blocs[:-1])
+    assert list(depot.decouper_blocs(io.BytesIO(donnees))) == blocs
+
+
+def test_sauvegarde_et_restauration(tmp_path, dossier):
+    chemin_depot = str(tmp_path / "depot")
+    premier = depot.sauvegarder(str(dossier), CLE, chemin_depot, nom="un")
+    assert premier['fichiers'] == 2 and premier['blocs_nouveaux'] > 0
+
+    # Fichiers inchangés : aucun bloc nouveau
+    deuxieme = depot.sauvegarder(str(dossier), CLE, chemin_depot, nom="deux")
+    assert deuxieme['fichiers_inchanges'] == 2 and deuxieme['blocs_nouveaux'] == 0
+
+    # Une copie et une modification locale ne produisent que quelques blocs
+    gros = (dossier / "gros.bin").read_bytes()
+    (dossier / "copie.bin").write_bytes(gros)
+    (dossier / "gros.bin").write_bytes(gros[:150000] + b"insertion" + gros[150000:])
+    troisieme = depot.sauvegarder(str(dossier), CLE, chemin_depot, nom="trois")
+    assert troisieme['blocs_nouveaux'] <= 3
+    assert depot.lister_instantanes(chemin_depot) == ["un", "deux", "trois"]
+
+    depot.restaurer(chemin_depot, CLE, "trois", str(tmp_path / "restaure"))
+    assert contenu(tmp_path / "restaure" / "source") == contenu(dossier)
+    depot.restaurer(chemin_depot, CLE, "un", str(tmp_path / "ancien"))
+    assert contenu(tmp_path / "ancien" / "source")["gros.bin"] == gros
+
+
+def test_erreurs(tmp_path, dossier):
+    chemin_depot = str(tmp_path / "depot")
+    depot.sauvegarder(str(dossier), CLE, chemin_depot, nom="un")
+    with pytest.raises(ValueError):
+        depot.sauvegarder(str(dossier), CLE, chemin_depot, nom="un")
+    with pytest.raises(ValueError):
+        depot.sauvegarder(str(dossier), "", chemin_depot)
+    with pytest.raises(ValueError):
+        depot.restaurer(chemin_depot, "autre", "un", str(tmp_path / "sortie"))
+    with pytest.raises(ValueError):
+        depot.chemin_instantane(chemin_depot, "../evasion")
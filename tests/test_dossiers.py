@@ -0,0 +1,76 @@
+# Chiffrement et déchiffrement de dossiers (prim.chiffrer_dossier / prim.dechiffrer_dossier)
+import os
+import tempfile
+
+import pytest
+
+from symetrique.modules import binaire, prim
+
+
+@pytest.fixture
+def dossier(tmp_path):
+    source = tmp_path / "source"
+    (source / "sous").mkdir(parents=True)
+    (source / "a.txt").write_text("contenu é" * 500, encoding="utf-8")
+    (source / "sous" / "b.bin").write_bytes(os.urandom(20000))
+    return source
+
+
+def contenu(chemin):
+    return {str(f.relative_to(chemin)): f.read_bytes() for f in sorted(chemin.rglob("*")) if f.is_file()}
+
+
+@pytest.fixture
+def temporaires(tmp_path, monkeypatch):
+    """Dossier des fichiers temporaires de tempfile, à vérifier après coup."""
+    dossier_temporaire = tmp_path / "tmp"
+    dossier_temporaire.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(dossier_temporaire))
+    return dossier_temporaire
+
+
+@pytest.mark.parametrize("format_sortie", [binaire.FORMAT_BINAIRE, binaire.FORMAT_TEXTE, binaire.FORMAT_CONTENEUR])
+def test_aller_retour(tmp_path, dossier, temporaires, format_sortie):
+    chiffre = prim.chiffrer_dossier(str(dossier), "cle-dossier", str(tmp_path / "d.exegolencrypt"), format_sortie)
+    assert chiffre == str(tmp_path / "d.exegolencrypt")
+    sortie = prim.dechiffrer_dossier(chiffre, "cle-dossier", str(tmp_path / "sortie"))
+    # Le dossier est recréé sous son propre nom
+    assert contenu(tmp_path / "sortie" / "source") == contenu(dossier)
+    assert sortie == str(tmp_path / "sortie")
+    assert list(temporaires.iterdir()) == []
+
+
+def test_ancien_format_mauvaise_cle(tmp_path, dossier, temporaires):
+    chiffre = prim.chiffrer_dossier(str(dossier), "cle-dossier", str(tmp_path / "d.exegolencrypt"),
+                                    binaire.FORMAT_TEXTE)
+    resultat = prim.dechiffrer_dossier(chiffre, "faux", str(tmp_path / "sortie"))
+    assert resultat.startswith("Erreur")
+    assert list(temporaires.iterdir()) == []
+
+
+@pytest.mark.parametrize("format_sortie", [binaire.FORMAT_BINAIRE, binaire.FORMAT_TEXTE])
+def test_echec_du_zip_sans_fichier_partiel(tmp_path, dossier, monkeypatch, format_sortie):
+    sortie = tmp_path / "sortie"
+    sortie.mkdir()
+    ecrire_zip = prim.ecrire_zip
+
+    def ecrire_zip_interrompu(destination, *args):
+        destination.write(os.urandom(300000))
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(prim, "ecrire_zip", ecrire_zip_interrompu)
+    resultat = prim.chiffrer_dossier(str(dossier), "cle-dossier", str(sortie), format_sortie)
+    assert resultat.startswith("Erreur") and "disque plein" in resultat
+    assert list(sortie.iterdir()) == []
+
+    # Un résultat existant n'est remplacé qu'en cas de succès
+    chemin = sortie / "source.exegolencrypt"
+    chemin.write_bytes(b"precedent")
+    prim.chiffrer_dossier(str(dossier), "cle-dossier", str(sortie), format_sortie)
+    assert chemin.read_bytes() == b"precedent"
+
+    monkeypatch.setattr(prim, "ecrire_zip", ecrire_zip)
+    assert prim.chiffrer_dossier(str(dossier), "cle-dossier", str(sortie), format_sortie) == str(chemin)
+    assert list(sortie.iterdir()) == [chemin]
+    assert prim.dechiffrer_dossier(str(chemin), "cle-dossier", str(tmp_path / "extrait")) == str(tmp_path / "extrait")
+    assert contenu(tmp_path / "extrait" / "source") == contenu(dossier)
@@ -0,0 +1,59 @@
+# Remplacement sûr des fichiers (prim.remplacer_fichier et sa version asynchrone)
+import asyncio
+import os
+import stat
+
+import pytest
+
+from symetrique.modules import asynchrone, prim
+
+# Le fichier temporaire, puis son dossier après le renommage (sauf sous Windows)
+FSYNC_ATTENDUS = [False] if os.name == "nt" else [False, True]
+
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    """Appels à os.fsync : True pour un dossier, False pour un fichier."""
+    appels = []
+    fsync = os.fsync
+
+    def enregistrer(descripteur):
+        appels.append(stat.S_ISDIR(os.fstat(descripteur).st_mode))
+        fsync(descripteur)
+
+    monkeypatch.setattr(os, "fsync", enregistrer)
+    return appels
+
+
+def test_remplacement_synchronise(tmp_path, fsyncs):
+    chemin = tmp_path / "a.txt"
+    chemin.write_text("original")
+    prim.remplacer_fichier(str(chemin), lambda destination: destination.write("nouveau"))
+    assert chemin.read_text() == "nouveau"
+    assert fsyncs == FSYNC_ATTENDUS
+
+
+def test_remplacement_asynchrone_synchronise(tmp_path, fsyncs):
+    chemin = tmp_path / "a.bin"
+    chemin.write_bytes(b"original")
+
+    async def ecrire(destination):
+        destination.write(b"nouveau")
+
+    asyncio.run(asynchrone.remplacer_fichier(str(chemin), ecrire))
+    assert chemin.read_bytes() == b"nouveau"
+    assert fsyncs == FSYNC_ATTENDUS
+
+
+def test_echec_conserve_l_original(tmp_path):
+    chemin = tmp_path / "a.txt"
+    chemin.write_text("original")
+
+    def ecrire(destination):
+        destination.write("partiel")
+        raise RuntimeError("échec")
+
+    with pytest.raises(RuntimeError):
+        prim.remplacer_fichier(str(chemin), ecrire)
+    assert chemin.read_text() == "original"
+    assert list(tmp_path.iterdir()) == [chemin]
@@ -0,0 +1,63 @@
+# Flux superposés (module flux) et politique de compression (module compression)
+import io
+import os
+
+import pytest
+
+from symetrique.modules import compression, flux, prim
+
+
+@pytest.mark.parametrize("profondeur", [0, 1, flux.PROFONDEUR])
+def test_pipeline(profondeur):
+    donnees = os.urandom(3 * flux.TAILLE_MORCEAU + 17)
+    destination = io.BytesIO()
+    with flux.pipeline(io.BytesIO(donnees), destination, profondeur) as (lecteur, ecrivain):
+        prim.chiffrer_octets_stream(lecteur, ecrivain, "cle", taille_trame=100000)
+    assert destination.getvalue() == prim.chiffrer_octets(donnees, "cle")
+
+
+def test_erreur_du_producteur():
+    def producteur(tube):
+        tube.write(b"debut")
+        raise OSError("lecture impossible")
+
+    with pytest.raises(OSError, match="lecture impossible"):
+        with flux.produire(producteur) as tube:
+            assert tube.read() == b"debut"
+
+
+def test_consommateur_arrete_tot():
+    def producteur(tube):
+        while True:
+            tube.write(b"x" * 1000)
+
+    with flux.produire(producteur, profondeur=2) as tube:
+        assert len(tube.read(10)) == 10
+
+
+def test_politique_de_compression():
+    texte = b"texte tres compressible " * 500
+    aleatoire = os.urandom(compression.TAILLE_ECHANTILLON)
+    assert compression.choisir_niveau("a.txt", texte) == compression.POLITIQUE_DEFAUT['niveau']
+    assert compression.choisir_niveau("a.bin", aleatoire) == 0
+    assert compression.choisir_niveau("photo.JPG", texte) == 0
+    assert compression.choisir_niveau("a.txt", texte, dict(compression.POLITIQUE_DEFAUT, niveau=0)) == 0
+
+
+@pytest.mark.parametrize("algorithme", [compression.ZLIB, compression.LZMA])
+def test_decompression_en_flux(algorithme):
+    donnees = b"donnees compressibles " * 20000
+    compresse = compression.compresser(donnees, algorithme)
+    morceaux = [compresse[i:i + 1000] for i in range(0, len(compresse), 1000)]
+    assert b"".join(compression.decompresser_flux(morceaux, algorithme)) == donnees
+    assert compression.decompresser(compresse, algorithme) == donnees
+    with pytest.raises(ValueError):
+        list(compression.decompresser_flux([b"corrompu" * 10], algorithme))
+
+
+def test_choix_de_la_precompression():
+    texte = b"texte tres compressible " * 500
+    assert compression.choisir_precompression(10, texte) is None
+    assert compression.choisir_precompression(len(texte), os.urandom(4096)) is None
+    assert compression.choisir_precompression(len(texte), texte) == compression.ZLIB
+    assert compression.choisir_precompression(compression.SEUIL_LZMA, texte) == compression.LZMA
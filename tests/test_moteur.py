@@ -0,0 +1,53 @@
+# Le moteur vectorisé (moteur_numpy) doit produire exactement le même résultat
+# que le moteur en Python pur, pour toute clé, taille et position de segment
+import os
+from array import array
+
+import pytest
+
+from symetrique.modules import moteur, second
+
+moteur_numpy = pytest.importorskip("symetrique.modules.moteur_numpy")
+
+CLES = ["Exegol-Kyber-42", "ab", "x" * 64, "clé-ünicode-€", "abcdefg"]
+TAILLES = [1, 5, 4096, 20000, 100003]
+
+
+def points_aleatoires(typecode, taille):
+    if typecode == moteur.TYPE_OCTETS:
+        return array(typecode, os.urandom(taille))
+    # Le XOR historique réduit le texte à 16 bits : seuls les caractères du plan
+    # multilingue de base reviennent à l'identique
+    valeurs = array(typecode, os.urandom(4 * taille))
+    return array(typecode, (valeur % 0x10000 for valeur in valeurs))
+
+
+def python_pur(fonction, *args):
+    actif = moteur.NUMPY_ACTIF
+    moteur.NUMPY_ACTIF = False
+    try:
+        return fonction(*args)
+    finally:
+        moteur.NUMPY_ACTIF = actif
+
+
+@pytest.mark.parametrize("cle", CLES)
+@pytest.mark.parametrize("typecode", [moteur.TYPE_POINTS, moteur.TYPE_OCTETS])
+@pytest.mark.parametrize("taille", TAILLES)
+def test_identique_au_python_pur(cle, typecode, taille):
+    key_values = second.generate_key_values(cle)
+    points = points_aleatoires(typecode, taille)
+    unite = moteur.unite_chiffrement(key_values['block_size'])
+
+    for debut in (0, unite, 12345 * unite):
+        attendu = python_pur(moteur.chiffrer_points, points, key_values, debut)
+        chiffre = moteur_numpy.chiffrer_points(points, key_values, debut)
+        assert chiffre == attendu
+
+        # Déchiffrement d'un segment aligné sur un bloc, de parité quelconque
+        for decalage in (0, key_values['block_size']):
+            segment = chiffre[decalage:]
+            position = 2 * debut + decalage
+            assert (moteur_numpy.dechiffrer_points(segment, key_values, position)
+                    == python_pur(moteur.dechiffrer_points, segment, key_values, position))
+        assert moteur_numpy.dechiffrer_points(chiffre, key_values, 2 * debut) == points
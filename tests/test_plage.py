@@ -0,0 +1,105 @@
+# Tests de dechiffrer_range et de LecteurDechiffre, pour chaque format de
+# message : texte, octets, fichier binaire avec ou sans pré-compression
+import io
+import mmap
+
+import pytest
+
+from symetrique.modules import binaire, compression, prim
+
+CLE = "Exegol-Kyber-42"
+
+# Texte compressible, avec des caractères multi-octets
+TEXTE = "".join(f"Ligne {i} : l'Empire contre-attaque — ⚔ {i * i}\n" for i in range(3000))
+PLAGES = [(0, 10), (1, 1), (5000, 300), (len(TEXTE) - 20, 50), (len(TEXTE) + 5, 10), (0, 0)]
+
+
+def chiffrer_fichier(tmp_path, contenu, **options):
+    chemin = tmp_path / "message.txt"
+    chemin.write_bytes(contenu)
+    prim.chiffrer_fichier_texte(str(chemin), CLE, **options)
+    return chemin
+
+
+@pytest.mark.parametrize("start, length", PLAGES)
+def test_message_texte(start, length):
+    chiffre = prim.chiffrer(TEXTE, CLE)
+    assert prim.dechiffrer_range(chiffre, CLE, start, length) == TEXTE[start:start + length]
+
+
+@pytest.mark.parametrize("taille", [300, compression.SEUIL_LZMA * 2])
+@pytest.mark.parametrize("start, length", PLAGES)
+def test_message_texte_precompresse(taille, start, length):
+    texte = (TEXTE * (taille // len(TEXTE) + 1))[:taille]
+    chiffre = prim.chiffrer(texte, CLE, precompression=True)
+    assert prim.algorithme_precompression(chiffre) is not None
+    assert prim.dechiffrer_range(chiffre, CLE, start, length) == texte[start:start + length]
+
+
+@pytest.mark.parametrize("start, length", PLAGES)
+def test_octets(start, length):
+    donnees = TEXTE.encode("utf-8")
+    chiffre = prim.chiffrer_octets(donnees, CLE)
+    assert prim.dechiffrer_range(chiffre, CLE, start, length) == donnees[start:start + length]
+    assert prim.dechiffrer_range(io.BytesIO(chiffre), CLE, start, length) == donnees[start:start + length]
+
+
+@pytest.mark.parametrize("precompression", [False, True])
+@pytest.mark.parametrize("start, length", PLAGES)
+def test_fichier_binaire(tmp_path, precompression, start, length):
+    donnees = TEXTE.encode("utf-8")
+    chemin = chiffrer_fichier(tmp_path, donnees, precompression=precompression)
+    with open(chemin, "rb") as source:
+        entete = binaire.lire_entete(source)
+        assert bool(entete["drapeaux"]) == precompression
+        source.seek(0)
+        assert prim.dechiffrer_range(source, CLE, start, length) == donnees[start:start + length]
+
+
+def test_fichier_precompresse_projete(tmp_path):
+    donnees = TEXTE.encode("utf-8")
+    chemin = chiffrer_fichier(tmp_path, donnees, precompression=True)
+    with open(chemin, "rb") as fichier, mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+        assert prim.dechiffrer_range(projection, CLE, 100, 64) == donnees[100:164]
+
+
+def test_fichier_texte_historique(tmp_path):
+    chemin = chiffrer_fichier(tmp_path, TEXTE.encode("utf-8"), format_sortie=binaire.FORMAT_TEXTE)
+    with open(chemin, "rb") as source:
+        assert prim.dechiffrer_range(source, CLE, 42, 100) == TEXTE[42:142]
+
+
+@pytest.mark.parametrize("source", [
+    lambda: prim.chiffrer(TEXTE, CLE),
+    lambda: prim.chiffrer(TEXTE, CLE, precompression=True),
+    lambda: prim.chiffrer_octets(TEXTE.encode("utf-8"), CLE),
+])
+def test_mauvaise_cle(source):
+    with pytest.raises(ValueError):
+        prim.dechiffrer_range(source(), "mauvaise-cle", 0, 10)
+
+
+def test_plage_invalide():
+    with pytest.raises(ValueError):
+        prim.dechiffrer_range(prim.chiffrer_octets(b"abc", CLE), CLE, -1, 2)
+
+
+def test_lecteur_dechiffre(tmp_path):
+    donnees = TEXTE.encode("utf-8")
+    chemin = chiffrer_fichier(tmp_path, donnees)
+    with open(chemin, "rb") as source:
+        lecteur = prim.LecteurDechiffre(source, CLE, taille_lecture=1000)
+        lecteur.seek(3000)
+        assert lecteur.read(500) == donnees[3000:3500]
+        lecteur.seek(0)
+        assert lecteur.read() == donnees
+
+
+def test_lecteur_dechiffre_refuse_precompression(tmp_path):
+    chemin = chiffrer_fichier(tmp_path, TEXTE.encode("utf-8"), precompression=True)
+    with open(chemin, "rb") as source:
+        with pytest.raises(ValueError, match="pré-compressé"):
+            prim.LecteurDechiffre(source, CLE)
+        source.seek(binaire.ENTETE.size)
+        with pytest.raises(ValueError, match="pré-compressé"):
+            prim.LecteurDechiffre(source, CLE)
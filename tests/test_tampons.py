@@ -0,0 +1,46 @@
+# API à tampon fourni par l'appelant (prim.chiffrer_into / prim.dechiffrer_into)
+import os
+
+import pytest
+
+from symetrique.modules import moteur, prim
+
+CLES = ["a", "Exegol", "clé-très-longue-" * 5]
+TAILLES = [1, 100, 4095, 4096, 16385, 100003, prim.TAILLE_TRAME + 17]
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy_actif(request):
+    if request.param and not moteur.NUMPY_ACTIF:
+        pytest.skip("NumPy absent")
+    actif = moteur.NUMPY_ACTIF
+    moteur.NUMPY_ACTIF = request.param
+    yield request.param
+    moteur.NUMPY_ACTIF = actif
+
+
+@pytest.mark.parametrize("key", CLES)
+@pytest.mark.parametrize("taille", TAILLES)
+def test_identique_a_chiffrer_octets(numpy_actif, key, taille):
+    donnees = os.urandom(taille)
+    attendu = prim.chiffrer_octets(donnees, key)
+    destination = bytearray(prim.taille_chiffree(taille, key) + 3)
+    assert prim.chiffrer_into(donnees, destination, key) == len(attendu)
+    assert destination[:len(attendu)] == attendu
+
+    resultat = bytearray(prim.taille_dechiffree(len(attendu), key))
+    assert prim.dechiffrer_into(memoryview(destination)[:len(attendu)], resultat, key) == taille
+    assert resultat == donnees
+
+
+def test_tailles_sans_cle_derivee():
+    assert prim.taille_chiffree(5, "x" * 1000) == 30
+    assert prim.taille_dechiffree(30, "x" * 1000) == 5
+    assert prim.taille_dechiffree(7, "x") == 0
+
+
+def test_destination_invalide():
+    with pytest.raises(ValueError):
+        prim.chiffrer_into(b"abc", bytearray(10), "cle")
+    with pytest.raises(TypeError):
+        prim.chiffrer_into(b"abc", bytes(100), "cle")
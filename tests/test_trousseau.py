@@ -0,0 +1,47 @@
+# Recherche de la clé d'un message dans un trousseau (module trousseau)
+import pytest
+
+from symetrique.modules import binaire, prim
+from symetrique.modules.trousseau import Trousseau
+
+CLES = ["alpha", "Exegol-42", "clé-secrète", "k", "une clé beaucoup plus longue que les autres"]
+
+
+@pytest.fixture
+def trousseau():
+    return Trousseau(CLES)
+
+
+@pytest.mark.parametrize("cle", CLES)
+def test_trouver(trousseau, cle):
+    message = "Message à retrouver ✓" * 10
+    assert trousseau.trouver(prim.chiffrer(message, cle)) == cle
+    assert trousseau.trouver(prim.chiffrer(message * 100, cle, precompression=True)) == cle
+    assert trousseau.trouver(prim.chiffrer_octets(message.encode("utf-8"), cle)) == cle
+    assert cle in trousseau.candidates(prim.chiffrer(message, cle))
+
+
+def test_cle_absente(trousseau):
+    assert trousseau.trouver(prim.chiffrer("message", "inconnue")) is None
+    assert trousseau.trouver(prim.chiffrer_octets(b"message", "inconnue")) is None
+
+
+def test_ajouter_retirer(trousseau):
+    chiffre = prim.chiffrer("message", "nouvelle")
+    assert len(trousseau) == len(CLES)
+    trousseau.ajouter("nouvelle")
+    trousseau.ajouter("nouvelle")
+    assert len(trousseau) == len(CLES) + 1 and "nouvelle" in trousseau
+    assert trousseau.trouver(chiffre) == "nouvelle"
+    trousseau.retirer("nouvelle")
+    assert trousseau.trouver(chiffre) is None
+    with pytest.raises(ValueError):
+        trousseau.ajouter("")
+
+
+@pytest.mark.parametrize("format_sortie", [binaire.FORMAT_BINAIRE, binaire.FORMAT_TEXTE])
+def test_trouver_fichier(tmp_path, trousseau, format_sortie):
+    chemin = tmp_path / "message.txt"
+    chemin.write_text("contenu du fichier\n" * 1000, encoding="utf-8")
+    prim.chiffrer_fichier_texte(str(chemin), "clé-secrète", format_sortie=format_sortie)
+    assert trousseau.trouver_fichier(str(chemin)) == "clé-secrète"